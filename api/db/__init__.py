@@ -0,0 +1,14 @@
+"""
+Database backends that keep connections in a bounded per-process pool.
+
+Use ``api.db.mysql`` or ``api.db.sqlite3`` as the ``ENGINE`` and configure
+the pool with a ``POOL`` dict next to it::
+
+    'ENGINE': 'api.db.mysql',
+    'CONN_MAX_AGE': 0,
+    'POOL': {'MAX_SIZE': 10, 'TIMEOUT': 5, 'MAX_AGE': 600, 'CHECK_INTERVAL': 0},
+
+With ``CONN_MAX_AGE = 0`` Django "closes" the connection at the end of each
+request, which hands it back to the pool instead of disconnecting, so a
+request costs a checkout rather than a TCP and authentication handshake.
+"""
@@ -0,0 +1,9 @@
+from django.db.backends.mysql import base
+
+from api.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+
+    def ping_connection(self, connection):
+        connection.ping()
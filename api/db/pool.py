@@ -0,0 +1,224 @@
+import os
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, connections
+
+from api import metrics
+
+DEFAULT_POOL = {
+    # Connections open at once, idle or checked out
+    "MAX_SIZE": 10,
+    # Seconds a checkout waits for a connection before giving up
+    "TIMEOUT": 5,
+    # Seconds after which a connection is replaced instead of reused
+    "MAX_AGE": 600,
+    # Idle seconds after which a connection is pinged before reuse; 0 pings every time
+    "CHECK_INTERVAL": 0,
+}
+
+
+class PoolTimeout(DatabaseError):
+    pass
+
+
+class PooledConnection:
+    """A raw DB-API connection with the times the pool needs."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.returned_at = self.created_at
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of raw DB-API connections.
+
+    ``checkout(connect)`` calls ``connect`` when it needs a new connection,
+    and ``ping`` raises if an idle one is no longer usable. Idle connections are reused most recently returned
+    first, so the ones the pool doesn't need grow old and get replaced.
+    """
+
+    def __init__(self, alias, ping, max_size, timeout, max_age, check_interval):
+        if max_size < 1:
+            raise ImproperlyConfigured(f"POOL MAX_SIZE of database '{alias}' must be at least 1")
+        self.alias = alias
+        self.ping = ping
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.condition = threading.Condition()
+        self.idle = []
+        # Connections handed out, keyed by id() of the raw connection
+        self.in_use = {}
+        self.size = 0
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "waits": 0, "timeouts": 0}
+
+    def checkout(self, connect):
+        deadline = time.monotonic() + self.timeout
+        with self.condition:
+            waited = False
+            while not self.idle and self.size >= self.max_size:
+                if not waited:
+                    waited = True
+                    self.count("waits")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.count("timeouts")
+                    raise PoolTimeout(
+                        f"No connection to database '{self.alias}' available within {self.timeout}s"
+                    )
+                self.condition.wait(remaining)
+            pooled = self.idle.pop() if self.idle else None
+            if pooled is None:
+                self.size += 1
+
+        # Connecting and pinging happen outside the lock
+        if pooled is not None and not self.usable(pooled):
+            self.discard(pooled.connection)
+            pooled = None
+        if pooled is None:
+            try:
+                pooled = PooledConnection(connect())
+            except BaseException:
+                with self.condition:
+                    self.size -= 1
+                    self.condition.notify()
+                raise
+            self.count("created")
+        else:
+            self.count("reused")
+
+        with self.condition:
+            self.in_use[id(pooled.connection)] = pooled
+        metrics.inc("db_pool_connections_in_use", alias=self.alias)
+        return pooled.connection
+
+    def checkin(self, connection, discard=False):
+        with self.condition:
+            pooled = self.in_use.pop(id(connection), None)
+            if pooled is None:
+                return
+            if discard:
+                self.size -= 1
+            else:
+                pooled.returned_at = time.monotonic()
+                self.idle.append(pooled)
+            self.condition.notify()
+        metrics.inc("db_pool_connections_in_use", -1, alias=self.alias)
+        if discard:
+            self.close(connection)
+            self.count("discarded")
+
+    def usable(self, pooled):
+        now = time.monotonic()
+        if self.max_age is not None and now - pooled.created_at > self.max_age:
+            return False
+        if now - pooled.returned_at < self.check_interval:
+            return True
+        try:
+            self.ping(pooled.connection)
+        except Exception:
+            return False
+        return True
+
+    def discard(self, connection):
+        # Replaces the connection: the slot stays taken for the new one
+        self.close(connection)
+        self.count("discarded")
+
+    def close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close_idle(self):
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.size -= len(idle)
+            self.condition.notify_all()
+        for pooled in idle:
+            self.close(pooled.connection)
+
+    def count(self, stat):
+        with self.condition:
+            self.stats[stat] += 1
+        metrics.inc(f"db_pool_{stat}_total", alias=self.alias)
+
+    def snapshot(self):
+        with self.condition:
+            return {
+                **self.stats,
+                "size": self.size,
+                "idle": len(self.idle),
+                "in_use": len(self.in_use),
+                "max_size": self.max_size,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(wrapper):
+    """Return this process's pool for the wrapper's alias, creating it on first use."""
+    key = (wrapper.alias, os.getpid())
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = {**DEFAULT_POOL, **wrapper.settings_dict.get("POOL", {})}
+                pool = _pools[key] = ConnectionPool(
+                    wrapper.alias,
+                    wrapper.ping_connection,
+                    max_size=options["MAX_SIZE"],
+                    timeout=options["TIMEOUT"],
+                    max_age=options["MAX_AGE"],
+                    check_interval=options["CHECK_INTERVAL"],
+                )
+    return pool
+
+
+def release_connections():
+    """
+    Hand this thread's connections back to their pools, for responses that
+    stay open long after their last query. Connections inside a transaction
+    are left to it.
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Take connections from the pool instead of opening them, and hand them
+    back instead of closing them.
+    """
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        return get_pool(self).checkout(lambda: connect(conn_params))
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = get_pool(self)
+        # A connection closed inside atomic() is still referenced by this
+        # wrapper until the block exits, so it can't go back to the pool
+        discard = self.in_atomic_block
+        if not discard and not self.autocommit:
+            try:
+                self.connection.rollback()
+            except Exception:
+                discard = True
+        with self.wrap_database_errors:
+            pool.checkin(self.connection, discard=discard)
+
+    def ping_connection(self, connection):
+        raise NotImplementedError
@@ -0,0 +1,27 @@
+"""
+Pooled SQLite backend, a local stand-in for ``api.db.mysql`` that runs the
+same pool code in development and tests.
+
+In-memory databases, which the test runner uses, are not pooled: Django keeps
+one connection per thread open for them and never closes it, so each thread
+would hold a pool slot for good.
+"""
+from django.db.backends.sqlite3 import base
+
+from api.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        if self.is_in_memory_db():
+            return base.DatabaseWrapper.get_new_connection(self, conn_params)
+        return super().get_new_connection(conn_params)
+
+    def _close(self):
+        if self.is_in_memory_db():
+            return base.DatabaseWrapper._close(self)
+        return super()._close()
+
+    def ping_connection(self, connection):
+        connection.execute("SELECT 1").close()
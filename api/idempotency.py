@@ -0,0 +1,185 @@
+"""
+``Idempotency-Key`` support for views that create or change data.
+
+A client that retries a request sends the same ``Idempotency-Key`` header
+with it. The first response is stored for ``IDEMPOTENCY_KEY_TTL`` seconds and
+retries get it back, with an ``Idempotent-Replayed`` header, without the view
+running again. Keys are scoped to the user and the endpoint, and reusing a key
+with a different body is answered with 422.
+
+A retry arriving while the first request is still running waits for its
+response instead of running the view too, and gets 409 if it doesn't come in
+time. Across worker processes this needs ``IDEMPOTENCY_CACHE_ALIAS`` to name a
+shared cache.
+"""
+import asyncio
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = "HTTP_IDEMPOTENCY_KEY"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Seconds the in-flight marker outlives a request that never finishes
+LOCK_TIMEOUT = 30
+# How long a retry waits for the response of the request it duplicates
+WAIT_INTERVAL = 0.05
+WAIT_TIMEOUT = 10
+
+
+def get_cache():
+    return caches[getattr(settings, "IDEMPOTENCY_CACHE_ALIAS", "default")]
+
+
+def get_ttl():
+    return getattr(settings, "IDEMPOTENCY_KEY_TTL", 60 * 60 * 24)
+
+
+def digest(*parts):
+    return hashlib.blake2b("\x00".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def storage_key(request, key):
+    return f"idempotency:{digest(str(request.user.pk), request.method, request.path, key)}"
+
+
+def fingerprint(request):
+    return hashlib.blake2b(request.body, digest_size=16).digest()
+
+
+class IdempotencyError(Exception):
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def stored_response(view, request, response):
+    """Return ``response`` as a compact tuple, or None if it must not be stored."""
+    if response.status_code >= 500:
+        # Let the retry run again
+        return None
+    if isinstance(response, Response):
+        # Render now, the same way DRF would, to store the exact body
+        response = view.finalize_response(request, response)
+        response.render()
+    return (response.status_code, response["Content-Type"], response.content)
+
+
+def replay(stored):
+    status_code, content_type, content = stored
+    response = HttpResponse(content, status=status_code, content_type=content_type)
+    response[REPLAYED_HEADER] = "true"
+    return response
+
+
+def get_key(request):
+    key = request.META.get(HEADER)
+    if key is not None and (not key or len(key) > MAX_KEY_LENGTH):
+        raise IdempotencyError("Invalid Idempotency-Key", status.HTTP_400_BAD_REQUEST)
+    return key
+
+
+def check_entry(entry, body, deadline):
+    """
+    Return the stored response to replay, or None to keep waiting.
+
+    Entries are ``(body fingerprint, stored response)``, the response being
+    None while the first request runs.
+    """
+    if entry is not None:
+        if entry[0] != body:
+            raise IdempotencyError(
+                "Idempotency-Key was used with a different request body", status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        if entry[1] is not None:
+            return replay(entry[1])
+    if time.monotonic() >= deadline:
+        raise IdempotencyError("A request with this Idempotency-Key is still in progress", status.HTTP_409_CONFLICT)
+    return None
+
+
+def idempotent(handler):
+    """
+    Decorate a view handler to honour ``Idempotency-Key``. It must wrap any
+    ``transaction.atomic()`` so responses are only stored once committed.
+    """
+    if iscoroutinefunction(handler):
+        return aidempotent(handler)
+
+    @wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        try:
+            key = get_key(request)
+            if key is None:
+                return handler(self, request, *args, **kwargs)
+            cache = get_cache()
+            cache_key = storage_key(request, key)
+            body = fingerprint(request)
+            # Only the request that adds the in-flight entry runs the handler
+            deadline = time.monotonic() + WAIT_TIMEOUT
+            while not cache.add(cache_key, (body, None), LOCK_TIMEOUT):
+                response = check_entry(cache.get(cache_key), body, deadline)
+                if response is not None:
+                    return response
+                time.sleep(WAIT_INTERVAL)
+        except IdempotencyError as e:
+            return Response({"error": e.message}, status=e.status_code)
+
+        stored = None
+        try:
+            response = handler(self, request, *args, **kwargs)
+            stored = stored_response(self, request, response)
+            return response
+        finally:
+            if stored is not None:
+                cache.set(cache_key, (body, stored), get_ttl())
+            else:
+                cache.delete(cache_key)
+
+    return wrapper
+
+
+def aidempotent(handler):
+    """``idempotent`` for the handlers of ``task.async_views.AsyncAPIView``."""
+
+    @wraps(handler)
+    async def wrapper(self, request, *args, **kwargs):
+        try:
+            key = get_key(request)
+            if key is None:
+                return await handler(self, request, *args, **kwargs)
+            cache = get_cache()
+            cache_key = storage_key(request, key)
+            body = fingerprint(request)
+            # Only the request that adds the in-flight entry runs the handler
+            deadline = time.monotonic() + WAIT_TIMEOUT
+            while not await cache.aadd(cache_key, (body, None), LOCK_TIMEOUT):
+                response = check_entry(await cache.aget(cache_key), body, deadline)
+                if response is not None:
+                    return response
+                await asyncio.sleep(WAIT_INTERVAL)
+        except IdempotencyError as e:
+            return self.render({"error": e.message}, e.status_code)
+
+        stored = None
+        try:
+            response = await handler(self, request, *args, **kwargs)
+            stored = stored_response(self, request, response)
+            return response
+        finally:
+            if stored is not None:
+                await cache.aset(cache_key, (body, stored), get_ttl())
+            else:
+                await cache.adelete(cache_key)
+
+    return wrapper
@@ -0,0 +1,394 @@
+"""
+Prometheus metrics shared by every worker process, served at ``/metrics``.
+
+Each process writes its samples to its own memory-mapped file in
+``METRICS_DIR``, so recording never waits on another process; a per-process
+lock only orders threads of the same worker. A scrape reads every file in the
+directory and adds the samples up. The counters and histograms of workers
+that have exited are folded into ``metrics_archive.db`` and their files
+removed, so they keep contributing and counters never go backwards, while
+their gauges are dropped: a crashed worker doesn't leave streams or
+connections counted as open. Workers are told apart by pid, so the
+directory must not be shared between hosts. Empty it when the whole server
+restarts.
+
+The file layout is an 8-byte header holding the number of bytes used,
+followed by entries of a 4-byte key length, the UTF-8 key padded to a
+multiple of 8 bytes and an 8-byte double. A new entry is written before the
+header is updated, so readers only ever see complete entries.
+"""
+import fcntl
+import glob
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+
+INITIAL_SIZE = 64 * 1024
+HEADER = struct.Struct("q")
+KEY_LENGTH = struct.Struct("i")
+VALUE = struct.Struct("d")
+
+# Upper bounds of the request latency histogram, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+METRICS = {
+    "http_requests_total": ("counter", "Requests handled, by route, method and status."),
+    "http_request_errors_total": ("counter", "Requests answered with a 5xx status, by route and method."),
+    "http_request_duration_seconds": ("histogram", "Time to produce a response, by route and method."),
+    "db_queries_total": ("counter", "Database queries run while handling requests, by route."),
+    "task_cache_lookups_total": ("counter", "Task cache lookups, by result."),
+    "task_cache_hit_ratio": ("gauge", "Share of task cache lookups answered from the cache."),
+    "db_pool_connections_in_use": ("gauge", "Pooled database connections checked out, by alias."),
+    "db_pool_created_total": ("counter", "Connections opened by the pool, by alias."),
+    "db_pool_reused_total": ("counter", "Checkouts served by an idle pooled connection, by alias."),
+    "db_pool_discarded_total": ("counter", "Pooled connections closed as too old, broken or unreturnable, by alias."),
+    "db_pool_waits_total": ("counter", "Checkouts that had to wait for a connection, by alias."),
+    "db_pool_timeouts_total": ("counter", "Checkouts that gave up waiting for a connection, by alias."),
+    "task_event_streams_open": ("gauge", "Server-Sent Events streams of task changes currently open."),
+    "task_event_streams_dropped_total": ("counter", "Event streams closed for falling too far behind."),
+}
+
+
+class MmapStore:
+    """Float samples of one process, kept in a memory-mapped file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.positions = {}
+        exists = os.path.exists(path)
+        self.file = open(path, "a+b")
+        if not exists or os.path.getsize(path) < INITIAL_SIZE:
+            self.file.truncate(INITIAL_SIZE)
+        self.mm = mmap.mmap(self.file.fileno(), 0)
+        self.used = HEADER.unpack_from(self.mm, 0)[0] or HEADER.size
+        # Pick up samples of an earlier process that had the same pid
+        for key, value, position in read_entries(self.mm, self.used):
+            self.positions[key] = position
+
+    def inc(self, key, amount=1.0):
+        self.inc_many(((key, amount),))
+
+    def inc_many(self, increments):
+        with self.lock:
+            for key, amount in increments:
+                position = self.positions.get(key)
+                if position is None:
+                    position = self.add(key)
+                value = VALUE.unpack_from(self.mm, position)[0]
+                VALUE.pack_into(self.mm, position, value + amount)
+
+    def add(self, key):
+        encoded = key.encode("utf-8")
+        padded = len(encoded) + (-(KEY_LENGTH.size + len(encoded)) % 8)
+        size = KEY_LENGTH.size + padded + VALUE.size
+        if self.used + size > len(self.mm):
+            self.grow(self.used + size)
+
+        KEY_LENGTH.pack_into(self.mm, self.used, len(encoded))
+        self.mm[self.used + KEY_LENGTH.size:self.used + KEY_LENGTH.size + len(encoded)] = encoded
+        position = self.used + KEY_LENGTH.size + padded
+        VALUE.pack_into(self.mm, position, 0.0)
+        self.used += size
+        HEADER.pack_into(self.mm, 0, self.used)
+        self.positions[key] = position
+        return position
+
+    def grow(self, needed):
+        size = len(self.mm)
+        while size < needed:
+            size *= 2
+        self.mm.close()
+        self.file.truncate(size)
+        self.mm = mmap.mmap(self.file.fileno(), 0)
+
+
+def read_entries(mm, used):
+    offset = HEADER.size
+    while offset < used:
+        length = KEY_LENGTH.unpack_from(mm, offset)[0]
+        key = bytes(mm[offset + KEY_LENGTH.size:offset + KEY_LENGTH.size + length]).decode("utf-8")
+        position = offset + KEY_LENGTH.size + length + (-(KEY_LENGTH.size + length) % 8)
+        yield key, VALUE.unpack_from(mm, position)[0], position
+        offset = position + VALUE.size
+
+
+def read_file(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        return []
+    used = HEADER.unpack_from(data, 0)[0]
+    return [(key, value) for key, value, _ in read_entries(data, min(used, len(data)))]
+
+
+def get_metrics_dir():
+    return getattr(settings, "METRICS_DIR", None) or os.path.join(tempfile.gettempdir(), "task-api-metrics")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return this process's store, opening a new file after a fork."""
+    global _store
+    store = _store
+    directory = get_metrics_dir()
+    path = os.path.join(directory, f"metrics_{os.getpid()}.db")
+    if store is None or store.path != path:
+        with _store_lock:
+            if _store is None or _store.path != path:
+                os.makedirs(directory, exist_ok=True)
+                _store = MmapStore(path)
+                # A file left by an earlier process with the same pid holds its gauges
+                _store.inc_many([(key, -value) for key, value in read_file(path) if is_gauge(key)])
+            store = _store
+    return store
+
+
+# Encoded keys, by name, suffix and labels as passed
+_keys = {}
+
+
+def sample_key(name, labels, suffix=""):
+    cache_key = (name, suffix, tuple(labels.items()))
+    key = _keys.get(cache_key)
+    if key is None:
+        key = _keys[cache_key] = json.dumps([name, suffix, sorted(labels.items())], separators=(",", ":"))
+    return key
+
+
+def inc(name, amount=1.0, **labels):
+    get_store().inc(sample_key(name, labels), amount)
+
+
+def observe(name, value, buckets=DURATION_BUCKETS, **labels):
+    """Record one histogram observation; buckets are stored non-cumulative."""
+    bound = next(bound for bound in buckets if value <= bound)
+    get_store().inc_many((
+        (sample_key(name, {**labels, "le": format_value(bound)}, "_bucket"), 1.0),
+        (sample_key(name, labels, "_sum"), value),
+        (sample_key(name, labels, "_count"), 1.0),
+    ))
+
+
+def is_gauge(key):
+    return METRICS.get(json.loads(key)[0], ("untyped",))[0] == "gauge"
+
+
+def file_pid(path):
+    """Return the pid of the worker writing ``path``, or None for the archive."""
+    try:
+        return int(os.path.basename(path)[len("metrics_"):-len(".db")])
+    except ValueError:
+        return None
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def archive_dead_workers(directory):
+    """Fold the counters and histograms of exited workers into the archive file."""
+    with open(os.path.join(directory, "metrics.lock"), "a") as lock:
+        # One scrape at a time, so no file is folded in twice
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = None
+        for path in glob.glob(os.path.join(directory, "metrics_*.db")):
+            pid = file_pid(path)
+            if pid is None or pid == os.getpid() or pid_alive(pid):
+                continue
+            if archive is None:
+                archive = MmapStore(os.path.join(directory, "metrics_archive.db"))
+            archive.inc_many([(key, value) for key, value in read_file(path) if not is_gauge(key)])
+            os.remove(path)
+
+
+def collect():
+    """Return ``{(name, suffix, labels): value}`` summed over every process."""
+    directory = get_metrics_dir()
+    samples = defaultdict(float)
+    if os.path.isdir(directory):
+        archive_dead_workers(directory)
+    for path in glob.glob(os.path.join(directory, "metrics_*.db")):
+        for key, value in read_file(path):
+            name, suffix, labels = json.loads(key)
+            samples[(name, suffix, tuple(tuple(label) for label in labels))] += value
+    return samples
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def add_cache_hit_ratio(samples):
+    lookups = {dict(labels)["result"]: value for (name, _, labels), value in samples.items()
+               if name == "task_cache_lookups_total"}
+    total = lookups.get("hit", 0) + lookups.get("miss", 0)
+    if total:
+        samples[("task_cache_hit_ratio", "", ())] = lookups.get("hit", 0) / total
+
+
+def cumulative_buckets(samples):
+    """Turn the stored per-bucket counts into Prometheus' cumulative ones."""
+    series = defaultdict(dict)
+    for (name, suffix, labels), value in list(samples.items()):
+        if suffix == "_bucket":
+            del samples[(name, suffix, labels)]
+            rest = tuple(label for label in labels if label[0] != "le")
+            series[(name, rest)][dict(labels)["le"]] = value
+    for (name, rest), counts in series.items():
+        # Every series lists all bounds, including ones nothing fell into
+        bounds = {format_value(bound) for bound in DURATION_BUCKETS} | set(counts)
+        total = 0.0
+        for le in sorted(bounds, key=float):
+            total += counts.get(le, 0.0)
+            samples[(name, "_bucket", rest + (("le", le),))] = total
+
+
+def render():
+    samples = collect()
+    add_cache_hit_ratio(samples)
+    cumulative_buckets(samples)
+
+    by_name = defaultdict(list)
+    for (name, suffix, labels), value in samples.items():
+        by_name[name].append((suffix, labels, value))
+
+    lines = []
+    for name in sorted(by_name):
+        kind, help_text = METRICS.get(name, ("untyped", ""))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in sorted(by_name[name], key=sample_order):
+            lines.append(f"{name}{suffix}{format_labels(labels)} {format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def sample_order(sample):
+    suffix, labels, _ = sample
+    le = dict(labels).get("le")
+    other = tuple(label for label in labels if label[0] != "le")
+    return other, suffix, float(le) if le else 0.0
+
+
+def metrics_view(request):
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+
+current_queries = ContextVar("current_queries", default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    counter = current_queries.get()
+    if counter is not None:
+        counter.count += 1
+    return execute(sql, params, many, context)
+
+
+def instrument(connection):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def instrument_new_connection(sender, connection, **kwargs):
+    instrument(connection)
+
+
+def instrument_connections():
+    # Connections this thread opened before the module was imported
+    for connection in connections.all(initialized_only=True):
+        instrument(connection)
+
+
+connection_created.connect(instrument_new_connection)
+instrument_connections()
+
+
+class MetricsMiddleware:
+    """
+    Count requests, errors and queries and record latency per route, named
+    after the URL pattern the request resolved to.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        counter = QueryCounter()
+        token = current_queries.set(counter)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_queries.reset(token)
+        self.record(request, response, time.perf_counter() - start, counter)
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = current_queries.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_queries.reset(token)
+        self.record(request, response, time.perf_counter() - start, counter)
+        return response
+
+    def record(self, request, response, seconds, counter):
+        match = request.resolver_match
+        route = match.url_name if match and match.url_name else "unmatched"
+        if route == "metrics":
+            return
+        method = request.method
+        inc("http_requests_total", route=route, method=method, status=str(response.status_code))
+        if response.status_code >= 500:
+            inc("http_request_errors_total", route=route, method=method)
+        observe("http_request_duration_seconds", seconds, route=route, method=method)
+        if counter.count:
+            inc("db_queries_total", counter.count, route=route)
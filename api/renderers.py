@@ -0,0 +1,85 @@
+"""
+JSON renderer backed by orjson, falling back to DRF's stdlib renderer.
+
+The output is byte for byte what ``rest_framework.renderers.JSONRenderer``
+produces with the default COMPACT_JSON / UNICODE_JSON settings; whenever a
+request or setting asks for something else (indentation, ASCII escaping) the
+stdlib renderer is used instead. So are payloads holding floats, which orjson
+formats differently (``1e16`` for ``1e+16``) and writes as ``null`` when they
+are NaN or infinite, where the stdlib refuses them.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .timing import measure
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Subclasses of dict, list, str and int go through default(): orjson would
+# serialize Django's ErrorList (a UserList) as an empty list
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z | orjson.OPT_PASSTHROUGH_SUBCLASS if orjson else 0
+
+encoder = JSONEncoder()
+
+
+def contains_float(data):
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            return True
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+def default(obj):
+    if isinstance(obj, dict):
+        return dict(obj)
+    if isinstance(obj, list):
+        return list(obj)
+    if isinstance(obj, str):
+        return str.__str__(obj)
+    if isinstance(obj, int):
+        return int(obj)
+    # Types orjson doesn't know (lazy strings, Decimal, timedelta...) go through DRF's encoder
+    value = encoder.default(obj)
+    if contains_float(value):
+        # Leave floats to the stdlib renderer
+        raise TypeError("float")
+    return value
+
+
+class FastJSONRenderer(JSONRenderer):
+    default = staticmethod(default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with measure("render"):
+            return self.render_json(data, accepted_media_type, renderer_context)
+
+    def render_json(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None or contains_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits, which the stdlib encoder handles,
+            # or floats found by default()
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escape \u2028 and \u2029 like JSONRenderer so the output stays a javascript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -9,6 +9,8 @@ https://docs.djangoproject.com/en/5.0/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
+import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -40,6 +42,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.timing.ServerTimingMiddleware',
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,10 +76,38 @@ WSGI_APPLICATION = 'api.wsgi.application'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
+    # orjson based, with the same output as DRF's JSON renderer/parser
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Token buckets shared by all workers, see api.throttling
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.UserBucketThrottle',
+        'api.throttling.ScopedBucketThrottle',
+    ],
+    # Overall limits per user and per anonymous address, then the limits of
+    # the views with a throttle_scope
+    'DEFAULT_THROTTLE_RATES': {
+        'user': '1000/min',
+        'anon': '100/min',
+        'task-create': '60/min',
+        'login': '10/min',
+    },
 }
 
+# File holding the throttle buckets, mapped by every worker on this host, and
+# how many buckets it holds (24 bytes each)
+THROTTLE_FILE = None
+THROTTLE_SLOTS = 1 << 16
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
@@ -88,10 +120,86 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Trust the validated claims for IsAuthenticated instead of loading the user
+    'TRUST_TOKEN_CLAIMS': False,
+    # Per-process cache of users loaded by users.authentication.CachedJWTAuthentication
+    'USER_CACHE_TTL': 30,
+    'USER_CACHE_SIZE': 1024,
 }
 
 TEST_RUNNER = 'pytest_runner.runner.DiscoverRunner'
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Cache alias of the serialized tasks; must be shared by every worker process
+TASK_CACHE_ALIAS = 'default'
+
+# Seconds a serialized task stays in the read-through cache
+TASK_CACHE_TTL = 60 * 5
+
+# Seconds a rendered task list page stays cached. Writes through the API
+# replace pages at once; other writes show up once pages expire.
+TASK_LIST_CACHE_TTL = 60
+# Also keep a gzipped copy of each cached page for clients accepting it
+TASK_LIST_CACHE_GZIP = True
+# Cache alias of the task generation that list pages are keyed by; must be
+# shared by every worker process
+TASK_GENERATION_CACHE_ALIAS = 'default'
+
+# Days a deleted task stays in the task table before archive_tasks moves it
+TASK_ARCHIVE_RETENTION_DAYS = 30
+
+# Descriptions of at least this many bytes are stored compressed
+TASK_DESCRIPTION_COMPRESS_THRESHOLD = 8 * 1024
+
+# Seconds the change feed holds back changes, so writes that commit late
+# with an earlier updated_at are not skipped by clients already past it
+TASK_CHANGES_LAG_SECONDS = 2
+
+# Seconds a response is replayed to retries with the same Idempotency-Key
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+# Cache alias of the stored responses; must be shared by every worker process
+IDEMPOTENCY_CACHE_ALIAS = 'default'
+
+# Broker fanning task change events out to /api/async/task/events/ streams.
+# task.events.InProcessBroker only reaches streams served by the same process.
+TASK_EVENTS_BACKEND = "task.events.InProcessBroker"
+# Events kept for clients resuming with Last-Event-ID, events buffered per
+# stream before it is closed for falling behind, and seconds between heartbeats
+TASK_EVENTS_HISTORY = 1000
+TASK_EVENTS_BUFFER_SIZE = 1000
+TASK_EVENTS_HEARTBEAT = 15
+
+# Fraction of requests timed by api.timing.ServerTimingMiddleware
+SERVER_TIMING_SAMPLE_RATE = 0.01
+
+# Directory shared by the worker processes for their metrics files;
+# empty it whenever the server restarts as a whole
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'task-api-metrics'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
@@ -11,7 +11,10 @@ CORS_ALLOWED_ORIGINS = [
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'api.db.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'POOL': {'MAX_SIZE': 5},
     }
-}
\ No newline at end of file
+}
+
+TASK_SEARCH_BACKEND = 'task.search.SQLiteFTSBackend'
@@ -11,10 +11,37 @@ CORS_ALLOWED_ORIGINS = [
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'api.db.mysql',
         'NAME': 'sbertero$default',
         'USER': 'sbertero',
         'PASSWORD': 'Dearrosamery1',
         'HOST': 'sbertero.mysql.pythonanywhere-services.com',
+        # Connections go back to the pool at the end of each request
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MAX_SIZE': 10,
+            'TIMEOUT': 5,
+            # Below MySQL's wait_timeout, so the server never drops idle ones first
+            'MAX_AGE': 240,
+            'CHECK_INTERVAL': 0,
+        },
     }
-}
\ No newline at end of file
+}
+
+TASK_SEARCH_BACKEND = 'task.search.MySQLFullTextBackend'
+
+# Shared by every worker, so a write refreshes or drops the cached task for
+# all of them and only one worker loads a missing task. A write moves the
+# task generation, and so the cached list pages, for every worker too, and
+# retries with an Idempotency-Key find the stored response whichever worker
+# gets them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/0'),
+    }
+}
+
+TASK_CACHE_ALIAS = 'default'
+TASK_GENERATION_CACHE_ALIAS = 'default'
+IDEMPOTENCY_CACHE_ALIAS = 'default'
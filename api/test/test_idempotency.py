@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+from rest_framework.test import APIClient
+from users.test.fixtures import common_user, common_user_token
+
+from django.urls import reverse
+
+from api import idempotency
+from task.models import Task
+
+def make_client(common_user_token):
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + common_user_token.get("access"))
+    return client
+
+# Test that a retried create gets the first response back without creating again
+@pytest.mark.django_db
+def test_retried_create_is_replayed(common_user_token):
+    client = make_client(common_user_token)
+    url = reverse("create-task")
+    payload = {"name": "Task Name", "description": "Task Description"}
+
+    # Create the task, then retry with the same key
+    response = client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="create-1")
+    retry = client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="create-1")
+
+    # Check that the retry got the same response and no task was added
+    assert response.status_code == retry.status_code == 200
+    assert retry.content == response.content
+    assert retry["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in response
+    assert Task.objects.count() == 1
+
+    # Without the key the retry runs and fails on the duplicate name
+    assert client.post(url, payload, format="json").status_code == 400
+
+    # Check that a key reused with another body or too long is rejected
+    response = client.post(url, {**payload, "name": "Other"}, format="json", HTTP_IDEMPOTENCY_KEY="create-1")
+    assert response.status_code == 422
+    response = client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="k" * 256)
+    assert response.status_code == 400
+
+# Test that a retried edit is replayed, sync and async
+@pytest.mark.django_db
+def test_retried_edit_is_replayed(common_user_token):
+    client = make_client(common_user_token)
+    task = Task.objects.create(name="Task Name", description="Task Description")
+
+    for name in ("edit-task", "async-edit-task"):
+        url = reverse(name, kwargs={"pk": task.id})
+        payload = {"name": f"Edited by {name}", "description": "Task Description"}
+
+        # Edit the task, then retry after it changed again
+        response = client.put(url, payload, format="json", HTTP_IDEMPOTENCY_KEY=name)
+        Task.objects.filter(id=task.id).update(name="Changed meanwhile")
+        retry = client.put(url, payload, format="json", HTTP_IDEMPOTENCY_KEY=name)
+
+        # Check that the retry replayed the edit's response without editing again
+        assert retry.status_code == 200
+        assert retry.content == response.content
+        assert retry["Idempotent-Replayed"] == "true"
+        assert Task.objects.get(id=task.id).name == "Changed meanwhile"
+
+# Test that a retry waits for the request it duplicates instead of running too
+@pytest.mark.django_db
+def test_concurrent_duplicate_waits_for_first_response(common_user, common_user_token, monkeypatch):
+    client = make_client(common_user_token)
+    url = reverse("create-task")
+    payload = {"name": "Task Name", "description": "Task Description"}
+
+    # Record a first response, then mark the key as in flight again
+    first = client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="create-1")
+    cache = idempotency.get_cache()
+    cache_key = f"idempotency:{idempotency.digest(str(common_user.pk), 'POST', url, 'create-1')}"
+    entry = cache.get(cache_key)
+    cache.set(cache_key, (entry[0], None))
+
+    # The stored response arrives while the retry is waiting
+    def finish():
+        time.sleep(0.2)
+        cache.set(cache_key, entry)
+    thread = threading.Thread(target=finish)
+    thread.start()
+    retry = client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="create-1")
+    thread.join()
+    assert retry.status_code == 200
+    assert retry.content == first.content
+
+    # A retry giving up on a request that never finishes gets a conflict
+    monkeypatch.setattr(idempotency, "WAIT_TIMEOUT", 0.1)
+    cache.set(cache_key, (entry[0], None))
+    assert client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="create-1").status_code == 409
+    assert Task.objects.count() == 1
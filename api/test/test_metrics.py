@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+
+import pytest
+from rest_framework.test import APIClient
+from users.test.fixtures import common_user, common_user_token
+
+from django.test import Client
+from django.urls import reverse
+
+from api import metrics
+from task.models import Task
+
+def parse_samples(text):
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            sample, _, value = line.rpartition(" ")
+            samples[sample] = float(value)
+    return samples
+
+def increment_in_child():
+    metrics.inc("http_requests_total", 2, route="task-list", method="GET", status="200")
+
+# Test that samples survive growing the file past its initial size
+def test_store_grows(tmp_path):
+    store = metrics.MmapStore(str(tmp_path / "metrics_1.db"))
+    for i in range(5000):
+        store.inc(f"key-{i}", i)
+    store.inc("key-1", 0.5)
+
+    # Read the file back like a scrape does
+    values = dict(metrics.read_file(store.path))
+    assert len(values) == 5000
+    assert values["key-1"] == 1.5
+    assert values["key-4999"] == 4999
+
+    # Reopening the file keeps counting from the stored values
+    reopened = metrics.MmapStore(store.path)
+    reopened.inc("key-1")
+    assert dict(metrics.read_file(store.path))["key-1"] == 2.5
+
+# Test that samples of every process are added up
+def test_collect_across_processes(metrics_dir):
+    metrics.inc("http_requests_total", route="task-list", method="GET", status="200")
+
+    # Record the same sample from a forked worker process
+    process = multiprocessing.get_context("fork").Process(target=increment_in_child)
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    # Check that both processes wrote their own file and the scrape sums them
+    samples = parse_samples(metrics.render())
+    assert samples['http_requests_total{method="GET",route="task-list",status="200"}'] == 3
+
+# Test the metrics recorded for API requests
+@pytest.mark.django_db
+def test_metrics_endpoint(common_user_token):
+    task = Task.objects.create(name="Task Name", description="Task Description")
+
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + common_user_token.get("access"))
+
+    # List the tasks and read one task twice: a cache miss, then a hit
+    assert client.get(reverse("task-list")).status_code == 200
+    assert client.get(reverse("task", kwargs={"pk": task.id})).status_code == 200
+    assert client.get(reverse("task", kwargs={"pk": task.id})).status_code == 200
+    assert client.get(reverse("task", kwargs={"pk": 999})).status_code == 404
+
+    # Scrape the metrics without authentication
+    response = Client().get(reverse("metrics"))
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    samples = parse_samples(response.content.decode())
+
+    # Check the request counters and latency histogram
+    assert samples['http_requests_total{method="GET",route="task-list",status="200"}'] == 1
+    assert samples['http_requests_total{method="GET",route="task",status="200"}'] == 2
+    assert samples['http_requests_total{method="GET",route="task",status="404"}'] == 1
+    assert samples['http_request_duration_seconds_count{method="GET",route="task"}'] == 3
+    assert samples['http_request_duration_seconds_bucket{method="GET",route="task",le="+Inf"}'] == 3
+    assert samples['http_request_duration_seconds_bucket{method="GET",route="task",le="0.005"}'] <= 3
+    assert 'http_requests_total{method="GET",route="metrics",status="200"}' not in samples
+
+    # Check the query counter and cache hit ratio
+    assert samples['db_queries_total{route="task-list"}'] >= 2
+    assert samples['task_cache_lookups_total{result="hit"}'] == 1
+    assert samples['task_cache_lookups_total{result="miss"}'] == 2
+    assert samples["task_cache_hit_ratio"] == pytest.approx(1 / 3)
+
+def record_in_dead_worker():
+    metrics.inc("http_requests_total", route="task-list", method="GET", status="200")
+    metrics.inc("task_event_streams_open")
+
+# Test that workers that exited keep their counters but not their gauges
+def test_dead_worker_gauges_dropped(metrics_dir):
+    metrics.inc("task_event_streams_open")
+
+    # A worker records a request and an open stream, then dies without closing it
+    process = multiprocessing.get_context("fork").Process(target=record_in_dead_worker)
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    # Check that the scrape keeps the counter, drops the gauge and folds the file away
+    for _ in range(2):
+        samples = parse_samples(metrics.render())
+        assert samples['http_requests_total{method="GET",route="task-list",status="200"}'] == 1
+        assert samples["task_event_streams_open"] == 1
+    assert not os.path.exists(os.path.join(metrics_dir, f"metrics_{process.pid}.db"))
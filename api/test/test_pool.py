@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+from django.db import connection
+
+from api.db.pool import PoolTimeout, get_pool
+from api.db.sqlite3.base import DatabaseWrapper
+
+@pytest.fixture(autouse=True)
+def allow_database(django_db_blocker):
+    # The pooled wrappers use their own database files, not the test database
+    with django_db_blocker.unblock():
+        yield
+
+def make_wrapper(tmp_path, **pool):
+    # A file database, since Django never closes in-memory SQLite connections
+    settings_dict = {
+        **connection.settings_dict,
+        "ENGINE": "api.db.sqlite3",
+        "NAME": str(tmp_path / "pool.sqlite3"),
+        "POOL": pool,
+    }
+    return DatabaseWrapper(settings_dict, alias=f"pool-{tmp_path.name}")
+
+# Test that closing hands the connection back for the next checkout
+def test_pool_reuses_connections(tmp_path):
+    wrapper = make_wrapper(tmp_path)
+    wrapper.ensure_connection()
+    raw = wrapper.connection
+    wrapper.close()
+
+    # Reconnect and check that the same connection is reused after a ping
+    wrapper.ensure_connection()
+    assert wrapper.connection is raw
+    stats = get_pool(wrapper).snapshot()
+    assert (stats["created"], stats["reused"], stats["in_use"]) == (1, 1, 1)
+    wrapper.close()
+    assert get_pool(wrapper).snapshot()["idle"] == 1
+
+# Test that a full pool makes checkouts wait, then time out
+def test_pool_size_is_bounded(tmp_path):
+    first = make_wrapper(tmp_path, MAX_SIZE=1, TIMEOUT=0.05)
+    second = make_wrapper(tmp_path, MAX_SIZE=1, TIMEOUT=0.05)
+    first.ensure_connection()
+
+    # The second checkout gives up after the timeout
+    with pytest.raises(PoolTimeout):
+        second.ensure_connection()
+    stats = get_pool(first).snapshot()
+    assert (stats["waits"], stats["timeouts"], stats["size"]) == (1, 1, 1)
+    first.close()
+
+# Test that a waiting checkout gets the connection once it is returned
+def test_pool_wakes_up_waiting_checkout(tmp_path):
+    first = make_wrapper(tmp_path, MAX_SIZE=1, TIMEOUT=5)
+    second = make_wrapper(tmp_path, MAX_SIZE=1, TIMEOUT=5)
+    first.ensure_connection()
+    raw = first.connection
+
+    # Return the connection from another thread while the second one waits
+    def release():
+        time.sleep(0.05)
+        first.inc_thread_sharing()
+        first.close()
+    thread = threading.Thread(target=release)
+    thread.start()
+    second.ensure_connection()
+    thread.join()
+
+    # Check that the second wrapper got the connection the first returned
+    assert second.connection is raw
+    assert get_pool(second).snapshot()["waits"] == 1
+    second.close()
+
+# Test that broken and expired connections are replaced on checkout
+def test_pool_replaces_unusable_connections(tmp_path):
+    wrapper = make_wrapper(tmp_path)
+    wrapper.ensure_connection()
+    raw = wrapper.connection
+    # Break the connection behind Django's back, then return it
+    raw.close()
+    wrapper.close()
+
+    # The failed health check replaces it with a new connection
+    wrapper.ensure_connection()
+    assert wrapper.connection is not raw
+    with wrapper.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    wrapper.close()
+
+    # With a zero MAX_AGE every checkout opens a new connection
+    (tmp_path / "expiring").mkdir()
+    expiring = make_wrapper(tmp_path / "expiring", MAX_AGE=0)
+    expiring.ensure_connection()
+    raw = expiring.connection
+    expiring.close()
+    expiring.ensure_connection()
+    assert expiring.connection is not raw
+    stats = get_pool(expiring).snapshot()
+    assert (stats["created"], stats["discarded"], stats["size"]) == (2, 1, 1)
+    expiring.close()
+
+# Test that an open transaction is rolled back before the connection is reused
+def test_pool_rolls_back_returned_connections(tmp_path):
+    wrapper = make_wrapper(tmp_path)
+    with wrapper.cursor() as cursor:
+        cursor.execute("CREATE TABLE item (name TEXT)")
+
+    # Insert a row without committing and return the connection
+    wrapper.set_autocommit(False)
+    with wrapper.cursor() as cursor:
+        cursor.execute("INSERT INTO item VALUES ('uncommitted')")
+    wrapper.close()
+
+    # Check that the reused connection doesn't see the row
+    with wrapper.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM item")
+        assert cursor.fetchone() == (0,)
+    assert wrapper.get_autocommit()
+    wrapper.close()
+
+# Test that in-memory databases, which are never closed, don't take pool slots
+def test_in_memory_database_not_pooled(tmp_path):
+    settings_dict = {
+        **connection.settings_dict,
+        "ENGINE": "api.db.sqlite3",
+        "NAME": ":memory:",
+        "POOL": {"MAX_SIZE": 1, "TIMEOUT": 0.1},
+    }
+    wrappers = [DatabaseWrapper(settings_dict, alias=f"memory-{tmp_path.name}") for _ in range(3)]
+
+    # More connections than the pool holds open without waiting for a slot
+    for wrapper in wrappers:
+        wrapper.ensure_connection()
+    assert get_pool(wrappers[0]).snapshot()["size"] == 0
+    for wrapper in wrappers:
+        wrapper.close()
@@ -0,0 +1,74 @@
+import datetime
+import decimal
+from collections import OrderedDict
+from io import BytesIO
+
+import pytest
+from django.forms.utils import ErrorDict, ErrorList
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import JSONParser
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+# Payloads covering the types our views render
+PAYLOADS = [
+    None,
+    {},
+    [],
+    {"task": {"id": 1, "name": "Task Name", "description": "Task Description", "date_crated": "2024-02-18T05:49:00.123456Z"}},
+    {"date": datetime.datetime(2024, 2, 18, 5, 49, 0, 123456, tzinfo=datetime.timezone.utc)},
+    {"date": datetime.datetime(2024, 2, 18, 5, 49, tzinfo=datetime.timezone(datetime.timedelta(hours=-3)))},
+    {"date": datetime.datetime(2024, 2, 18, 5, 49), "day": datetime.date(2024, 2, 18)},
+    {"name": "Tâche ✓ 任务     \"quoted\" \\ \n"},
+    {"lazy": gettext_lazy("Task does not exist"), "amount": decimal.Decimal("1.50")},
+    {1: "int key", "nested": OrderedDict([("b", [1, 2.5, True, None]), ("a", {})])},
+    {"big": 2 ** 70},
+    {"errors": ErrorDict({"created_after": ErrorList(["Enter a valid date/time."])})},
+    {"detail": ErrorDetail("Not found.", code="not_found"), "count": True},
+    {"small": 1e-07, "large": 1e16, "plain": 0.1, "amount": decimal.Decimal("2.5")},
+]
+
+# Test that the fast renderer produces exactly the bytes of DRF's renderer
+@pytest.mark.parametrize("data", PAYLOADS)
+def test_fast_renderer_matches_json_renderer(data):
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+# Test that NaN and infinities are refused like DRF's renderer does
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), -float("inf")])
+def test_fast_renderer_rejects_non_finite_floats(value):
+    with pytest.raises(ValueError):
+        JSONRenderer().render({"value": value})
+    with pytest.raises(ValueError):
+        FastJSONRenderer().render({"value": [value]})
+
+# Test that indented output still goes through the stdlib renderer
+def test_fast_renderer_with_indent():
+    data = {"task": {"id": 1, "name": "Task Name"}}
+    media_type = "application/json; indent=4"
+    assert FastJSONRenderer().render(data, media_type) == JSONRenderer().render(data, media_type)
+
+# Test that the renderer falls back to the stdlib when orjson is missing
+def test_fast_renderer_without_orjson(monkeypatch):
+    monkeypatch.setattr(renderers, "orjson", None)
+    data = {"task": {"id": 1, "name": "Task Name"}}
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+# Test that the fast parser reads the same data as DRF's parser
+@pytest.mark.parametrize("body", [b'{"name": "T\\u00e2che", "ids": [1, 2]}', b'[]', b'{"big": 1180591620717411303424}'])
+def test_fast_parser_matches_json_parser(body):
+    assert FastJSONParser().parse(BytesIO(body)) == JSONParser().parse(BytesIO(body))
+
+# Test that the fast parser rejects invalid JSON and non strict constants
+@pytest.mark.parametrize("body", [b'{"name": ', b'{"value": NaN}'])
+def test_fast_parser_with_invalid_json(body):
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(BytesIO(body))
+
+# Test that the parser falls back to the stdlib when orjson is missing
+def test_fast_parser_without_orjson(monkeypatch):
+    monkeypatch.setattr(parsers, "orjson", None)
+    assert FastJSONParser().parse(BytesIO(b'{"name": "Task Name"}')) == {"name": "Task Name"}
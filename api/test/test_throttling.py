@@ -0,0 +1,74 @@
+import multiprocessing
+
+import pytest
+from rest_framework.test import APIClient
+from users.test.fixtures import common_user, common_user_token
+
+from django.urls import reverse
+
+from api import throttling
+from task.models import Task
+
+def drain_in_child(path):
+    store = throttling.BucketStore(path, 16)
+    for _ in range(3):
+        store.take("user:1", 3, 60)
+
+# Test that a bucket refills at its rate and holds at most its size
+def test_bucket_refills_at_rate(tmp_path):
+    store = throttling.BucketStore(str(tmp_path / "throttle.db"), 16)
+
+    # Three tokens a minute: three requests pass, the fourth waits for a refill
+    assert [store.take("user:1", 3, 60, now=0) for _ in range(3)] == [0, 0, 0]
+    assert store.take("user:1", 3, 60, now=0) == 20
+    assert store.take("user:1", 3, 60, now=20) == 0
+
+    # Other keys have their own bucket, and an idle bucket fills up to its size only
+    assert store.take("user:2", 3, 60, now=0) == 0
+    assert [store.take("user:2", 3, 60, now=1000) for _ in range(4)] == [0, 0, 0, 20]
+
+# Test that worker processes share the buckets through the file
+def test_buckets_shared_across_processes(tmp_path):
+    path = str(tmp_path / "throttle.db")
+    process = multiprocessing.get_context("fork").Process(target=drain_in_child, args=(path,))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert throttling.BucketStore(path, 16).take("user:1", 3, 60) > 0
+
+# Test that creating tasks past the route limit is refused, sync and async
+@pytest.mark.django_db
+def test_create_task_throttled(common_user_token, settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {**settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], "task-create": "2/min"},
+    }
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + common_user_token.get("access"))
+
+    # Two creates pass, then both create views answer 429 with Retry-After
+    for i in range(2):
+        response = client.post(reverse("create-task"), {"name": f"Task {i}", "description": "Task"}, format="json")
+        assert response.status_code == 200
+    for name in ("create-task", "async-create-task"):
+        response = client.post(reverse(name), {"name": "Task 2", "description": "Task"}, format="json")
+        assert response.status_code == 429
+        assert int(response["Retry-After"]) == 30
+    assert Task.objects.count() == 2
+
+    # Other routes only count against the overall user limit
+    assert client.get(reverse("task-list")).status_code == 200
+
+# Test that login attempts are limited per address
+@pytest.mark.django_db
+def test_login_throttled(common_user, settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {**settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], "login": "1/min"},
+    }
+    client = APIClient()
+    payload = {"username": "FOO", "password": "wrong"}
+    assert client.post(reverse("login"), payload, format="json").status_code == 401
+    response = client.post(reverse("login"), payload, format="json")
+    assert response.status_code == 429
+    assert "Retry-After" in response
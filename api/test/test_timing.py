@@ -0,0 +1,102 @@
+import logging
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework.test import APIClient
+from users.test.fixtures import common_user, common_user_token
+
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.timing import current_timings, measure
+from task.models import Task
+
+def parse_server_timing(header):
+    metrics = {}
+    for metric in header.split(", "):
+        name, _, params = metric.partition(";")
+        metrics[name] = dict(re.findall(r'(\w+)="?([^;"]*)"?', params))
+    return metrics
+
+# Test that a sampled request reports where its time went
+@pytest.mark.django_db
+def test_server_timing_header(common_user_token, settings):
+    settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+    Task.objects.create(name="Task Name", description="Task Description")
+
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + common_user_token.get("access"))
+
+    # Make GET request to list tasks, counting its queries
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("task-list"))
+    assert response.status_code == 200
+
+    # Check every metric and the query count
+    metrics = parse_server_timing(response["Server-Timing"])
+    assert list(metrics) == ["db", "auth", "serialize", "render", "total"]
+    assert metrics["db"]["desc"] == f"{len(queries)} queries"
+    durations = {name: float(metric["dur"]) for name, metric in metrics.items()}
+    assert durations["total"] >= max(durations["db"], durations["auth"], durations["render"])
+
+# Test that unsampled requests are not timed
+@pytest.mark.django_db
+def test_server_timing_not_sampled(common_user_token, settings):
+    settings.SERVER_TIMING_SAMPLE_RATE = 0.0
+
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + common_user_token.get("access"))
+
+    # Make GET request to list tasks
+    response = client.get(reverse("task-list"))
+    assert response.status_code == 200
+    assert "Server-Timing" not in response
+
+# Test the log line written for a sampled request
+@pytest.mark.django_db
+def test_server_timing_log_line(common_user_token, settings, caplog):
+    settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + common_user_token.get("access"))
+
+    # Make GET request to list tasks
+    with caplog.at_level(logging.INFO, logger="api.timing"):
+        response = client.get(reverse("task-list"))
+    assert response.status_code == 200
+
+    # Check the message and the structured fields
+    record, = [record for record in caplog.records if record.name == "api.timing"]
+    assert record.getMessage().startswith("GET /api/task/list/ 200 db_ms=")
+    assert record.status == 200
+    assert record.timings["queries"] >= 1
+    assert set(record.timings) >= {"db_ms", "auth_ms", "serialize_ms", "render_ms", "total_ms"}
+
+# Test timing the async views under the ASGI handler
+@pytest.mark.django_db(transaction=True)
+def test_server_timing_async_view(common_user_token, settings):
+    settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+    Task.objects.create(name="Task Name", description="Task Description")
+
+    # Make GET request to the async list view through the ASGI handler
+    client = AsyncClient()
+    headers = {"Authorization": "Bearer " + common_user_token.get("access")}
+    response = async_to_sync(client.get)(reverse("async-task-list"), headers=headers)
+    assert response.status_code == 200
+
+    # Check that the queries run by the async ORM were counted
+    metrics = parse_server_timing(response["Server-Timing"])
+    assert int(metrics["db"]["desc"].split()[0]) >= 2
+    assert float(metrics["serialize"]["dur"]) >= 0
+
+# Test that measuring outside a sampled request does nothing
+def test_measure_without_request():
+    with measure("serialize"):
+        pass
+    assert current_timings.get() is None
@@ -0,0 +1,138 @@
+"""
+Token-bucket throttles whose state is shared by every worker process.
+
+Buckets are kept with GCRA (the generic cell rate algorithm): a bucket is a
+single timestamp, the time it would be full again, so checking and taking a
+token is one read-modify-write of one slot. Slots live in a memory-mapped
+file at ``THROTTLE_FILE`` that every worker maps, and each update holds a
+byte-range lock on its slot only, so requests never make a cache round trip
+and only requests hashing to the same slot wait for each other.
+
+The file holds ``THROTTLE_SLOTS`` slots of a 16-byte key digest followed by
+an 8-byte double. A key is stored in the slot its digest points to; a key
+finding another key in its slot takes the slot over with a full bucket, so
+size the file well above the number of clients active within a period.
+Rates use DRF's ``DEFAULT_THROTTLE_RATES``: ``"100/min"`` refills 100 tokens
+a minute into a bucket holding 100.
+"""
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+SLOT = struct.Struct("16sd")
+
+DURATIONS = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """Return ``(tokens, seconds)`` for a rate like ``"100/min"``, or None for no limit."""
+    if rate is None:
+        return None
+    tokens, period = rate.split("/")
+    return int(tokens), DURATIONS[period[0]]
+
+
+class BucketStore:
+    """GCRA buckets in a memory-mapped file shared across processes."""
+
+    def __init__(self, path, slots):
+        self.path = path
+        self.slots = slots
+        # fcntl locks belong to the process, so threads also take this one
+        self.lock = threading.Lock()
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = slots * SLOT.size
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.mm = mmap.mmap(self.fd, size)
+
+    def take(self, key, tokens, period, now=None):
+        """
+        Take a token from the bucket of ``key`` and return 0, or return the
+        seconds until one is available, taking nothing.
+        """
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        offset = int.from_bytes(digest[:8], "little") % self.slots * SLOT.size
+        interval = period / tokens
+        with self.lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, SLOT.size, offset)
+            try:
+                now = time.time() if now is None else now
+                stored, full_at = SLOT.unpack_from(self.mm, offset)
+                if stored != digest:
+                    full_at = now
+                full_at = max(full_at, now) + interval
+                if full_at - now > period:
+                    return full_at - now - period
+                SLOT.pack_into(self.mm, offset, digest, full_at)
+                return 0
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, SLOT.size, offset)
+
+
+def get_throttle_file():
+    return getattr(settings, "THROTTLE_FILE", None) or os.path.join(tempfile.gettempdir(), "task-api-throttle.db")
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    path = get_throttle_file()
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = BucketStore(path, getattr(settings, "THROTTLE_SLOTS", 1 << 16))
+    return store
+
+
+class BucketThrottle(BaseThrottle):
+    """Token bucket of the rate named by ``scope`` in ``DEFAULT_THROTTLE_RATES``."""
+    scope = None
+
+    def get_scope(self, request, view):
+        return self.scope
+
+    def get_ident(self, request):
+        # Users are throttled by account, anonymous clients by address
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"addr:{super().get_ident(request)}"
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        scope = self.get_scope(request, view)
+        rate = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(scope)) if scope else None
+        if rate is None:
+            return True
+        self.wait_seconds = get_store().take(f"{scope}:{self.get_ident(request)}", *rate)
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserBucketThrottle(BucketThrottle):
+    """Overall limit of each user, or of each address for anonymous requests."""
+
+    def get_scope(self, request, view):
+        return "user" if request.user and request.user.is_authenticated else "anon"
+
+
+class ScopedBucketThrottle(BucketThrottle):
+    """Limit of each user or address on the views sharing a ``throttle_scope``."""
+
+    def get_scope(self, request, view):
+        return getattr(view, "throttle_scope", None)
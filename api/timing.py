@@ -0,0 +1,167 @@
+"""
+Per-request breakdown of where the time went, reported in a ``Server-Timing``
+header and a log line.
+
+A sampled request gets a ``RequestTimings`` in a context variable. Code that
+wants its time reported wraps itself in ``measure(name)``. Every query is
+counted by a wrapper added to each connection's ``execute_wrappers``, the
+list ``connection.execute_wrapper()`` appends to. Unsampled requests only pay
+for a context variable lookup at each of those points.
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("api.timing")
+
+# Metrics in the order they are reported; anything else measured follows them
+METRICS = ["db", "auth", "serialize", "render"]
+
+current_timings = ContextVar("current_timings", default=None)
+
+
+class RequestTimings:
+
+    def __init__(self):
+        self.durations = dict.fromkeys(METRICS, 0.0)
+        self.queries = 0
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def header(self):
+        metrics = []
+        for name, seconds in self.durations.items():
+            metric = f"{name};dur={seconds * 1000:.1f}"
+            if name == "db":
+                metric += f';desc="{self.queries} queries"'
+            metrics.append(metric)
+        return ", ".join(metrics)
+
+    def log_fields(self):
+        fields = {f"{name}_ms": round(seconds * 1000, 1) for name, seconds in self.durations.items()}
+        fields["queries"] = self.queries
+        return fields
+
+
+@contextmanager
+def measure(name):
+    """Add the time spent in the block to the current request's ``name`` metric."""
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def record_query(execute, sql, params, many, context):
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add("db", time.perf_counter() - start)
+        timings.queries += 1
+
+
+def instrument(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def instrument_connections():
+    # Connections are per thread, so this covers the calling thread only
+    for connection in connections.all(initialized_only=True):
+        instrument(connection)
+
+
+def instrument_new_connection(sender, connection, **kwargs):
+    instrument(connection)
+
+
+connection_created.connect(instrument_new_connection)
+
+
+def get_sample_rate():
+    return getattr(settings, "SERVER_TIMING_SAMPLE_RATE", 0.0)
+
+
+class ServerTimingMiddleware:
+    """
+    Time a sample of requests, adding ``Server-Timing`` to their responses
+    and logging one line per request to the ``api.timing`` logger.
+
+    ``total`` covers the middleware below this one and the view, but not
+    streaming a ``StreamingHttpResponse`` body.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        instrument_connections()
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        timings.add("total", time.perf_counter() - start)
+        return self.report(request, response, timings)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        # Sync ORM calls from async views run in the thread sync_to_async uses
+        await sync_to_async(instrument_connections)()
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        timings.add("total", time.perf_counter() - start)
+        return self.report(request, response, timings)
+
+    def sampled(self):
+        rate = get_sample_rate()
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def report(self, request, response, timings):
+        response["Server-Timing"] = timings.header()
+        fields = timings.log_fields()
+        logger.info(
+            "%s %s %s %s",
+            request.method,
+            request.path,
+            response.status_code,
+            " ".join(f"{name}={value}" for name, value in fields.items()),
+            extra={"timings": fields, "method": request.method, "path": request.path, "status": response.status_code},
+        )
+        return response
@@ -5,6 +5,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from api.metrics import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Tasks API",
@@ -27,6 +29,8 @@ urlpatterns = [
         name="schema-redoc",
     ),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/', include('task.urls')),
+    path('api/async/', include('task.async_urls')),
     path('api/', include('users.urls')),
 ]
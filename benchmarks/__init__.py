@@ -0,0 +1,88 @@
+"""
+In-process benchmarks for the task API.
+
+Each module is a script run from the repository root, for example::
+
+    python -m benchmarks.async_views --tasks 1000 --requests 2000
+
+They run against a throwaway test database so they never touch ``db.sqlite3``.
+"""
+import configparser
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def pytest_settings_module():
+    """Benchmarks run with the same settings as the test suite."""
+    config = configparser.ConfigParser()
+    config.read(ROOT_DIR / "pytest.ini")
+    return config.get("pytest", "DJANGO_SETTINGS_MODULE", fallback="api.settings.local_settings")
+
+
+def setup_django(settings_module=None):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module or pytest_settings_module())
+    import django
+    django.setup()
+
+    # Benchmarks send far more requests per user than the throttle rates allow
+    from django.conf import settings
+    from rest_framework.settings import api_settings
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}}
+    api_settings.reload()
+
+
+@contextmanager
+def benchmark_database():
+    """Create and migrate a test database, destroying it on exit."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def create_user_token(username="bench"):
+    """Create a user and return it with a valid access token."""
+    from django.contrib.auth import get_user_model
+    from users.test.fixtures import generate_access_token
+
+    user = get_user_model().objects.create_user(username=username, password="123456789")
+    return user, generate_access_token(user)
+
+
+def seed_tasks(count, description="Task Description", start=0):
+    """Create tasks ``start`` to ``count - 1`` and return the ids of every task."""
+    from task.models import Task
+
+    Task.objects.bulk_create(
+        (Task(name=f"Task {i}", description=description) for i in range(start, count)),
+        batch_size=1000,
+    )
+    return list(Task.objects.values_list("id", flat=True))
+
+
+@contextmanager
+def timer():
+    """Yield a dict whose ``seconds`` key is filled in when the block ends."""
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)).rstrip())
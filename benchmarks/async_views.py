@@ -0,0 +1,86 @@
+"""
+Compare requests/sec of the synchronous DRF views with the native async views.
+
+The sync path goes through the WSGI handler from a pool of threads, the async
+path through the ASGI handler with concurrent coroutines, both in-process and
+against the same seeded database::
+
+    python -m benchmarks.async_views --tasks 1000 --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import benchmark_database, create_user_token, print_table, seed_tasks, setup_django, timer
+
+
+def run_wsgi(url_for, requests, concurrency, token):
+    from django.test import Client
+
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def fetch(i):
+        response = client.get(url_for(i))
+        assert response.status_code == 200, (response.status_code, response.content)
+
+    with timer() as result:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(fetch, range(requests)))
+    return result["seconds"]
+
+
+def run_asgi(url_for, requests, concurrency, token):
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    headers = {"Authorization": f"Bearer {token}"}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(i):
+        async with semaphore:
+            response = await client.get(url_for(i), headers=headers)
+            assert response.status_code == 200, (response.status_code, response.content)
+
+    async def main():
+        await asyncio.gather(*(fetch(i) for i in range(requests)))
+
+    with timer() as result:
+        asyncio.run(main())
+    return result["seconds"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.urls import reverse
+
+    with benchmark_database():
+        _, token = create_user_token()
+        ids = seed_tasks(args.tasks)
+        picks = [random.choice(ids) for _ in range(args.requests)]
+
+        endpoints = [
+            ("list", lambda i: reverse("task-list"), lambda i: reverse("async-task-list")),
+            (
+                "detail",
+                lambda i: reverse("task", kwargs={"pk": picks[i]}),
+                lambda i: reverse("async-task", kwargs={"pk": picks[i]}),
+            ),
+        ]
+        rows = []
+        for name, sync_url, async_url in endpoints:
+            for path, run, url_for in (("wsgi", run_wsgi, sync_url), ("asgi", run_asgi, async_url)):
+                seconds = run(url_for, args.requests, args.concurrency, token)
+                rows.append((name, path, args.requests, f"{seconds:.2f}", f"{args.requests / seconds:.0f}"))
+
+    print_table(("endpoint", "path", "requests", "seconds", "req/s"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Count queries and time per request for each JWT authentication mode::
+
+    python -m benchmarks.auth_queries --requests 500
+
+``stock`` is simplejwt's JWTAuthentication, ``cached`` resolves users through
+the per-process cache, ``trusted`` relies on the token claims alone.
+"""
+import argparse
+from unittest import mock
+
+from benchmarks import benchmark_database, create_user_token, print_table, seed_tasks, setup_django, timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext, override_settings
+    from django.urls import reverse
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    from task.views import GetTaskView, TaskListView
+    from users.authentication import CachedJWTAuthentication, user_cache
+
+    modes = [
+        ("stock", JWTAuthentication, False),
+        ("cached", CachedJWTAuthentication, False),
+        ("trusted", CachedJWTAuthentication, True),
+    ]
+
+    with benchmark_database():
+        _, token = create_user_token()
+        pk = seed_tasks(args.tasks)[0]
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+        endpoints = [
+            ("list", TaskListView, reverse("task-list")),
+            ("detail", GetTaskView, reverse("task", kwargs={"pk": pk})),
+        ]
+
+        rows = []
+        for endpoint, view, url in endpoints:
+            for mode, authentication_class, trusted in modes:
+                user_cache.clear()
+                simple_jwt = {**settings.SIMPLE_JWT, "TRUST_TOKEN_CLAIMS": trusted}
+                with override_settings(SIMPLE_JWT=simple_jwt), \
+                        mock.patch.object(view, "authentication_classes", [authentication_class]):
+                    with CaptureQueriesContext(connection) as queries, timer() as result:
+                        for _ in range(args.requests):
+                            assert client.get(url).status_code == 200
+                rows.append((
+                    endpoint,
+                    mode,
+                    f"{len(queries) / args.requests:.2f}",
+                    f"{result['seconds'] / args.requests * 1000:.2f}",
+                ))
+
+    print_table(("endpoint", "auth", "queries/req", "ms/req"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Compare storing large task descriptions raw and compressed::
+
+    python -m benchmarks.descriptions --tasks 500 --size 200
+
+Seeds tasks with log-like descriptions of ``--size`` KB, once with
+compression turned off and once with the configured threshold, and reports
+the bytes stored in the description columns with the time to insert a task,
+load one, and format a list page with full descriptions or only previews.
+"""
+import argparse
+import random
+import statistics
+
+from benchmarks import benchmark_database, print_table, setup_django, timer
+
+PAGE_SIZE = 50
+
+
+def log_description(size, seed):
+    """Return about ``size`` bytes of log lines, varying like a real log."""
+    rng = random.Random(seed)
+    levels = ("DEBUG", "INFO", "WARNING", "ERROR")
+    lines = []
+    length = 0
+    while length < size:
+        line = (
+            f"2024-02-18 05:{rng.randrange(60):02d}:{rng.randrange(60):02d}.{rng.randrange(1000):03d} "
+            f"{rng.choice(levels)} worker-{rng.randrange(32)} request {rng.getrandbits(64):016x} "
+            f"took {rng.randrange(5000)}ms status={rng.choice((200, 201, 404, 500))}"
+        )
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def median_ms(repeat, func):
+    durations = []
+    for _ in range(repeat):
+        with timer() as result:
+            func()
+        durations.append(result["seconds"] * 1000)
+    return statistics.median(durations)
+
+
+def run_mode(args, descriptions):
+    from task.fastpath import get_plan
+    from task.models import Task
+
+    tasks = [Task(name=f"Task {i}", description=description) for i, description in enumerate(descriptions)]
+    with timer() as insert:
+        Task.objects.bulk_create(tasks, batch_size=100)
+
+    stored = sum(
+        len(description.encode("utf-8")) + len(compressed or b"") + len(preview.encode("utf-8"))
+        + len(search.encode("utf-8"))
+        for description, compressed, preview, search in Task.objects.values_list(
+            "description", "description_compressed", "description_preview", "description_search"
+        ).iterator()
+    )
+
+    ids = list(Task.objects.values_list("id", flat=True))
+    rng = random.Random(0)
+    detail = median_ms(args.rounds, lambda: Task.objects.get(id=rng.choice(ids)).description)
+
+    plan = get_plan()
+    full_list = median_ms(
+        args.rounds,
+        lambda: [plan.format(row) for row in Task.objects.values(*plan.columns)[:PAGE_SIZE]],
+    )
+    preview_plan = get_plan(("id", "name", "description_preview"))
+    preview_list = median_ms(
+        args.rounds,
+        lambda: [preview_plan.format(row) for row in Task.objects.values(*preview_plan.columns)[:PAGE_SIZE]],
+    )
+
+    Task.objects.all().delete()
+    return (
+        f"{stored / 1024 / 1024:.1f}",
+        f"{insert['seconds'] / len(tasks) * 1000:.2f}",
+        f"{detail:.2f}",
+        f"{full_list:.1f}",
+        f"{preview_list:.2f}",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--size", type=int, default=200, help="KB of text per description")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test.utils import override_settings
+
+    from task.compression import get_threshold
+
+    descriptions = [log_description(args.size * 1024, seed) for seed in range(args.tasks)]
+    modes = (
+        # A threshold no description reaches stores every one raw
+        ("raw", float("inf")),
+        ("compressed", get_threshold()),
+    )
+    rows = []
+    with benchmark_database():
+        for mode, threshold in modes:
+            with override_settings(TASK_DESCRIPTION_COMPRESS_THRESHOLD=threshold):
+                rows.append((mode, *run_mode(args, descriptions)))
+
+    print_table(("storage", "stored MB", "insert ms/task", "detail ms", "list page ms", "preview page ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Drive a running server with a mix of task and auth requests and report
+throughput and latency percentiles per endpoint::
+
+    python manage.py migrate
+    python manage.py seed --users 20 --tasks 1000000
+    python manage.py runserver --noreload 8000          # or any WSGI/ASGI server
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --concurrency 32 --duration 60
+
+``api/wsgi.py`` and ``api/asgi.py`` can be served by whichever server runs in
+production, e.g. ``gunicorn api.wsgi -w 4`` or ``uvicorn api.asgi:application
+--workers 4``. Pass ``--async-views`` to send the task requests that have a
+native async version to ``/api/async/`` instead.
+
+The local settings run with DEBUG on, which keeps every query in memory;
+numbers meant for a release should come from settings with DEBUG off.
+The server enforces the throttle rates of ``REST_FRAMEWORK``, so raise them
+for the run or the requests past them are answered with 429.
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from benchmarks import print_table
+
+# Upper bounds of the histogram buckets, in ms
+BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")]
+
+DEFAULT_MIX = "list=35,detail=30,search=10,create=5,edit=5,verify=10,login=5"
+
+SEARCH_TERMS = ["seed", "lorem", "ipsum", "dolor", "task 1", "amet"]
+
+
+class Recorder:
+    """Latencies and errors per endpoint, shared by the worker threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, milliseconds, ok):
+        with self.lock:
+            self.latencies[endpoint].append(milliseconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+
+class Worker(threading.Thread):
+    """Sends requests on one keep-alive connection until ``deadline``."""
+
+    def __init__(self, options, users, task_ids, recorder, deadline):
+        super().__init__(daemon=True)
+        self.options = options
+        self.users = users
+        self.task_ids = task_ids
+        self.recorder = recorder
+        self.deadline = deadline
+        self.random = random.Random()
+        self.connection = None
+        self.next_page = None
+        self.created = []
+        self.scenarios, self.weights = zip(*options.mix.items())
+
+    def run(self):
+        while time.monotonic() < self.deadline:
+            scenario = self.random.choices(self.scenarios, self.weights)[0]
+            getattr(self, f"do_{scenario}")()
+
+    def request(self, endpoint, method, path, body=None, token=None, ok_status=(200,)):
+        headers = {"Accept": "application/json"}
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        if token is not None:
+            headers["Authorization"] = f"Bearer {token}"
+
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.options.host, self.options.port, timeout=30)
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            ok = response.status in ok_status
+        except (OSError, http.client.HTTPException):
+            # Reconnect on the next request
+            self.connection.close()
+            self.connection = None
+            data, ok = None, False
+        self.recorder.record(endpoint, (time.perf_counter() - start) * 1000, ok)
+
+        if ok and data:
+            return json.loads(data)
+        return None
+
+    def task_path(self, path):
+        prefix = "/api/async/" if self.options.async_views else "/api/"
+        return prefix + path
+
+    @property
+    def token(self):
+        return self.random.choice(self.users)["access"]
+
+    def do_list(self):
+        # Walk a few pages deep, then start over from the first page
+        path = self.next_page or self.task_path("task/list/")
+        data = self.request("list", "GET", path, token=self.token)
+        next_link = data and data["next"]
+        if next_link and self.random.random() < 0.8:
+            parts = urlsplit(next_link)
+            self.next_page = f"{parts.path}?{parts.query}"
+        else:
+            self.next_page = None
+
+    def do_detail(self):
+        pk = self.random.choice(self.task_ids)
+        self.request("detail", "GET", self.task_path(f"task/{pk}/detail/"), token=self.token)
+
+    def do_search(self):
+        term = self.random.choice(SEARCH_TERMS).replace(" ", "+")
+        self.request("search", "GET", f"/api/task/search/?q={term}", token=self.token)
+
+    def do_create(self):
+        body = {"name": f"Load test {uuid.uuid4().hex}", "description": "Created by the load test"}
+        data = self.request("create", "POST", self.task_path("task/create/"), body=body, token=self.token)
+        if data:
+            self.created.append(data["data"]["id"])
+
+    def do_edit(self):
+        if not self.created:
+            return self.do_create()
+        pk = self.random.choice(self.created)
+        body = {"name": f"Load test {uuid.uuid4().hex}", "description": "Edited by the load test"}
+        self.request("edit", "PUT", self.task_path(f"task/{pk}/edit/"), body=body, token=self.token)
+
+    def do_verify(self):
+        self.request("verify", "GET", "/api/auth/verify-token/", token=self.token)
+
+    def do_login(self):
+        user = self.random.choice(self.users)
+        body = {"username": user["username"], "password": self.options.password}
+        self.request("login", "POST", "/api/auth/login/", body=body)
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if not hasattr(Worker, f"do_{name}"):
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def collect_task_ids(options, users, pages):
+    """Gather ids of active tasks from the first list pages, for detail requests."""
+    worker = Worker(options, users, [], Recorder(), deadline=0)
+    ids = []
+    path = "/api/task/list/?page_size=500"
+    for _ in range(pages):
+        data = worker.request("warmup", "GET", path, token=users[0]["access"])
+        if not data:
+            break
+        ids.extend(task["id"] for task in data["tasks"])
+        if not data["next"]:
+            break
+        parts = urlsplit(data["next"])
+        path = f"{parts.path}?{parts.query}"
+    return ids
+
+
+def print_report(recorder, elapsed):
+    rows = []
+    everything = []
+    for endpoint, latencies in sorted(recorder.latencies.items()):
+        ordered = sorted(latencies)
+        everything.extend(ordered)
+        rows.append(summary_row(endpoint, ordered, recorder.errors[endpoint], elapsed))
+    everything.sort()
+    rows.append(summary_row("all", everything, sum(recorder.errors.values()), elapsed))
+    print_table(("endpoint", "requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms", "max ms"), rows)
+
+    print()
+    print("latency histogram (all endpoints)")
+    counts = [0] * len(BUCKETS)
+    for latency in everything:
+        counts[next(i for i, bound in enumerate(BUCKETS) if latency <= bound)] += 1
+    widest = max(counts)
+    lower = 0
+    for bound, count in zip(BUCKETS, counts):
+        label = f"{lower:g}-{bound:g} ms" if bound != float("inf") else f">{lower:g} ms"
+        bar = "#" * round(count / widest * 50) if widest else ""
+        print(f"{label:>14}  {count:>8}  {bar}".rstrip())
+        lower = bound
+
+
+def summary_row(endpoint, ordered, errors, elapsed):
+    if not ordered:
+        return (endpoint, 0, errors, "0.0", "-", "-", "-", "-")
+    return (
+        endpoint,
+        len(ordered),
+        errors,
+        f"{len(ordered) / elapsed:.1f}",
+        f"{percentile(ordered, 0.50):.1f}",
+        f"{percentile(ordered, 0.95):.1f}",
+        f"{percentile(ordered, 0.99):.1f}",
+        f"{ordered[-1]:.1f}",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--credentials", default="loadtest_users.json",
+                        help="file written by the seed management command")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help=f"scenario weights, default {DEFAULT_MIX}")
+    parser.add_argument("--async-views", action="store_true")
+    parser.add_argument("--id-pages", type=int, default=20,
+                        help="list pages of 500 read for task ids to request")
+    options = parser.parse_args()
+
+    url = urlsplit(options.url)
+    options.host, options.port = url.hostname, url.port or 80
+    with open(options.credentials) as f:
+        credentials = json.load(f)
+    options.password = credentials["password"]
+    users = credentials["users"]
+
+    task_ids = collect_task_ids(options, users, options.id_pages)
+    if not task_ids:
+        parser.error(f"no tasks found at {options.url}, is the server up and seeded?")
+
+    recorder = Recorder()
+    start = time.monotonic()
+    deadline = start + options.duration
+    workers = [Worker(options, users, task_ids, recorder, deadline) for _ in range(options.concurrency)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    print_report(recorder, time.monotonic() - start)
+
+
+if __name__ == "__main__":
+    main()
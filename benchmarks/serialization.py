@@ -0,0 +1,49 @@
+"""
+Compare TaskSerializer with the serializer-free fast path on the same rows::
+
+    python -m benchmarks.serialization --tasks 5000 --rounds 5
+"""
+import argparse
+
+from benchmarks import benchmark_database, print_table, seed_tasks, setup_django, timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from task.fastpath import get_plan
+    from task.models import Task
+    from task.serializers import TaskSerializer
+
+    def serializer_path():
+        return TaskSerializer(Task.objects.filter(is_active=True), many=True).data
+
+    def fast_path():
+        plan = get_plan()
+        return [plan.format(row) for row in Task.objects.filter(is_active=True).values(*plan.columns)]
+
+    with benchmark_database():
+        seed_tasks(args.tasks)
+        assert serializer_path() == fast_path()
+
+        best = {}
+        for name, run in (("TaskSerializer", serializer_path), ("fast path", fast_path)):
+            for _ in range(args.rounds):
+                with timer() as result:
+                    run()
+                best[name] = min(best.get(name, result["seconds"]), result["seconds"])
+
+    baseline = best["TaskSerializer"]
+    rows = [
+        (name, args.tasks, f"{seconds * 1000:.1f}", f"{args.tasks / seconds:.0f}", f"{baseline / seconds:.2f}x")
+        for name, seconds in best.items()
+    ]
+    print_table(("path", "rows", "best ms", "rows/s", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main()
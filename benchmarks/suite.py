@@ -0,0 +1,245 @@
+"""
+Benchmark suite with JSON baselines, for catching performance regressions::
+
+    python -m benchmarks.suite run --save benchmarks/baselines/local.json
+    python -m benchmarks.suite compare benchmarks/baselines/local.json
+
+``run`` measures every metric and prints it, optionally saving the results.
+``compare`` measures again and exits with status 1 when a metric is worse
+than the baseline by more than ``--threshold`` (a fraction, 0.2 by default).
+Query counts do not depend on the machine, so any increase is a regression.
+
+Timings depend on the machine, so baselines should be recorded and compared
+on the same one. ``baselines/reference.json`` is the default run on a
+development machine, useful as-is for its query counts.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+from datetime import datetime, timezone
+
+from benchmarks import benchmark_database, create_user_token, print_table, seed_tasks, setup_django, timer
+
+LOWER = "lower"
+HIGHER = "higher"
+
+
+class Results:
+    """Metrics collected by a run, keyed by name."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name, value, unit, better=LOWER, exact=False):
+        self.metrics[name] = {"value": round(value, 4), "unit": unit, "better": better, "exact": exact}
+
+
+def per_op(seconds, count, scale=1_000_000):
+    return seconds / count * scale
+
+
+def best_of(repeat, func):
+    """Run ``func`` ``repeat`` times and return the fastest time, in seconds."""
+    times = []
+    for _ in range(repeat):
+        with timer() as result:
+            func()
+        times.append(result["seconds"])
+    return min(times)
+
+
+def bench_serializer(results, rows):
+    from task.fastpath import get_plan
+    from task.models import Task
+    from task.serializers import TaskSerializer
+
+    tasks = list(Task.objects.filter(is_active=True)[:rows])
+    seconds = best_of(5, lambda: TaskSerializer(tasks, many=True).data)
+    results.add("serializer.task_serializer", len(tasks) / seconds, "rows/s", better=HIGHER)
+
+    plan = get_plan()
+    values = list(Task.objects.filter(is_active=True).values(*plan.columns)[:rows])
+    seconds = best_of(5, lambda: [plan.format(row) for row in values])
+    results.add("serializer.fast_path", len(values) / seconds, "rows/s", better=HIGHER)
+
+
+def bench_jwt(results, user, operations):
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    def encode():
+        for _ in range(operations):
+            str(AccessToken.for_user(user))
+
+    raw_token = str(AccessToken.for_user(user))
+
+    def verify():
+        for _ in range(operations):
+            AccessToken(raw_token)
+
+    results.add("jwt.encode", per_op(best_of(3, encode), operations), "us/op")
+    results.add("jwt.verify", per_op(best_of(3, verify), operations), "us/op")
+
+
+def clear_task_caches():
+    from django.core.cache import caches
+
+    for cache in caches.all():
+        cache.clear()
+
+
+def measure_latency(client, url, requests):
+    """
+    Return the median and 95th percentile latency of ``requests`` GETs, in ms.
+
+    The task caches are emptied before each request, so the database path is
+    measured rather than cached details and list pages. Users stay cached.
+    """
+    # Warm up the user cache and lazily imported code before timing
+    assert client.get(url).status_code == 200
+    durations = []
+    for _ in range(requests):
+        clear_task_caches()
+        with timer() as result:
+            assert client.get(url).status_code == 200
+        durations.append(result["seconds"] * 1000)
+    return statistics.median(durations), statistics.quantiles(durations, n=20)[-1]
+
+
+def bench_views(results, client, size, pk, requests):
+    from django.urls import reverse
+
+    endpoints = [
+        ("task_list", reverse("task-list")),
+        ("task_detail", reverse("task", kwargs={"pk": pk})),
+    ]
+    for endpoint, url in endpoints:
+        median, p95 = measure_latency(client, url, requests)
+        results.add(f"view.{endpoint}.{size}.median", median, "ms")
+        results.add(f"view.{endpoint}.{size}.p95", p95, "ms")
+
+
+def bench_queries(results, client, pk):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    from users.authentication import user_cache
+
+    endpoints = [
+        ("task_list", reverse("task-list")),
+        ("task_detail", reverse("task", kwargs={"pk": pk})),
+        ("task_search", reverse("task-search") + "?q=Task"),
+        ("task_export", reverse("task-export")),
+    ]
+    for endpoint, url in endpoints:
+        # Count the cold request, with empty task and user caches
+        clear_task_caches()
+        user_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+            assert response.status_code == 200
+            if response.streaming:
+                b"".join(response.streaming_content)
+        results.add(f"queries.{endpoint}", len(queries), "queries", exact=True)
+
+
+def run(args):
+    setup_django()
+    from django.test import Client
+
+    results = Results()
+    with benchmark_database():
+        user, token = create_user_token()
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        seeded = 0
+        for size in sorted(args.sizes):
+            pk = seed_tasks(size, start=seeded)[0]
+            seeded = size
+            bench_views(results, client, size, pk, args.requests)
+
+        bench_serializer(results, args.rows)
+        bench_jwt(results, user, args.operations)
+        bench_queries(results, client, pk)
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sorted(args.sizes),
+        },
+        "metrics": results.metrics,
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Return a row for every metric in the baseline and whether any regressed.
+
+    A metric regresses when it is worse than the baseline by more than
+    ``threshold``, or worse at all for metrics marked ``exact``.
+    """
+    rows = []
+    failed = False
+    for name, base in sorted(baseline["metrics"].items()):
+        metric = current["metrics"].get(name)
+        if metric is None:
+            rows.append((name, base["value"], "-", "-", "missing"))
+            continue
+
+        if base["value"]:
+            change = (metric["value"] - base["value"]) / base["value"]
+        else:
+            change = 0.0 if not metric["value"] else float("inf")
+        worse = change if base["better"] == LOWER else -change
+        allowed = 0.0 if base.get("exact") else threshold
+
+        status = "ok"
+        if worse > allowed:
+            status = "REGRESSED"
+            failed = True
+        elif worse < -allowed:
+            status = "improved"
+        rows.append((name, base["value"], metric["value"], f"{change:+.1%}", status))
+    return rows, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["run", "compare"])
+    parser.add_argument("baseline", nargs="?", help="baseline file to compare against")
+    parser.add_argument("--save", help="write the results to this file")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=500, help="tasks per serializer run")
+    parser.add_argument("--operations", type=int, default=2000, help="JWT encodes/verifies")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        if not args.baseline:
+            parser.error("compare needs a baseline file")
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    current = run(args)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if args.command == "run":
+        rows = [(name, metric["value"], metric["unit"]) for name, metric in sorted(current["metrics"].items())]
+        print_table(("metric", "value", "unit"), rows)
+        return 0
+
+    rows, failed = compare(baseline, current, args.threshold)
+    print_table(("metric", "baseline", "current", "change", "status"), rows)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Measure the time throttling adds to each request::
+
+    python -m benchmarks.throttle --checks 20000 --users 1000
+
+Runs the throttle checks of one request for ``--users`` users in turn with
+DRF's stock ``UserRateThrottle`` and ``ScopedRateThrottle`` over the default
+cache, and with the token buckets of ``api.throttling``. The rates are high
+enough that every check passes, so only the bookkeeping is timed.
+"""
+import argparse
+
+from benchmarks import print_table, setup_django, timer
+
+RATES = {"user": "1000000/min", "anon": "1000000/min", "task-create": "1000000/min"}
+
+
+def time_checks(throttle_classes, requests, view, checks):
+    with timer() as result:
+        for i in range(checks):
+            request = requests[i % len(requests)]
+            for throttle_class in throttle_classes:
+                assert throttle_class().allow_request(request, view)
+    return result["seconds"] / checks * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    import tempfile
+
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from django.test.utils import override_settings
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.throttling import ScopedRateThrottle, UserRateThrottle
+
+    from api.throttling import ScopedBucketThrottle, UserBucketThrottle
+    from task.views import CreateTaskView
+
+    factory = APIRequestFactory()
+    requests = []
+    for pk in range(1, args.users + 1):
+        request = Request(factory.post("/api/task/create/"))
+        request.user = User(pk=pk, username=f"user{pk}")
+        requests.append(request)
+    view = CreateTaskView()
+
+    # DRF's throttles read the rates once, when their module is imported
+    class StockUserThrottle(UserRateThrottle):
+        THROTTLE_RATES = RATES
+
+    class StockScopedThrottle(ScopedRateThrottle):
+        THROTTLE_RATES = RATES
+
+    modes = (
+        ("drf cache", (StockUserThrottle, StockScopedThrottle)),
+        ("token bucket", (UserBucketThrottle, ScopedBucketThrottle)),
+    )
+    rows = []
+    with tempfile.TemporaryDirectory() as directory, override_settings(
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": RATES},
+        THROTTLE_FILE=f"{directory}/throttle.db",
+    ):
+        for mode, throttle_classes in modes:
+            cache.clear()
+            # The first round opens the store and creates every bucket
+            time_checks(throttle_classes, requests, view, len(requests))
+            rows.append((mode, f"{time_checks(throttle_classes, requests, view, args.checks):.1f}"))
+
+    print_table(("throttles", "us/request"), rows)
+
+
+if __name__ == "__main__":
+    main()
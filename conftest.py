@@ -0,0 +1,28 @@
+import pytest
+
+from django.core.cache import caches
+
+from users.authentication import user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Cached payloads are keyed by id, and ids are reused across tests
+    for cache in caches.all():
+        cache.clear()
+    user_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    # Keep each test's metrics apart from other tests and from a running server
+    settings.METRICS_DIR = str(tmp_path / "metrics")
+    yield settings.METRICS_DIR
+
+
+@pytest.fixture(autouse=True)
+def throttle_file(settings, tmp_path):
+    # Start every test with full throttle buckets
+    settings.THROTTLE_FILE = str(tmp_path / "throttle.db")
+    yield settings.THROTTLE_FILE
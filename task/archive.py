@@ -0,0 +1,79 @@
+"""
+Moving deleted tasks out of the task table into ``TaskArchive`` and back.
+
+Tasks deleted longer ago than the retention window are moved in batches,
+each in its own short transaction, so the task table and its indexes only
+carry recently deleted rows. Archived tasks keep their id and get it back
+when restored.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .compression import expand_description
+from .models import Task, TaskArchive
+
+ARCHIVED_FIELDS = ("id", "name", "description", "description_compressed", "date_crated", "updated_at")
+
+
+def get_retention():
+    return timedelta(days=getattr(settings, "TASK_ARCHIVE_RETENTION_DAYS", 30))
+
+
+def archive_candidates(cutoff):
+    # Walks the inactive half of task_active_created_idx; deletion sets updated_at
+    return Task.objects.inactive().filter(updated_at__lt=cutoff).order_by("date_crated", "id")
+
+
+def archive_batch(cutoff, batch_size, after=None):
+    """
+    Move up to ``batch_size`` tasks deleted before ``cutoff`` to the archive.
+
+    ``after`` is the ``(date_crated, id)`` position returned by the previous
+    batch. Returns the number of tasks moved and the position to continue
+    from, or ``(0, None)`` when there is nothing left to move.
+    """
+    queryset = archive_candidates(cutoff)
+    if after is not None:
+        date_crated, pk = after
+        queryset = queryset.filter(Q(date_crated__gt=date_crated) | Q(date_crated=date_crated, id__gt=pk))
+
+    with transaction.atomic():
+        rows = list(queryset.select_for_update().values(*ARCHIVED_FIELDS)[:batch_size])
+        if not rows:
+            return 0, None
+        TaskArchive.objects.bulk_create(TaskArchive(**row) for row in rows)
+        Task.objects.filter(id__in=[row["id"] for row in rows]).delete()
+
+    last = rows[-1]
+    return len(rows), (last["date_crated"], last["id"])
+
+
+def restore_task(pk):
+    """
+    Make a deleted task active again, moving it back from the archive if it
+    was archived. Returns the task, or None if there is no such task.
+
+    Raises IntegrityError if another task took its name in the meantime.
+    """
+    with transaction.atomic():
+        task = Task.objects.select_for_update().filter(id=pk).first()
+        if task is not None:
+            if not task.is_active:
+                task.is_active = True
+                task.save(update_fields=["is_active", "updated_at"])
+            return task
+
+        archived = TaskArchive.objects.select_for_update().filter(id=pk).first()
+        if archived is None:
+            return None
+        task = Task.objects.create(
+            id=archived.id,
+            name=archived.name,
+            description=expand_description(archived.description, archived.description_compressed),
+            date_crated=archived.date_crated,
+        )
+        archived.delete()
+    return task
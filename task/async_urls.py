@@ -0,0 +1,17 @@
+from django.urls import path
+
+from .async_views import (
+    AsyncCreateTaskView,
+    AsyncEditTaskView,
+    AsyncGetTaskView,
+    AsyncTaskEventsView,
+    AsyncTaskListView
+)
+
+urlpatterns = [
+    path("task/create/", AsyncCreateTaskView.as_view(), name="async-create-task"),
+    path("task/<int:pk>/edit/", AsyncEditTaskView.as_view(), name="async-edit-task"),
+    path("task/list/", AsyncTaskListView.as_view(), name="async-task-list"),
+    path("task/events/", AsyncTaskEventsView.as_view(), name="async-task-events"),
+    path("task/<int:pk>/detail/", AsyncGetTaskView.as_view(), name="async-task")
+]
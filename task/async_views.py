@@ -0,0 +1,253 @@
+"""
+Native async versions of the task endpoints for the ASGI entry point.
+
+DRF views are synchronous, so under ASGI each request to ``task.views`` runs
+in a worker thread. These views use Django's async ORM and cache APIs instead
+and answer with the same payloads as their counterparts in ``task.views``.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, ParseError, Throttled
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from api.db.pool import release_connections
+from api.idempotency import idempotent
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from api.timing import measure
+from users.authentication import CachedJWTAuthentication
+
+from .cache import aget_task_entry, ainvalidate_tasks, arefresh_task
+from .conditional import alist_validators, not_modified_response, set_validators, task_validators
+from .events import CREATED, DELETED, UPDATED, get_broker, stream_events
+from .fastpath import get_plan
+from .listcache import aget_page, astore_page, make_page, page_response
+from .pagination import TaskCursorPagination
+from .serializers import CrateTaskSerializer, TaskSerializer, parse_fields
+from .models import Task
+
+
+class AsyncAPIView(View):
+    """
+    Base view authenticating with a JWT and requiring an authenticated user,
+    like ``permissions.IsAuthenticated`` on the synchronous views, and
+    throttled like them.
+    """
+    http_method_names = ["get", "post", "put", "delete"]
+    renderer = FastJSONRenderer()
+    throttle_scope = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Authenticated by the JWT in the Authorization header, not a session
+        # cookie, so like DRF's views these don't need CSRF protection
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        handler = getattr(self, method, None) if method in self.http_method_names else None
+        if handler is None:
+            return self.render({"detail": f'Method "{request.method}" not allowed.'}, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        authentication = CachedJWTAuthentication()
+        try:
+            result = await authentication.aauthenticate(request)
+            if result is None:
+                raise NotAuthenticated()
+            drf_request = Request(request, parsers=[FastJSONParser()], authenticators=())
+            drf_request.user, drf_request.auth = result
+            self.check_throttles(drf_request)
+            return await handler(drf_request, *args, **kwargs)
+        except APIException as e:
+            response = self.render({"detail": e.detail}, e.status_code)
+            if e.status_code == status.HTTP_401_UNAUTHORIZED:
+                response["WWW-Authenticate"] = authentication.authenticate_header(request)
+            if isinstance(e, Throttled) and e.wait is not None:
+                response["Retry-After"] = "%d" % e.wait
+            return response
+
+    def check_throttles(self, request):
+        waits = []
+        for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+            throttle = throttle_class()
+            if not throttle.allow_request(request, self):
+                waits.append(throttle.wait())
+        if waits:
+            raise Throttled(max(wait or 0 for wait in waits))
+
+    def render(self, data, status_code):
+        return HttpResponse(self.renderer.render(data), status=status_code, content_type="application/json")
+
+
+class AsyncGetTaskView(AsyncAPIView):
+
+    async def get(self, request, pk):
+        try:
+            # Only the fields asked for with ?fields=, all of them by default
+            fields = parse_fields(request.query_params.get("fields"))
+            # Get the serialized task from the cache, loading it on a miss
+            entry = await aget_task_entry(pk, fields)
+            if entry is None:
+                # Task with the given ID doesn't exist
+                return self.render({"error": "Task does not exist"}, status.HTTP_404_NOT_FOUND)
+            # Answer 304 if the client's copy is still current
+            etag, last_modified = task_validators(pk, entry["updated_at"])
+            not_modified = not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            # Return the serialized task in the response
+            response = self.render({"task": entry["task"]}, status.HTTP_200_OK)
+            return set_validators(response, etag, last_modified)
+        except ParseError as e:
+            # Unknown field in ?fields=
+            return self.render({"error": str(e.detail)}, status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            # Other exceptions
+            return self.render({"error": str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def delete(self, request, pk):
+        try:
+            # Mark the task as inactive with a single UPDATE
+            deleted = await Task.objects.filter(id=pk, is_active=True).aupdate(
+                is_active=False, updated_at=timezone.now()
+            )
+            if not deleted:
+                # Task with the given ID doesn't exist
+                return self.render({"error": "Task does not exist"}, status.HTTP_404_NOT_FOUND)
+            # Drop the cached copy and tell the event streams
+            await ainvalidate_tasks([pk])
+            get_broker().publish([(DELETED, {"id": pk})])
+            # Return success message
+            return self.render({"message": "Task deleted"}, status.HTTP_200_OK)
+        except Exception as e:
+            # Other exceptions
+            return self.render({"error": str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncTaskListView(AsyncAPIView):
+
+    async def get(self, request):
+        try:
+            # Serve the rendered page if no task changed since it was cached
+            url = request.build_absolute_uri()
+            generation, page = await aget_page(url)
+            if page is not None:
+                not_modified = not_modified_response(request, page["etag"], page["last_modified"])
+                return not_modified if not_modified is not None else page_response(request, page)
+            # Answer 304 if nothing changed since the client's copy
+            etag, last_modified = await alist_validators()
+            not_modified = not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            # Only the fields asked for with ?fields=, all of them by default
+            plan = get_plan(parse_fields(request.query_params.get("fields")))
+            # Get one page of active tasks, newest first, as plain rows of just
+            # those columns plus the ones the cursors are built from
+            columns = dict.fromkeys((*plan.columns, *TaskCursorPagination.position_fields))
+            paginator = TaskCursorPagination()
+            queryset = paginator.get_page_queryset(Task.objects.active().values(*columns), request)
+            rows = paginator.set_page([row async for row in queryset])
+            # Format the rows exactly like TaskSerializer would
+            with measure("serialize"):
+                tasks = [plan.format(row) for row in rows]
+            # Render the tasks along with the next/previous cursors once and
+            # keep the bytes for the next requests
+            data = paginator.get_paginated_response(tasks).data
+            page = make_page(self.renderer.render(data), etag, last_modified)
+            await astore_page(generation, url, page)
+            return page_response(request, page, data)
+        except ParseError as e:
+            # Malformed or tampered cursor, or unknown field in ?fields=
+            return self.render({"error": str(e.detail)}, status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            # Other exceptions
+            return self.render({"error": str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncCreateTaskView(AsyncAPIView):
+    # Shares its limit with CreateTaskView
+    throttle_scope = "task-create"
+
+    @idempotent
+    async def post(self, request):
+        serializer = CrateTaskSerializer(data=request.data)
+        if not serializer.is_valid():
+            # Invalid input data
+            return self.render({"errors": serializer.errors}, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # Create a new task
+            name = serializer.validated_data["name"]
+            description = serializer.validated_data["description"]
+            task = await Task.objects.acreate(name=name, description=description)
+        except IntegrityError as e:
+            # A task with this name already exists
+            return self.render({"message": str(e)}, status.HTTP_400_BAD_REQUEST)
+
+        # Serialize the created task, warm the cache and tell the event streams
+        data = TaskSerializer(task).data
+        await arefresh_task(task, data)
+        get_broker().publish([(CREATED, data)])
+        # Return success message along with serialized task
+        return self.render({"message": "Task created", "data": data}, status.HTTP_200_OK)
+
+
+class AsyncEditTaskView(AsyncAPIView):
+
+    @idempotent
+    async def put(self, request, pk):
+        serializer = CrateTaskSerializer(data=request.data)
+        if not serializer.is_valid():
+            # Invalid input data
+            return self.render({"errors": serializer.errors}, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # Get the task with the given ID
+            task = await Task.objects.aget(id=pk, is_active=True)
+            # Update task details
+            task.name = serializer.validated_data["name"]
+            task.description = serializer.validated_data["description"]
+            await task.asave()
+        except Task.DoesNotExist:
+            # Task with the given ID doesn't exist
+            return self.render({"error": "Task does not exist"}, status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            # Other exceptions
+            return self.render({"message": str(e)}, status.HTTP_400_BAD_REQUEST)
+
+        # Serialize the updated task, replace the cached copy and tell the event streams
+        data = TaskSerializer(task).data
+        await arefresh_task(task, data)
+        get_broker().publish([(UPDATED, data)])
+        # Return success message along with serialized task
+        return self.render({"message": "Task updated", "data": data}, status.HTTP_200_OK)
+
+
+class AsyncTaskEventsView(AsyncAPIView):
+    """
+    Server-Sent Events stream of task changes, resuming after the
+    ``Last-Event-ID`` header or ``?last_event_id=`` when reconnecting.
+    """
+    http_method_names = ["get"]
+
+    async def get(self, request):
+        if not isinstance(request._request, ASGIRequest):
+            # A stream would hold a WSGI worker thread for as long as it is open
+            return self.render({"error": "Event streams are only served over ASGI"}, status.HTTP_400_BAD_REQUEST)
+        last_event_id = request.META.get("HTTP_LAST_EVENT_ID") or request.query_params.get("last_event_id")
+        # The stream never queries, so give back the connection authentication
+        # used instead of holding a pool slot until the client disconnects
+        await sync_to_async(release_connections)()
+        response = StreamingHttpResponse(stream_events(last_event_id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Keep nginx from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -0,0 +1,297 @@
+"""
+Read-through cache of serialized task payloads.
+
+Each entry holds the ``TaskSerializer`` payload and the task's ``updated_at``,
+so conditional GETs can be answered from the cache alone. Entries are keyed by
+task id and by ``PAYLOAD_VERSION``, which must be bumped whenever the entry or
+``TaskSerializer`` output changes so old entries are never served. Writes
+refresh or drop entries once their transaction commits, while reads only fill
+missing entries, so a read racing a write never puts the old row back. Writes
+also bump the task generation that ``task.listcache`` keys rendered list pages
+by. The generation is kept in the ``TASK_GENERATION_CACHE_ALIAS`` cache, which
+every worker process must share for a write to reach the pages cached by all
+of them.
+"""
+import asyncio
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from api import metrics
+from api.timing import measure
+
+from .fastpath import get_plan
+from .models import Task
+from .serializers import TaskSerializer
+
+PAYLOAD_VERSION = 2
+
+# How long a miss waits for another process already loading the same task
+LOCK_TIMEOUT = 5
+# Left in place of a dropped entry for LOCK_TIMEOUT seconds, so a reader that
+# loaded the row before the write can't cache it again
+DROPPED = "dropped"
+WAIT_INTERVAL = 0.01
+WAIT_ATTEMPTS = 20
+
+# Hit/miss counters of this process, exposed by TaskCacheStatsView
+stats = Counter()
+
+
+# Result label of each counter in the task_cache_lookups_total metric
+LOOKUP_RESULTS = {"hits": "hit", "misses": "miss", "waits": "wait"}
+
+
+def count_lookup(outcome):
+    stats[outcome] += 1
+    metrics.inc("task_cache_lookups_total", result=LOOKUP_RESULTS[outcome])
+
+
+def get_cache():
+    return caches[getattr(settings, "TASK_CACHE_ALIAS", "default")]
+
+
+def get_ttl():
+    return getattr(settings, "TASK_CACHE_TTL", 300)
+
+
+def detail_key(pk):
+    return f"task:detail:{pk}"
+
+
+GENERATION_KEY = "task:generation"
+
+
+def get_generation_cache():
+    return caches[getattr(settings, "TASK_GENERATION_CACHE_ALIAS", "default")]
+
+
+def initial_generation():
+    # Taken from the clock, so a generation lost to eviction is never reused
+    return time.time_ns() // 1000
+
+
+def get_generation():
+    """Return the task generation, a number every committed write moves."""
+    cache = get_generation_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, initial_generation(), None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+async def aget_generation():
+    cache = get_generation_cache()
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(GENERATION_KEY, initial_generation(), None)
+        generation = await cache.aget(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    cache = get_generation_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Evicted: any fresh value moves past every page already cached
+        cache.add(GENERATION_KEY, initial_generation(), None)
+
+
+async def abump_generation():
+    cache = get_generation_cache()
+    try:
+        await cache.aincr(GENERATION_KEY)
+    except ValueError:
+        await cache.aadd(GENERATION_KEY, initial_generation(), None)
+
+
+def bump_generation_on_commit():
+    """Bump the task generation once the current transaction commits."""
+    transaction.on_commit(bump_generation)
+
+
+def make_entry(task, payload):
+    return {"task": dict(payload), "updated_at": task.updated_at}
+
+
+def entry_query(fields=None):
+    return Task.objects.values(*get_plan(fields).columns, "updated_at")
+
+
+def entry_from_row(row, fields=None):
+    with measure("serialize"):
+        return {"task": get_plan(fields).format(row), "updated_at": row["updated_at"]}
+
+
+def sparse_entry(entry, fields):
+    # None when the cached payload lacks a field only serialized on request
+    if entry == DROPPED:
+        return None
+    if fields is None:
+        return entry
+    task = entry["task"]
+    if not task.keys() >= set(fields):
+        return None
+    return {"task": {name: task[name] for name in fields}, "updated_at": entry["updated_at"]}
+
+
+def load_task_entry(pk, fields=None):
+    try:
+        return entry_from_row(entry_query(fields).get(id=pk, is_active=True), fields)
+    except Task.DoesNotExist:
+        return None
+
+
+def get_task_entry(pk, fields=None):
+    """
+    Return the cache entry of the active task ``pk`` or ``None`` if it doesn't exist.
+
+    On a miss only one caller loads the row; concurrent callers for the same
+    task wait briefly for it to fill the cache instead of all hitting the DB.
+    With ``fields`` the entry holds only those fields of the task, and a miss
+    (or a cached payload without all of them) reads only their columns
+    without filling the cache.
+    """
+    cache = get_cache()
+    key = detail_key(pk)
+    entry = cache.get(key, version=PAYLOAD_VERSION)
+    if entry is not None:
+        sparse = sparse_entry(entry, fields)
+        if sparse is not None:
+            count_lookup("hits")
+            return sparse
+    count_lookup("misses")
+    if fields is not None:
+        return load_task_entry(pk, fields)
+
+    lock_key = f"{key}:lock"
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT, version=PAYLOAD_VERSION):
+        for _ in range(WAIT_ATTEMPTS):
+            time.sleep(WAIT_INTERVAL)
+            entry = cache.get(key, version=PAYLOAD_VERSION)
+            if entry not in (None, DROPPED):
+                count_lookup("waits")
+                return entry
+        return load_task_entry(pk)
+
+    try:
+        entry = load_task_entry(pk)
+        if entry is not None:
+            # add() leaves alone an entry a write stored or dropped meanwhile
+            cache.add(key, entry, get_ttl(), version=PAYLOAD_VERSION)
+        return entry
+    finally:
+        cache.delete(lock_key, version=PAYLOAD_VERSION)
+
+
+def get_task_entries(ids, fields=None):
+    """
+    Return the cache entries of the active tasks among ``ids`` by id.
+
+    Cached entries come from one ``get_many`` and the rest from one
+    ``in_bulk`` query of only the columns needed, serialized with
+    ``TaskSerializer``. Without ``fields`` the loaded entries are cached too.
+    """
+    cache = get_cache()
+    keys = {detail_key(pk): pk for pk in ids}
+    entries = {}
+    for key, entry in cache.get_many(keys, version=PAYLOAD_VERSION).items():
+        sparse = sparse_entry(entry, fields)
+        if sparse is not None:
+            entries[keys[key]] = sparse
+    for pk in ids:
+        count_lookup("hits" if pk in entries else "misses")
+
+    missing = [pk for pk in ids if pk not in entries]
+    if missing:
+        tasks = Task.objects.filter(is_active=True).only(*get_plan(fields).columns, "updated_at").in_bulk(missing)
+        with measure("serialize"):
+            loaded = {pk: make_entry(task, TaskSerializer(task, fields=fields).data) for pk, task in tasks.items()}
+        if fields is None and loaded:
+            # Leave alone the entries writes stored or dropped during the query
+            fills = {detail_key(pk): entry for pk, entry in loaded.items()}
+            for key in cache.get_many(fills, version=PAYLOAD_VERSION):
+                del fills[key]
+            cache.set_many(fills, get_ttl(), version=PAYLOAD_VERSION)
+        entries.update(loaded)
+    return entries
+
+
+async def aload_task_entry(pk, fields=None):
+    try:
+        return entry_from_row(await entry_query(fields).aget(id=pk, is_active=True), fields)
+    except Task.DoesNotExist:
+        return None
+
+
+async def aget_task_entry(pk, fields=None):
+    """Async version of ``get_task_entry`` for native async views."""
+    cache = get_cache()
+    key = detail_key(pk)
+    entry = await cache.aget(key, version=PAYLOAD_VERSION)
+    if entry is not None:
+        sparse = sparse_entry(entry, fields)
+        if sparse is not None:
+            count_lookup("hits")
+            return sparse
+    count_lookup("misses")
+    if fields is not None:
+        return await aload_task_entry(pk, fields)
+
+    lock_key = f"{key}:lock"
+    if not await cache.aadd(lock_key, 1, LOCK_TIMEOUT, version=PAYLOAD_VERSION):
+        for _ in range(WAIT_ATTEMPTS):
+            await asyncio.sleep(WAIT_INTERVAL)
+            entry = await cache.aget(key, version=PAYLOAD_VERSION)
+            if entry not in (None, DROPPED):
+                count_lookup("waits")
+                return entry
+        return await aload_task_entry(pk)
+
+    try:
+        entry = await aload_task_entry(pk)
+        if entry is not None:
+            await cache.aadd(key, entry, get_ttl(), version=PAYLOAD_VERSION)
+        return entry
+    finally:
+        await cache.adelete(lock_key, version=PAYLOAD_VERSION)
+
+
+def refresh_task_on_commit(task, payload):
+    """Store the fresh ``payload`` of ``task`` once the current transaction commits."""
+    entry = make_entry(task, payload)
+    transaction.on_commit(
+        lambda: get_cache().set(detail_key(task.pk), entry, get_ttl(), version=PAYLOAD_VERSION)
+    )
+    bump_generation_on_commit()
+
+
+def drop_entries(keys):
+    get_cache().set_many(dict.fromkeys(keys, DROPPED), LOCK_TIMEOUT, version=PAYLOAD_VERSION)
+
+
+def invalidate_tasks_on_commit(ids):
+    """Drop the cached payloads of ``ids`` once the current transaction commits."""
+    keys = [detail_key(pk) for pk in ids]
+    if keys:
+        transaction.on_commit(lambda: drop_entries(keys))
+        bump_generation_on_commit()
+
+
+async def arefresh_task(task, payload):
+    """Store the fresh ``payload`` of ``task``; async writes are autocommitted."""
+    await get_cache().aset(detail_key(task.pk), make_entry(task, payload), get_ttl(), version=PAYLOAD_VERSION)
+    await abump_generation()
+
+
+async def ainvalidate_tasks(ids):
+    """Drop the cached payloads of ``ids``; async writes are autocommitted."""
+    keys = [detail_key(pk) for pk in ids]
+    if keys:
+        await get_cache().aset_many(dict.fromkeys(keys, DROPPED), LOCK_TIMEOUT, version=PAYLOAD_VERSION)
+        await abump_generation()
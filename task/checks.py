@@ -0,0 +1,37 @@
+"""
+System checks for settings that only work with more than one worker process
+when they point at a shared cache.
+"""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Backends keeping their entries in the memory of each process
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+# Settings naming a cache alias that every worker must share, and what for
+SHARED_CACHES = {
+    "TASK_CACHE_ALIAS": "cached task payloads are refreshed and dropped in one worker only",
+    "TASK_GENERATION_CACHE_ALIAS": "the other workers serve stale list pages after a write until they expire",
+    "IDEMPOTENCY_CACHE_ALIAS": "retries reaching another worker run the request again",
+}
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    if settings.DEBUG:
+        return []
+    warnings = []
+    for setting, problem in SHARED_CACHES.items():
+        alias = getattr(settings, setting, "default")
+        backend = settings.CACHES.get(alias, {}).get("BACKEND")
+        if backend in PROCESS_LOCAL_BACKENDS:
+            warnings.append(Warning(
+                f"{setting} points at the process-local cache '{alias}': {problem}.",
+                hint="Use a shared cache such as Redis or Memcached, or run a single worker process.",
+                obj=setting,
+                id="task.W001",
+            ))
+    return warnings
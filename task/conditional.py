@@ -0,0 +1,58 @@
+"""
+Validators for conditional GETs on the task endpoints.
+
+Both validators are derived from ``Task.updated_at`` so a client revalidating
+an unchanged resource gets a 304 without the task being serialized.
+"""
+from django.db.models import Count, Max, Q
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import Task
+
+LIST_SUMMARY = {
+    "last_update": Max("updated_at"),
+    "active": Count("id", filter=Q(is_active=True)),
+}
+
+
+def task_validators(pk, updated_at):
+    etag = f'"{pk}-{int(updated_at.timestamp() * 1_000_000)}"'
+    return etag, int(updated_at.timestamp())
+
+
+def list_validators():
+    """
+    Build list validators from one aggregate over the ``updated_at`` index.
+
+    ``Max`` runs over every row so soft-deletes move it too, and the active
+    count covers rows disappearing without any other row changing.
+    """
+    return list_validators_from(Task.objects.aggregate(**LIST_SUMMARY))
+
+
+async def alist_validators():
+    return list_validators_from(await Task.objects.aaggregate(**LIST_SUMMARY))
+
+
+def list_validators_from(summary):
+    last_update = summary["last_update"]
+    if last_update is None:
+        return '"empty"', None
+    etag = f'"{summary["active"]}-{int(last_update.timestamp() * 1_000_000)}"'
+    return etag, int(last_update.timestamp())
+
+
+def not_modified_response(request, etag, last_modified):
+    """Return a 304 response if the client's copy is current, else ``None``."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
@@ -0,0 +1,209 @@
+"""
+Task change events pushed to Server-Sent Events streams.
+
+Views publish ``task.created``, ``task.updated`` and ``task.deleted`` events
+once their transaction commits, and the broker picked with the
+``TASK_EVENTS_BACKEND`` setting fans them out to every open stream.
+
+``InProcessBroker`` only reaches the streams of its own process: serve the
+streams from a single ASGI worker, or plug in a backend shared by all of them
+with the same ``publish`` and ``subscribe`` methods. Each event is encoded
+once and shared by every stream, and an idle stream is a coroutine waiting on
+an ``asyncio.Event``, so one worker holds thousands of them cheaply.
+"""
+import asyncio
+import threading
+import uuid
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from api import metrics
+from api.renderers import FastJSONRenderer
+
+CREATED = "task.created"
+UPDATED = "task.updated"
+DELETED = "task.deleted"
+
+
+class Event:
+
+    def __init__(self, event_id, sequence, event_type, data):
+        self.id = event_id
+        self.sequence = sequence
+        self.type = event_type
+        # Encoded once, however many streams send it
+        self.message = b"id: %s\nevent: %s\ndata: %s\n\n" % (
+            event_id.encode("ascii"), event_type.encode("ascii"), FastJSONRenderer().render(data)
+        )
+
+
+class Overflow(Exception):
+    """The stream fell too far behind and must reconnect to resume."""
+
+
+class Subscription:
+    """The events waiting to be sent to one stream, at most ``buffer_size``."""
+
+    def __init__(self, buffer_size):
+        self.buffer_size = buffer_size
+        self.buffer = deque()
+        self.wakeup = asyncio.Event()
+        self.overflowed = False
+        # Set when the client's Last-Event-ID can't be resumed from
+        self.reset = False
+
+    def push(self, events):
+        # Runs in the stream's event loop
+        if len(self.buffer) + len(events) > self.buffer_size:
+            self.overflowed = True
+            self.buffer.clear()
+        else:
+            self.buffer.extend(events)
+        self.wakeup.set()
+
+    async def get(self, timeout):
+        """Return the buffered events, waiting up to ``timeout`` seconds for some."""
+        if not self.buffer and not self.overflowed:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self.wakeup.clear()
+        if self.overflowed:
+            raise Overflow()
+        events = list(self.buffer)
+        self.buffer.clear()
+        return events
+
+
+def deliver(subscriptions, events):
+    for subscription in subscriptions:
+        subscription.push(events)
+
+
+class InProcessBroker:
+    """
+    Fan events out to the streams of this process.
+
+    The last ``history`` events are kept so a client reconnecting with a
+    ``Last-Event-ID`` gets what it missed. Event ids start with a token of
+    this broker, so ids from another process or from before a restart are
+    told apart and answered with a reset.
+    """
+
+    def __init__(self, history=1000, buffer_size=1000):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.last_sequence = 0
+        self.history = deque(maxlen=history)
+        self.buffer_size = buffer_size
+        self.lock = threading.Lock()
+        # Subscriptions by the event loop serving them
+        self.loops = {}
+
+    def publish(self, events):
+        """Publish ``(type, data)`` pairs, from any thread."""
+        with self.lock:
+            batch = []
+            for event_type, data in events:
+                self.last_sequence += 1
+                sequence = self.last_sequence
+                batch.append(Event(f"{self.epoch}-{sequence}", sequence, event_type, data))
+            self.history.extend(batch)
+            loops = [(loop, tuple(subscriptions)) for loop, subscriptions in self.loops.items()]
+        # One wakeup per event loop rather than per stream
+        for loop, subscriptions in loops:
+            try:
+                loop.call_soon_threadsafe(deliver, subscriptions, batch)
+            except RuntimeError:
+                # The loop was closed
+                pass
+
+    def subscribe(self, last_event_id=None):
+        """Open a subscription in the running event loop, resuming after ``last_event_id``."""
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(self.buffer_size)
+        with self.lock:
+            missed = self.events_after(last_event_id)
+            self.loops.setdefault(loop, set()).add(subscription)
+        # Anything published from now on is delivered after the missed events
+        if missed is None:
+            subscription.reset = True
+        elif missed:
+            subscription.push(missed)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for loop, subscriptions in list(self.loops.items()):
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.loops[loop]
+
+    def events_after(self, last_event_id):
+        """Return the events after ``last_event_id``, or None if they are not all kept."""
+        if last_event_id is None:
+            return []
+        epoch, _, sequence = last_event_id.partition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence > self.last_sequence:
+            return None
+        if sequence == self.last_sequence:
+            return []
+        first = self.history[0].sequence if self.history else self.last_sequence + 1
+        if sequence < first - 1:
+            return None
+        return list(self.history)[sequence - first + 1:]
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    backend = import_string(getattr(settings, "TASK_EVENTS_BACKEND", "task.events.InProcessBroker"))
+    return backend(
+        history=getattr(settings, "TASK_EVENTS_HISTORY", 1000),
+        buffer_size=getattr(settings, "TASK_EVENTS_BUFFER_SIZE", 1000),
+    )
+
+
+def publish_on_commit(events):
+    """Publish ``(type, data)`` pairs once the current transaction commits."""
+    events = list(events)
+    if events:
+        transaction.on_commit(lambda: get_broker().publish(events))
+
+
+def get_heartbeat():
+    return getattr(settings, "TASK_EVENTS_HEARTBEAT", 15)
+
+
+async def stream_events(last_event_id=None):
+    """Yield the SSE messages of task changes until the client goes away."""
+    # Subscribed once the response starts, so the finally below always unsubscribes
+    subscription = get_broker().subscribe(last_event_id)
+    metrics.inc("task_event_streams_open")
+    try:
+        # How long the browser waits before reconnecting, in milliseconds
+        yield b"retry: 3000\n\n"
+        if subscription.reset:
+            # Missed events are gone: the client has to fetch the list again
+            yield b"event: reset\ndata: {}\n\n"
+        while True:
+            try:
+                events = await subscription.get(get_heartbeat())
+            except Overflow:
+                # Closing makes the client reconnect and resume from its last event
+                metrics.inc("task_event_streams_dropped_total")
+                return
+            if events:
+                yield b"".join(event.message for event in events)
+            else:
+                # Keeps proxies from closing the idle connection
+                yield b": heartbeat\n\n"
+    finally:
+        get_broker().unsubscribe(subscription)
+        metrics.inc("task_event_streams_open", -1)
@@ -0,0 +1,59 @@
+"""
+Serializer-free formatting of read-only task payloads.
+
+``TaskSerializer`` builds a model instance per row and walks its fields on
+every call. Read-only endpoints instead fetch plain ``values()`` rows and
+format them with a plan compiled once from the serializer's own fields, so
+the output is identical to ``TaskSerializer(task).data``.
+
+Rows must be fetched with ``values(*plan.columns)``, which adds the columns
+some fields are built from to the fields themselves.
+"""
+from functools import lru_cache
+
+from rest_framework import serializers
+
+from .compression import decompress_text
+from .serializers import TaskSerializer
+
+# Fields whose representation is the value the database already returns
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField)
+
+# Columns read along with a field to build its value
+EXTRA_COLUMNS = {"description": ("description_compressed",)}
+
+
+class TaskPayloadPlan:
+
+    def __init__(self, fields=None):
+        serializer_fields = TaskSerializer(fields=fields).fields
+        self.fields = tuple(serializer_fields)
+        self.columns = tuple(dict.fromkeys(
+            column for name in self.fields for column in (name, *EXTRA_COLUMNS.get(name, ()))
+        ))
+        self.steps = tuple(
+            (name, self.get_converter(serializer_fields[name])) for name in self.fields
+        )
+        self.expands_description = "description" in self.fields
+
+    @staticmethod
+    def get_converter(field):
+        if type(field) in PASSTHROUGH_FIELDS:
+            return None
+        return field.to_representation
+
+    def format(self, row):
+        """Format a ``values()`` row like ``TaskSerializer`` formats the task."""
+        payload = {}
+        for name, convert in self.steps:
+            value = row[name]
+            payload[name] = value if convert is None or value is None else convert(value)
+        # The description column only holds the preview of compressed descriptions
+        if self.expands_description and row["description_compressed"] is not None:
+            payload["description"] = decompress_text(row["description_compressed"])
+        return payload
+
+
+@lru_cache(maxsize=None)
+def get_plan(fields=None):
+    return TaskPayloadPlan(fields)
@@ -0,0 +1,13 @@
+import django_filters
+
+from .models import Task
+
+
+class TaskFilter(django_filters.FilterSet):
+    is_active = django_filters.BooleanFilter(field_name="is_active")
+    created_after = django_filters.IsoDateTimeFilter(field_name="date_crated", lookup_expr="gte")
+    created_before = django_filters.IsoDateTimeFilter(field_name="date_crated", lookup_expr="lt")
+
+    class Meta:
+        model = Task
+        fields = ["is_active", "created_after", "created_before"]
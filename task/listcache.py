@@ -0,0 +1,106 @@
+"""
+Cache of rendered task list pages.
+
+The first pages of the list are requested far more often than the rest and
+stay identical between writes, so each page is kept as the exact bytes sent,
+gzipped too if ``TASK_LIST_CACHE_GZIP`` is set, along with its validators.
+Pages are keyed by the request URL and the task generation, which every write
+through the task views bumps once committed: reading that one number from the
+shared ``TASK_GENERATION_CACHE_ALIAS`` cache tells whether a cached page is
+current, without querying the database. Pages of old
+generations are never looked up again and expire after
+``TASK_LIST_CACHE_TTL`` seconds, which also bounds how long writes that skip
+the views (the admin, management commands) take to show up.
+
+Cached pages are sent as ``PageResponse``, a DRF response that goes through
+content negotiation like any other but sends the stored bytes instead of
+rendering its data again.
+"""
+import gzip
+import hashlib
+import json
+
+from django.conf import settings
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from rest_framework.response import Response
+
+from .cache import PAYLOAD_VERSION, aget_generation, get_cache, get_generation
+from .conditional import set_validators
+
+CONTENT_TYPE = "application/json"
+
+
+def get_ttl():
+    return getattr(settings, "TASK_LIST_CACHE_TTL", 60)
+
+
+def page_key(generation, url):
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+    return f"task:list:{generation}:{digest}"
+
+
+def make_page(content, etag, last_modified):
+    page = {"content": content, "etag": etag, "last_modified": last_modified, "gzip": None}
+    if getattr(settings, "TASK_LIST_CACHE_GZIP", True):
+        page["gzip"] = gzip.compress(content, compresslevel=6, mtime=0)
+    return page
+
+
+class PageResponse(Response):
+    """
+    Response sending the bytes of a cached ``page``, gzipped if ``gzipped``.
+
+    ``data`` is the payload the page was rendered from, read back from the
+    page itself when it isn't given.
+    """
+
+    def __init__(self, page, data=None, gzipped=False, **kwargs):
+        self.page = page
+        self.gzipped = gzipped
+        super().__init__(data, **kwargs)
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = json.loads(self.page["content"])
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        self["Content-Type"] = CONTENT_TYPE
+        return self.page["gzip"] if self.gzipped else self.page["content"]
+
+
+def page_response(request, page, data=None):
+    """Answer with the cached ``page``, gzipped if the client accepts it."""
+    gzipped = page["gzip"] is not None and bool(re_accepts_gzip.search(request.META.get("HTTP_ACCEPT_ENCODING", "")))
+    response = PageResponse(page, data, gzipped)
+    if gzipped:
+        response["Content-Encoding"] = "gzip"
+    if page["gzip"] is not None:
+        patch_vary_headers(response, ("Accept-Encoding",))
+    return set_validators(response, page["etag"], page["last_modified"])
+
+
+def get_page(url):
+    """Return the current generation and its cached page for ``url``, if any."""
+    generation = get_generation()
+    return generation, get_cache().get(page_key(generation, url), version=PAYLOAD_VERSION)
+
+
+async def aget_page(url):
+    generation = await aget_generation()
+    return generation, await get_cache().aget(page_key(generation, url), version=PAYLOAD_VERSION)
+
+
+def store_page(generation, url, page):
+    get_cache().set(page_key(generation, url), page, get_ttl(), version=PAYLOAD_VERSION)
+
+
+async def astore_page(generation, url, page):
+    await get_cache().aset(page_key(generation, url), page, get_ttl(), version=PAYLOAD_VERSION)
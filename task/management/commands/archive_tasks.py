@@ -0,0 +1,62 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from task.archive import archive_batch, archive_candidates, get_retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Move tasks deleted longer ago than the retention window to the archive table. "
+        "Each batch commits on its own, so an interrupted run loses nothing and the "
+        "next run picks up the remaining tasks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="retention window, at least TASK_ARCHIVE_RETENTION_DAYS (the default)")
+        parser.add_argument("--batch-size", type=int, default=500,
+                            help="tasks moved per transaction")
+        parser.add_argument("--sleep", type=float, default=0.1,
+                            help="seconds to pause between batches")
+        parser.add_argument("--max-batches", type=int, default=0,
+                            help="stop after this many batches, 0 for no limit")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="only count the tasks that would be archived")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be positive")
+
+        retention = get_retention()
+        if options["days"] is not None:
+            # Sync cursors stay valid for the retention window, so deletions
+            # must stay in the task table at least that long
+            if timedelta(days=options["days"]) < retention:
+                raise CommandError(f"--days can't be shorter than the {retention.days} day retention window")
+            retention = timedelta(days=options["days"])
+        cutoff = timezone.now() - retention
+
+        if options["dry_run"]:
+            count = archive_candidates(cutoff).count()
+            self.stdout.write(f"{count} tasks deleted before {cutoff.isoformat()} would be archived")
+            return
+
+        archived = 0
+        batches = 0
+        position = None
+        while True:
+            moved, position = archive_batch(cutoff, options["batch_size"], position)
+            if not moved:
+                break
+            archived += moved
+            batches += 1
+            self.stdout.write(f"{archived} tasks archived")
+            if options["max_batches"] and batches >= options["max_batches"]:
+                break
+            # Give other writers a turn between transactions
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"{archived} tasks archived in {batches} batches"))
@@ -0,0 +1,151 @@
+import json
+from contextlib import contextmanager
+from datetime import timedelta
+from importlib import import_module
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+from task.compression import DESCRIPTION_COLUMNS, description_columns
+from task.models import Task
+
+search_index = import_module("task.migrations.0007_task_description_search")
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed users and tasks for load testing, writing the users' credentials "
+        "and access tokens to a JSON file for benchmarks/loadtest.py."
+    )
+
+    user_prefix = "loadtest-"
+    task_prefix = "Seed task "
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--tasks", type=int, default=100_000)
+        parser.add_argument("--password", default="loadtest-password")
+        parser.add_argument("--description-length", type=int, default=200)
+        parser.add_argument("--inactive-every", type=int, default=10,
+                            help="mark every Nth task inactive, 0 for none")
+        parser.add_argument("--days", type=int, default=365,
+                            help="spread creation dates over this many days")
+        parser.add_argument("--batch-size", type=int, default=10_000,
+                            help="tasks built and inserted per transaction")
+        parser.add_argument("--output", default="loadtest_users.json")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be positive")
+
+        users = self.seed_users(options["users"], options["password"])
+        created = self.seed_tasks(options)
+
+        # Prebuild tokens so the load test does not depend on the login endpoint
+        credentials = {
+            "password": options["password"],
+            "users": [
+                {"id": user.id, "username": user.username, "access": str(AccessToken.for_user(user))}
+                for user in users
+            ],
+        }
+        with open(options["output"], "w") as f:
+            json.dump(credentials, f, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(users)} users and {created} new tasks seeded, credentials written to {options['output']}"
+        ))
+
+    def seed_users(self, count, password):
+        user_model = get_user_model()
+        usernames = [f"{self.user_prefix}{i}" for i in range(count)]
+        existing = set(user_model.objects.filter(username__in=usernames).values_list("username", flat=True))
+        # Hash the password once; every seeded user shares it
+        hashed = make_password(password)
+        user_model.objects.bulk_create(
+            user_model(username=username, password=hashed)
+            for username in usernames if username not in existing
+        )
+        return list(user_model.objects.filter(username__in=usernames).order_by("id"))
+
+    def seed_tasks(self, options):
+        total = options["tasks"]
+        batch_size = options["batch_size"]
+        inactive_every = options["inactive_every"]
+        # Continue numbering after tasks seeded by earlier runs
+        start = Task.objects.filter(name__startswith=self.task_prefix).count()
+        description = ("Lorem ipsum dolor sit amet " * (options["description_length"] // 27 + 1))
+        description = description[:options["description_length"]]
+        # Every task shares the description, so compress it only once
+        description_values = tuple(
+            Task._meta.get_field(column).get_db_prep_save(value, connection)
+            for column, value in description_columns(description).items()
+        )
+        # Oldest first, one task every ``step`` so the range spans --days
+        now = timezone.now()
+        step = timedelta(days=options["days"]) / max(total, 1)
+        oldest = now - step * total
+
+        # bulk_create spends most of its time compiling each field of each
+        # row, so insert prebuilt parameter tuples with executemany instead
+        fields = [Task._meta.get_field(name) for name in ("name", *DESCRIPTION_COLUMNS, "is_active", "date_crated", "updated_at")]
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            connection.ops.quote_name(Task._meta.db_table),
+            ", ".join(connection.ops.quote_name(field.column) for field in fields),
+            ", ".join(["%s"] * len(fields)),
+        )
+        adapt = connection.ops.adapt_datetimefield_value
+
+        with self.fts_suspended():
+            for batch_start in range(start, start + total, batch_size):
+                batch_end = min(batch_start + batch_size, start + total)
+                rows = []
+                for i in range(batch_start, batch_end):
+                    date_crated = adapt(oldest + step * (i - start))
+                    is_active = not (inactive_every and i % inactive_every == 0)
+                    rows.append((f"{self.task_prefix}{i}", *description_values, is_active, date_crated, date_crated))
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(sql, rows)
+                self.stdout.write(f"{batch_end - start}/{total} tasks")
+
+        return total
+
+    @contextmanager
+    def fts_suspended(self):
+        """
+        On SQLite, index new tasks for full-text search in one statement at
+        the end instead of through the per-row insert trigger.
+
+        The trigger is dropped and recreated inside the same transaction, so
+        an interrupted seed leaves the database as it was.
+        """
+        if connection.vendor != "sqlite":
+            yield
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'task_task_fts_insert'"
+            )
+            trigger = cursor.fetchone()
+        if trigger is None:
+            yield
+            return
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM task_task")
+            last_id = cursor.fetchone()[0]
+            cursor.execute("DROP TRIGGER task_task_fts_insert")
+            yield
+            columns = ", ".join(search_index.FTS_COLUMNS)
+            cursor.execute(
+                f"INSERT INTO task_task_fts(rowid, {columns}) "
+                f"SELECT id, {columns} FROM task_task WHERE id > %s",
+                [last_id],
+            )
+            cursor.execute(trigger[0])
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-18 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['is_active', 'date_crated', 'id'], name='task_active_created_idx'),
+        ),
+    ]
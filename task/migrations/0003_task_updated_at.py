@@ -0,0 +1,26 @@
+# Generated by Django 5.0.2 on 2026-10-18 18:46
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing rows were last written when they were created
+    Task = apps.get_model('task', 'Task')
+    Task.objects.update(updated_at=F('date_crated'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0002_task_active_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE task_task_fts USING fts5(
+        name, description, content='task_task', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER task_task_fts_insert AFTER INSERT ON task_task BEGIN
+        INSERT INTO task_task_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_task_fts_delete AFTER DELETE ON task_task BEGIN
+        INSERT INTO task_task_fts(task_task_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_task_fts_update AFTER UPDATE OF name, description ON task_task BEGIN
+        INSERT INTO task_task_fts(task_task_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO task_task_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO task_task_fts(task_task_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS task_task_fts_insert",
+    "DROP TRIGGER IF EXISTS task_task_fts_delete",
+    "DROP TRIGGER IF EXISTS task_task_fts_update",
+    "DROP TABLE IF EXISTS task_task_fts",
+]
+
+MYSQL_FORWARD = ["ALTER TABLE task_task ADD FULLTEXT INDEX task_fulltext_idx (name, description)"]
+
+MYSQL_BACKWARD = ["ALTER TABLE task_task DROP INDEX task_fulltext_idx"]
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return "ENABLE_FTS5" in {row[0] for row in cursor.fetchall()}
+
+
+def run_statements(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    # Other backends use task.search.LikeSearchBackend, which needs no index
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite' and sqlite_has_fts5(schema_editor.connection):
+        run_statements(schema_editor, SQLITE_FORWARD)
+    elif vendor == 'mysql':
+        run_statements(schema_editor, MYSQL_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        run_statements(schema_editor, SQLITE_BACKWARD)
+    elif vendor == 'mysql':
+        run_statements(schema_editor, MYSQL_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0003_task_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
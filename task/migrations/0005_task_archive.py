@@ -0,0 +1,28 @@
+# Generated by Django 5.0.2 on 2026-10-18 19:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0004_task_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=250)),
+                ('description', models.TextField()),
+                ('date_crated', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-archived_at'],
+            },
+        ),
+    ]
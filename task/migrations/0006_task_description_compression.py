@@ -0,0 +1,97 @@
+# Generated by Django 5.0.2 on 2026-10-18 19:31
+
+from importlib import import_module
+
+import task.models
+from django.db import migrations, models
+from django.db.models.functions import Length, Substr
+
+from task.compression import PREVIEW_LENGTH, description_columns, expand_description, get_threshold
+
+search_index = import_module('task.migrations.0004_task_search_index')
+
+BATCH_SIZE = 500
+
+
+def recreate_search_triggers(apps, schema_editor):
+    # SQLite adds and alters these columns by copying the table, which drops
+    # the triggers keeping the FTS table of migration 0004 in sync
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or 'task_task_fts' not in connection.introspection.table_names():
+        return
+    statements = [statement for statement in search_index.SQLITE_BACKWARD if 'TRIGGER' in statement]
+    statements += [statement for statement in search_index.SQLITE_FORWARD if 'CREATE TRIGGER' in statement]
+    search_index.run_statements(schema_editor, statements)
+
+
+def iter_batches(queryset, *fields):
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).order_by('id').values('id', *fields)[:BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]['id']
+
+
+def compress_descriptions(apps, schema_editor):
+    Task = apps.get_model('task', 'Task')
+    Task.objects.update(description_preview=Substr('description', 1, PREVIEW_LENGTH))
+    # A character takes at most four bytes, so shorter descriptions can't reach the threshold
+    candidates = Task.objects.annotate(length=Length('description')).filter(length__gte=get_threshold() // 4)
+    for batch in iter_batches(candidates, 'description'):
+        tasks = []
+        for row in batch:
+            columns = description_columns(row['description'])
+            if columns['description_compressed'] is not None:
+                tasks.append(Task(
+                    id=row['id'],
+                    description=columns['description'],
+                    description_compressed=columns['description_compressed'],
+                ))
+        Task.objects.bulk_update(tasks, ['description', 'description_compressed'])
+
+
+def expand_descriptions(apps, schema_editor):
+    Task = apps.get_model('task', 'Task')
+    compressed = Task.objects.filter(description_compressed__isnull=False)
+    for batch in iter_batches(compressed, 'description', 'description_compressed'):
+        tasks = [
+            Task(id=row['id'], description=expand_description(row['description'], row['description_compressed']))
+            for row in batch
+        ]
+        Task.objects.bulk_update(tasks, ['description'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0005_task_archive'),
+    ]
+
+    operations = [
+        # Runs last when unapplying, after the columns are dropped
+        migrations.RunPython(migrations.RunPython.noop, recreate_search_triggers),
+        migrations.AddField(
+            model_name='task',
+            name='description_compressed',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='description_preview',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='taskarchive',
+            name='description_compressed',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='description',
+            field=task.models.DescriptionField(),
+        ),
+        migrations.RunPython(recreate_search_triggers, migrations.RunPython.noop),
+        migrations.RunPython(compress_descriptions, expand_descriptions),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:18
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+from task.compression import decompress_text, search_words
+
+search_index = import_module('task.migrations.0004_task_search_index')
+compression = import_module('task.migrations.0006_task_description_compression')
+
+# Columns of the FTS5 table, named like the task_task columns they index
+FTS_COLUMNS = ('name', 'description', 'description_search')
+
+FTS_NAMES = ', '.join(FTS_COLUMNS)
+FTS_NEW = ', '.join(f'new.{column}' for column in FTS_COLUMNS)
+FTS_OLD = ', '.join(f'old.{column}' for column in FTS_COLUMNS)
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE task_task_fts USING fts5(
+        {FTS_NAMES}, content='task_task', content_rowid='id'
+    )
+    """,
+    f"""
+    CREATE TRIGGER task_task_fts_insert AFTER INSERT ON task_task BEGIN
+        INSERT INTO task_task_fts(rowid, {FTS_NAMES}) VALUES (new.id, {FTS_NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER task_task_fts_delete AFTER DELETE ON task_task BEGIN
+        INSERT INTO task_task_fts(task_task_fts, rowid, {FTS_NAMES}) VALUES ('delete', old.id, {FTS_OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER task_task_fts_update AFTER UPDATE OF {FTS_NAMES} ON task_task BEGIN
+        INSERT INTO task_task_fts(task_task_fts, rowid, {FTS_NAMES}) VALUES ('delete', old.id, {FTS_OLD});
+        INSERT INTO task_task_fts(rowid, {FTS_NAMES}) VALUES (new.id, {FTS_NEW});
+    END
+    """,
+    "INSERT INTO task_task_fts(task_task_fts) VALUES ('rebuild')",
+]
+
+MYSQL_FORWARD = [
+    "ALTER TABLE task_task DROP INDEX task_fulltext_idx",
+    f"ALTER TABLE task_task ADD FULLTEXT INDEX task_fulltext_idx ({FTS_NAMES})",
+]
+
+MYSQL_BACKWARD = ["ALTER TABLE task_task DROP INDEX task_fulltext_idx", *search_index.MYSQL_FORWARD]
+
+
+def fill_search_words(apps, schema_editor):
+    Task = apps.get_model('task', 'Task')
+    compressed = Task.objects.filter(description_compressed__isnull=False)
+    for batch in compression.iter_batches(compressed, 'description_compressed'):
+        tasks = [
+            Task(id=row['id'], description_search=search_words(decompress_text(row['description_compressed'])))
+            for row in batch
+        ]
+        Task.objects.bulk_update(tasks, ['description_search'])
+
+
+def create_search_index(apps, schema_editor):
+    # Adding the column copied the table on SQLite, dropping the old triggers
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite' and 'task_task_fts' in connection.introspection.table_names():
+        search_index.run_statements(schema_editor, search_index.SQLITE_BACKWARD + SQLITE_FORWARD)
+    elif connection.vendor == 'mysql':
+        search_index.run_statements(schema_editor, MYSQL_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        search_index.run_statements(schema_editor, search_index.SQLITE_BACKWARD)
+    elif connection.vendor == 'mysql':
+        search_index.run_statements(schema_editor, MYSQL_BACKWARD)
+
+
+def restore_search_index(apps, schema_editor):
+    # Runs last when unapplying, after the column is dropped
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite' and search_index.sqlite_has_fts5(connection):
+        search_index.run_statements(schema_editor, search_index.SQLITE_FORWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0006_task_description_compression'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_search_index),
+        migrations.AddField(
+            model_name='task',
+            name='description_search',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_words, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
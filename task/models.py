@@ -1,14 +1,82 @@
 from django.utils import timezone
 from django.db import models
 
+from .compression import PREVIEW_LENGTH, decompress_text, description_columns
+
+
+class TaskQuerySet(models.QuerySet):
+
+    def active(self):
+        # filter(is_active=True) compiles to a bare WHERE "is_active", which
+        # SQLite and MySQL cannot use to seek on task_active_created_idx
+        return self.filter(is_active=models.Value(True))
+
+    def inactive(self):
+        return self.filter(is_active=models.Value(False))
+
+
+class DescriptionField(models.TextField):
+    """
+    The full task description, compressed on save when it is long.
+
+    Saving fills the ``description_compressed``, ``description_preview`` and
+    ``description_search`` fields, which must come after it on the model, see
+    task.compression.
+    """
+
+    def pre_save(self, model_instance, add):
+        columns = description_columns(getattr(model_instance, self.attname))
+        model_instance.description_compressed = columns["description_compressed"]
+        model_instance.description_preview = columns["description_preview"]
+        model_instance.description_search = columns["description_search"]
+        return columns["description"]
+
+
 class Task(models.Model):
     name = models.CharField(max_length=250,unique=True)
-    description = models.TextField()
+    description = DescriptionField()
+    description_compressed = models.BinaryField(null=True, editable=False)
+    description_preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True, default="", editable=False)
+    description_search = models.TextField(blank=True, default="", editable=False)
     is_active = models.BooleanField(default=True)
     date_crated = models.DateTimeField(default=timezone.now, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = TaskQuerySet.as_manager()
     
     class Meta:
        ordering = ["-date_crated"]
+       indexes = [
+           models.Index(fields=["is_active", "date_crated", "id"], name="task_active_created_idx"),
+       ]
     
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        task = super().from_db(db, field_names, values)
+        # The description column only holds the preview of compressed descriptions
+        compressed = task.__dict__.get("description_compressed")
+        if compressed is not None:
+            task.description = decompress_text(compressed)
+        return task
+
+
+class TaskArchive(models.Model):
+    """A deleted task moved out of the task table by the archive_tasks command."""
+    # The task's own id, given back to it when it is restored
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=250)
+    # Both description columns as stored in the task table
+    description = models.TextField()
+    description_compressed = models.BinaryField(null=True)
+    date_crated = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ["-archived_at"]
+
+    def __str__(self):
+        return self.name
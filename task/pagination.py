@@ -0,0 +1,135 @@
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class TaskCursorPagination(BasePagination):
+    """
+    Keyset pagination over ``(-date_crated, -id)``.
+
+    Each page is fetched with a ``WHERE (date_crated, id) < (cursor)`` range
+    on the ``(is_active, date_crated, id)`` index instead of an OFFSET, so the
+    cost of a page does not depend on how deep into the list it is.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = "Invalid cursor"
+    # Columns every paginated row needs to build the cursors from
+    position_fields = ("date_crated", "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Return the unevaluated query for the requested page.
+
+        Async views evaluate it themselves and hand the rows to ``set_page``.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        self.cursor = self.decode_cursor(request)
+        self.reverse = self.cursor is not None and self.cursor["reverse"]
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self.position_filter(self.cursor))
+
+        if self.reverse:
+            queryset = queryset.order_by("date_crated", "id")
+        else:
+            queryset = queryset.order_by("-date_crated", "-id")
+
+        # Fetch one extra row to know whether there is a page after this one
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            "tasks": data,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        })
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def position_filter(self, cursor):
+        date_crated, pk = cursor["date_crated"], cursor["id"]
+        if cursor["reverse"]:
+            return Q(date_crated__gt=date_crated) | Q(date_crated=date_crated, id__gt=pk)
+        return Q(date_crated__lt=date_crated) | Q(date_crated=date_crated, id__lt=pk)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            date_crated = parse_datetime(tokens["p"][0])
+            pk = int(tokens["i"][0])
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise ParseError(self.invalid_cursor_message)
+
+        if date_crated is None:
+            raise ParseError(self.invalid_cursor_message)
+
+        return {"date_crated": date_crated, "id": pk, "reverse": reverse}
+
+    def get_position(self, task):
+        # Pages hold either model instances or values() rows
+        if isinstance(task, dict):
+            return task["date_crated"], task["id"]
+        return task.date_crated, task.id
+
+    def encode_cursor(self, task, reverse):
+        date_crated, pk = self.get_position(task)
+        tokens = {"p": date_crated.isoformat(), "i": pk}
+        if reverse:
+            tokens["r"] = "1"
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
@@ -0,0 +1,105 @@
+"""
+Full-text search backends for tasks.
+
+The backend is picked with the ``TASK_SEARCH_BACKEND`` setting. Each backend
+returns the ids of matching active tasks, best match first; the indexes are
+kept in sync by the database itself (SQLite triggers, MySQL FULLTEXT), so
+writes through ``update()`` and ``bulk_update()`` are covered too.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+FTS_TABLE = "task_task_fts"
+
+SEARCH_TOKEN_RE = re.compile(r"\w+")
+
+
+class LikeSearchBackend:
+    """
+    Fallback backend with no text index, matching on ``icontains``.
+
+    Tasks whose name matches come before those matching only on description.
+    Compressed descriptions are matched on their words in ``description_search``.
+    """
+
+    def search(self, query, offset, limit):
+        terms = SEARCH_TOKEN_RE.findall(query)
+        if not terms:
+            return []
+        matches = Q()
+        name_matches = Q()
+        for term in terms:
+            matches &= Q(name__icontains=term) | Q(description__icontains=term) | Q(description_search__icontains=term)
+            name_matches &= Q(name__icontains=term)
+        queryset = (
+            Task.objects.filter(matches, is_active=True)
+            .annotate(rank=Case(When(name_matches, then=Value(0)), default=Value(1), output_field=IntegerField()))
+            .order_by("rank", "-date_crated", "-id")
+        )
+        return list(queryset.values_list("id", flat=True)[offset:offset + limit])
+
+
+class SQLiteFTSBackend:
+    """Backend over the FTS5 table of migrations 0004 and 0007, ranked by bm25."""
+
+    def search(self, query, offset, limit):
+        if not fts_table_exists():
+            return LikeSearchBackend().search(query, offset, limit)
+        match = fts_match_expression(query)
+        if not match:
+            return []
+        sql = (
+            f"SELECT task_task.id FROM {FTS_TABLE} "
+            f"JOIN task_task ON task_task.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND task_task.is_active "
+            f"ORDER BY bm25({FTS_TABLE}), task_task.id LIMIT %s OFFSET %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [match, limit, offset])
+            return [row[0] for row in cursor.fetchall()]
+
+
+class MySQLFullTextBackend:
+    """Backend over the FULLTEXT (name, description, description_search) index of migration 0007."""
+
+    def search(self, query, offset, limit):
+        if not query.strip():
+            return []
+        rank = RawSQL("MATCH (name, description, description_search) AGAINST (%s IN NATURAL LANGUAGE MODE)", (query,))
+        queryset = (
+            Task.objects.filter(is_active=True)
+            .annotate(rank=rank)
+            .filter(rank__gt=0)
+            .order_by("-rank", "id")
+        )
+        return list(queryset.values_list("id", flat=True)[offset:offset + limit])
+
+
+def fts_match_expression(query):
+    """
+    Turn free text into an FTS5 query: every word must match, and the last
+    one is a prefix so partially typed words still find results.
+    """
+    terms = SEARCH_TOKEN_RE.findall(query)
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+@lru_cache(maxsize=None)
+def fts_table_exists():
+    return FTS_TABLE in connection.introspection.table_names()
+
+
+def get_search_backend():
+    return import_string(getattr(settings, "TASK_SEARCH_BACKEND", "task.search.LikeSearchBackend"))()
@@ -1,11 +1,63 @@
 from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from .filters import TaskFilter
 from .models import Task
 
 class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
-        fields = ["id", "name","description","date_crated"]
+        fields = ["id", "name","description","date_crated","description_preview"]
+
+    # Fields serialized unless others are requested; the rest only on request
+    default_fields = ["id", "name","description","date_crated"]
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Keep only the requested fields, see parse_fields
+        if fields is None:
+            fields = self.default_fields
+        for name in set(self.fields) - set(fields):
+            self.fields.pop(name)
+
+def parse_fields(value):
+    """
+    Parse a ``?fields=id,name`` sparse fieldset into a tuple of TaskSerializer
+    fields in their usual order, or None for the default fields.
+    """
+    if value is None:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested - set(TaskSerializer.Meta.fields)
+    if unknown:
+        raise ParseError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise ParseError("No fields requested")
+    return tuple(name for name in TaskSerializer.Meta.fields if name in requested)
         
 class CrateTaskSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=250)
-    description = serializers.CharField()
\ No newline at end of file
+    description = serializers.CharField()
+
+class BulkEditTaskSerializer(CrateTaskSerializer):
+    id = serializers.IntegerField()
+
+class BatchTaskSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=500)
+
+class BulkDeleteTaskSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=10000)
+    filter = serializers.DictField(required=False)
+
+    def validate_filter(self, value):
+        # TaskFilter ignores keys it doesn't declare, which would match every task
+        if not value:
+            raise serializers.ValidationError("Provide at least one filter.")
+        unknown = set(value) - set(TaskFilter.base_filters)
+        if unknown:
+            raise serializers.ValidationError(f"Unknown filters: {', '.join(sorted(unknown))}")
+        return value
+
+    def validate(self, data):
+        if ("ids" in data) == ("filter" in data):
+            raise serializers.ValidationError("Provide either ids or filter.")
+        return data
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+import pytest
+
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from task.models import Task, TaskArchive
+
+def create_deleted_task(name, days_ago):
+    task = Task.objects.create(name=name, description="Task Description", is_active=False)
+    # Deleting a task sets updated_at, so backdate it past the retention window
+    Task.objects.filter(id=task.id).update(updated_at=timezone.now() - timedelta(days=days_ago))
+    return task
+
+# Test that only tasks deleted before the retention window are archived
+@pytest.mark.django_db
+def test_archive_tasks_command(settings):
+    settings.TASK_ARCHIVE_RETENTION_DAYS = 30
+    old_tasks = [create_deleted_task(f"Old {i}", days_ago=40) for i in range(5)]
+    recent_task = create_deleted_task("Recent", days_ago=5)
+    active_task = Task.objects.create(name="Active", description="Task Description")
+    Task.objects.filter(id=active_task.id).update(updated_at=timezone.now() - timedelta(days=40))
+
+    # Archive in batches of two without pausing
+    call_command("archive_tasks", batch_size=2, sleep=0)
+
+    # Check that the old deleted tasks moved with their data
+    assert set(TaskArchive.objects.values_list("id", flat=True)) == {task.id for task in old_tasks}
+    assert set(Task.objects.values_list("id", flat=True)) == {recent_task.id, active_task.id}
+    archived = TaskArchive.objects.get(id=old_tasks[0].id)
+    assert (archived.name, archived.date_crated) == ("Old 0", old_tasks[0].date_crated)
+
+# Test a dry run and stopping after a number of batches
+@pytest.mark.django_db
+def test_archive_tasks_dry_run_and_max_batches():
+    for i in range(5):
+        create_deleted_task(f"Old {i}", days_ago=40)
+
+    # A dry run moves nothing
+    call_command("archive_tasks", dry_run=True, days=30)
+    assert not TaskArchive.objects.exists()
+
+    # Stop after one batch, then let a second run finish the rest
+    call_command("archive_tasks", days=30, batch_size=2, max_batches=1, sleep=0)
+    assert TaskArchive.objects.count() == 2
+    call_command("archive_tasks", days=30, batch_size=2, sleep=0)
+    assert TaskArchive.objects.count() == 5
+    assert not Task.objects.exists()
+
+# Test that the command refuses a window shorter than the retention setting
+@pytest.mark.django_db
+def test_archive_tasks_days_below_retention(settings):
+    settings.TASK_ARCHIVE_RETENTION_DAYS = 30
+    create_deleted_task("Old", days_ago=10)
+
+    with pytest.raises(CommandError):
+        call_command("archive_tasks", days=7, sleep=0)
+    assert not TaskArchive.objects.exists()
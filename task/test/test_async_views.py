@@ -0,0 +1,131 @@
+import pytest
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from users.test.fixtures import common_user, common_user_token
+
+from django.urls import reverse
+
+from task.models import Task
+
+# Test creating a task through the async view
+@pytest.mark.django_db
+def test_async_create_task(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Make POST request to create a task
+    url = reverse("async-create-task")
+    payload = {"name": "Task Name", "description": "Task Description"}
+    response = client.post(url, data=payload, format="json")
+    
+    # Assert that the task is created successfully
+    assert response.status_code == status.HTTP_200_OK
+    task = Task.objects.get(id=response.json().get("data").get("id"))
+    assert task.name == "Task Name"
+    
+    # Assert that a second task with the same name is rejected
+    response = client.post(url, data=payload, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+# Test reading, editing and deleting a task through the async views
+@pytest.mark.django_db
+def test_async_task_detail_edit_and_delete(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a task in the database
+    task = Task.objects.create(name="Task Name", description="Task Description")
+    url = reverse("async-task", kwargs={"pk": task.id})
+    
+    # Assert that the task is returned and can be revalidated
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get("task").get("name") == "Task Name"
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    
+    # Edit the task and assert that the detail reflects it
+    payload = {"name": "Task Renamed", "description": "Task Description edited"}
+    response = client.put(reverse("async-edit-task", kwargs={"pk": task.id}), data=payload, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get(url).json().get("task").get("name") == "Task Renamed"
+    
+    # Delete the task and assert that it is gone
+    response = client.delete(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get(url).status_code == status.HTTP_404_NOT_FOUND
+    assert client.delete(url).status_code == status.HTTP_404_NOT_FOUND
+
+# Test listing tasks through the async view
+@pytest.mark.django_db
+def test_async_task_list(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create three tasks in the database
+    for i in range(3):
+        Task.objects.create(name=f"Task {i}", description="Task Description")
+    
+    # Make GET requests for both pages of the list
+    url = reverse("async-task-list")
+    response = client.get(url, {"page_size": 2})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json().get("tasks")) == 2
+    second_response = client.get(response.json().get("next"))
+    
+    # Assert that the second page holds the remaining task
+    assert len(second_response.json().get("tasks")) == 1
+    assert second_response.json().get("next") is None
+    
+    # Assert that a sparse fieldset limits the fields of every task
+    response = client.get(url, {"fields": "id,name"})
+    assert [list(task) for task in response.json().get("tasks")] == [["id", "name"]] * 3
+    assert client.get(url, {"fields": "owner"}).status_code == status.HTTP_400_BAD_REQUEST
+
+# Test the async views without authentication
+@pytest.mark.django_db
+def test_async_views_without_authentication():
+    # Create API client without setting authorization header
+    client = APIClient()
+    
+    # Make GET request to the async task list
+    response = client.get(reverse("async-task-list"))
+    
+    # Assert that the request returns a 401 error with the authentication scheme
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response["WWW-Authenticate"].startswith("Bearer")
+    
+    # Assert that an invalid token is rejected too
+    client.credentials(HTTP_AUTHORIZATION="Bearer not-a-token")
+    response = client.get(reverse("async-task-list"))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+# Test that the async write routes don't ask token clients for a CSRF token
+@pytest.mark.django_db
+def test_async_views_without_csrf_token(common_user_token):
+    # Create API client enforcing CSRF checks like a browser session would get
+    client = APIClient(enforce_csrf_checks=True)
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + common_user_token.get("access"))
+    
+    # Create, edit and delete a task through the async views
+    response = client.post(reverse("async-create-task"), {"name": "Task Name", "description": "Task Description"}, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    pk = response.json().get("data").get("id")
+    payload = {"name": "Task Renamed", "description": "Task Description edited"}
+    response = client.put(reverse("async-edit-task", kwargs={"pk": pk}), data=payload, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    response = client.delete(reverse("async-task", kwargs={"pk": pk}))
+    assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,23 @@
+from task.checks import check_shared_caches
+
+REDIS = {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://127.0.0.1:6379/0"}
+LOCMEM = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+
+# Test that a production setup with a per-process cache is flagged
+def test_process_local_cache_flagged(settings):
+    settings.DEBUG = False
+    settings.CACHES = {"default": LOCMEM}
+    assert [warning.obj for warning in check_shared_caches(None)] == ["TASK_CACHE_ALIAS", "TASK_GENERATION_CACHE_ALIAS", "IDEMPOTENCY_CACHE_ALIAS"]
+
+    # A shared cache or DEBUG (a single runserver process) passes
+    settings.CACHES = {"default": REDIS}
+    assert check_shared_caches(None) == []
+
+    # Each alias is checked on its own
+    settings.CACHES = {"default": REDIS, "local": LOCMEM}
+    settings.IDEMPOTENCY_CACHE_ALIAS = "local"
+    assert [warning.obj for warning in check_shared_caches(None)] == ["IDEMPOTENCY_CACHE_ALIAS"]
+    settings.IDEMPOTENCY_CACHE_ALIAS = "default"
+    settings.CACHES = {"default": LOCMEM}
+    settings.DEBUG = True
+    assert check_shared_caches(None) == []
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+import pytest
+from rest_framework.test import APIClient
+from users.test.fixtures import common_user, common_user_token
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from task.archive import archive_batch, restore_task
+from task.compression import compress_text, decompress_text, description_columns
+from task.models import Task, TaskArchive
+
+# A log paste well above the compression threshold
+LONG_DESCRIPTION = "\n".join(f"2024-02-18 05:49:{i % 60:02d} ERROR worker {i} failed: timeout" for i in range(2000))
+
+def stored_columns(pk):
+    return Task.objects.values("description", "description_compressed", "description_preview").get(id=pk)
+
+# Test the compression helpers on short and long text
+def test_description_columns(settings):
+    settings.TASK_DESCRIPTION_COMPRESS_THRESHOLD = 1024
+
+    # Short text is stored as is, long text compressed with its preview in the description column
+    assert description_columns("Short") == {
+        "description": "Short", "description_compressed": None, "description_preview": "Short", "description_search": "",
+    }
+    columns = description_columns(LONG_DESCRIPTION)
+    assert columns["description"] == columns["description_preview"] == LONG_DESCRIPTION[:200]
+    assert len(columns["description_compressed"]) < len(LONG_DESCRIPTION) / 10
+    assert decompress_text(columns["description_compressed"]) == LONG_DESCRIPTION
+    # Each word of the whole text is kept once for the search indexes
+    words = columns["description_search"].split()
+    assert words[:6] == ["2024", "02", "18", "05", "49", "00"]
+    assert "1999" in words and words.count("error") == 1
+
+    # Text below the threshold is never compressed
+    assert compress_text("x" * 1023) is None
+    assert compress_text("x" * 1024) is not None
+
+# Test that long descriptions are stored compressed and read back whole by every endpoint
+@pytest.mark.django_db
+def test_long_descriptions_round_trip(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+
+    # Create tasks through save(), the API and the bulk create endpoint
+    task = Task.objects.create(name="Saved", description=LONG_DESCRIPTION)
+    assert task.description == LONG_DESCRIPTION
+    created = client.post(reverse("create-task"), {"name": "Created", "description": LONG_DESCRIPTION}, format="json")
+    bulk = client.post(reverse("bulk-create-task"), [{"name": "Bulk", "description": LONG_DESCRIPTION}], format="json")
+    ids = [task.id, created.data.get("data").get("id"), bulk.data.get("results")[0].get("data").get("id")]
+
+    # Assert that every one is stored compressed
+    for pk in ids:
+        columns = stored_columns(pk)
+        assert columns["description"] == columns["description_preview"] == LONG_DESCRIPTION[:200]
+        assert columns["description_compressed"] is not None
+
+    # Assert that the detail, list and export return the whole description
+    for pk in ids:
+        assert client.get(reverse("task", kwargs={"pk": pk})).json().get("task").get("description") == LONG_DESCRIPTION
+        assert Task.objects.get(id=pk).description == LONG_DESCRIPTION
+    tasks = client.get(reverse("task-list")).json().get("tasks")
+    assert [task.get("description") for task in tasks] == [LONG_DESCRIPTION] * 3
+    response = client.get(reverse("task-export"), {"output": "csv"})
+    assert b"".join(response.streaming_content).count(LONG_DESCRIPTION[-100:].encode()) == 3
+
+    # Bulk edit one task to a short description and check that the compressed copy is gone
+    client.put(reverse("bulk-edit-task"), [{"id": ids[0], "name": "Saved", "description": "Short now"}], format="json")
+    assert stored_columns(ids[0]) == {"description": "Short now", "description_compressed": None, "description_preview": "Short now"}
+    assert Task.objects.get(id=ids[0]).description == "Short now"
+
+# Test that previews are listed without reading the descriptions
+@pytest.mark.django_db
+def test_list_description_previews(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+
+    # Create a long and a short task
+    Task.objects.create(name="Long", description=LONG_DESCRIPTION)
+    Task.objects.create(name="Short", description="Short description")
+
+    # List their previews, capturing the queries
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("task-list"), {"fields": "name,description_preview"})
+
+    # Assert that the previews are returned and no description column is read
+    assert response.json().get("tasks") == [
+        {"name": "Short", "description_preview": "Short description"},
+        {"name": "Long", "description_preview": LONG_DESCRIPTION[:200]},
+    ]
+    assert not any('"description"' in query["sql"] or "description_compressed" in query["sql"] for query in queries.captured_queries)
+
+# Test that archiving and restoring a task keeps its compressed description
+@pytest.mark.django_db
+def test_archive_keeps_compressed_description():
+    # Archive a deleted task with a long description
+    task = Task.objects.create(name="Long", description=LONG_DESCRIPTION, is_active=False)
+    archive_batch(timezone.now() + timedelta(seconds=1), 10)
+
+    # Check that the archive holds the compressed copy, then restore the task
+    archived = TaskArchive.objects.get(id=task.id)
+    assert archived.description_compressed is not None
+    restore_task(task.id)
+    assert Task.objects.get(id=task.id).description == LONG_DESCRIPTION
+    assert stored_columns(task.id)["description_compressed"] is not None
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from asgiref.sync import async_to_sync
+from django.db import connection, connections
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+from rest_framework import status
+from users.test.fixtures import common_user, common_user_token
+
+from django.urls import reverse
+
+from api.db.pool import get_pool
+from api.db.sqlite3.base import DatabaseWrapper
+from task.events import CREATED, DELETED, UPDATED, InProcessBroker, Overflow, get_broker
+
+# Test that a subscriber resumes after its last event or is told to reset
+def test_broker_resume_and_overflow():
+    async def scenario():
+        broker = InProcessBroker(history=3, buffer_size=2)
+        broker.publish([(CREATED, {"id": 1}), (UPDATED, {"id": 1})])
+        first, second = broker.history
+
+        # Resuming after the first event gets the second one back, then new events
+        subscription = broker.subscribe(first.id)
+        assert [event.id for event in await subscription.get(1)] == [second.id]
+        broker.publish([(DELETED, {"id": 1})])
+        events = await subscription.get(1)
+        assert [event.type for event in events] == [DELETED]
+        assert events[0].message.endswith(b'data: {"id":1}\n\n')
+        # A subscriber with nothing to receive times out with no events
+        assert await subscription.get(0.01) == []
+
+        # Ids evicted from the history, from another broker or garbled get a reset
+        broker.publish([(CREATED, {"id": 2}), (CREATED, {"id": 3})])
+        for last_event_id in (first.id, "other-1", "garbled", None):
+            assert broker.subscribe(last_event_id).reset == (last_event_id is not None)
+
+        # A subscriber falling further behind than its buffer is dropped
+        broker.publish([(CREATED, {"id": n}) for n in range(4, 7)])
+        await asyncio.sleep(0)
+        with pytest.raises(Overflow):
+            await subscription.get(1)
+
+        broker.unsubscribe(subscription)
+        assert subscription not in broker.loops[asyncio.get_running_loop()]
+
+    asyncio.run(scenario())
+
+# Test that writes through the views publish events once committed
+@pytest.mark.django_db
+def test_views_publish_task_events(common_user_token, django_capture_on_commit_callbacks):
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + common_user_token.get("access"))
+    broker = get_broker()
+    start = broker.last_sequence
+
+    # Create, edit and delete a task, then bulk create two more
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(reverse("create-task"), {"name": "Task Name", "description": "Task Description"}, format="json")
+        pk = response.json()["data"]["id"]
+        client.put(reverse("edit-task", kwargs={"pk": pk}), {"name": "Task Renamed", "description": "Edited"}, format="json")
+        client.delete(reverse("task", kwargs={"pk": pk}))
+        client.post(reverse("bulk-create-task"), [{"name": f"Bulk {n}", "description": "Bulk"} for n in range(2)], format="json")
+
+    # Assert that one event per change was published, in order
+    events = [event for event in broker.history if event.sequence > start]
+    assert [event.type for event in events] == [CREATED, UPDATED, DELETED, CREATED, CREATED]
+    assert b'"name":"Task Renamed"' in events[1].message
+
+# Test streaming events over ASGI, resuming after the last event seen
+@pytest.mark.django_db
+def test_async_task_event_stream(common_user_token, settings):
+    settings.TASK_EVENTS_HEARTBEAT = 0.01
+    headers = {"Authorization": "Bearer " + common_user_token.get("access")}
+    url = reverse("async-task-events")
+    broker = get_broker()
+
+    async def read_stream():
+        broker.publish([(CREATED, {"id": 1})])
+        missed = broker.history[-1]
+        broker.publish([(UPDATED, {"id": 1})])
+
+        response = await AsyncClient().get(url, headers={**headers, "Last-Event-ID": missed.id})
+        assert response["Content-Type"] == "text/event-stream"
+        stream = aiter(response.streaming_content)
+        assert await anext(stream) == b"retry: 3000\n\n"
+        # The event published after the client's last one comes first
+        assert await anext(stream) == broker.history[-1].message
+        # An idle stream sends heartbeats
+        assert await anext(stream) == b": heartbeat\n\n"
+        await stream.aclose()
+
+    async_to_sync(read_stream)()
+    # Assert that closing the stream unsubscribed it
+    assert not broker.loops
+
+    # Assert that the stream is refused outside ASGI
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=headers["Authorization"])
+    assert client.get(url).status_code == status.HTTP_400_BAD_REQUEST
+
+# Test that an open stream doesn't keep a pooled connection checked out
+@pytest.mark.django_db
+def test_async_task_event_stream_releases_connection(common_user_token, tmp_path):
+    headers = {"Authorization": "Bearer " + common_user_token.get("access")}
+    url = reverse("async-task-events")
+    # The test database is in memory and not pooled, so use a pooled file database
+    pooled = DatabaseWrapper(
+        {**connection.settings_dict, "NAME": str(tmp_path / "pool.sqlite3"), "POOL": {"MAX_SIZE": 1}},
+        alias=f"stream-{tmp_path.name}",
+    )
+
+    # Authenticate once against the test database, leaving the user cached
+    async_to_sync(AsyncClient().get)(reverse("async-task-list"), headers=headers)
+
+    async def read_stream():
+        response = await AsyncClient().get(url, headers=headers)
+        stream = aiter(response.streaming_content)
+        assert await anext(stream) == b"retry: 3000\n\n"
+        # Assert that the connection went back to the pool while the stream is open
+        assert get_pool(pooled).snapshot()["in_use"] == 0
+        await stream.aclose()
+
+    # Then stand in for a request whose earlier queries opened a connection
+    default = connections["default"]
+    connections["default"] = pooled
+    try:
+        pooled.ensure_connection()
+        async_to_sync(read_stream)()
+    finally:
+        connections["default"] = default
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime, timezone as dt_timezone
+
+import pytest
+from rest_framework.test import APIClient
+from users.test.fixtures import common_user, common_user_token
+
+from django.urls import reverse
+
+from task.fastpath import get_plan, TaskPayloadPlan
+from task.models import Task
+from task.serializers import TaskSerializer
+
+# Tasks covering the values the fast path has to format like TaskSerializer
+TASKS = [
+    {"name": "Task Name", "description": "Task Description"},
+    {"name": "Tâche ✓ 任务", "description": "Line 1\nLine 2 \"quoted\" \\"},
+    {"name": "Empty description", "description": ""},
+    {"name": "  Padded name  ", "description": "  padded  "},
+    {"name": "Whole second", "description": "x", "date_crated": datetime(2024, 2, 18, 5, 49, tzinfo=dt_timezone.utc)},
+    {"name": "Microseconds", "description": "x" * 10000, "date_crated": datetime(2024, 2, 18, 5, 49, 1, 123456, tzinfo=dt_timezone.utc)},
+]
+
+def create_tasks():
+    return [Task.objects.create(**data) for data in TASKS]
+
+# Test that the plan formats every row exactly like TaskSerializer
+@pytest.mark.django_db
+def test_plan_matches_task_serializer():
+    # Create the tasks in the database
+    tasks = create_tasks()
+    
+    # Format their values() rows with the plan
+    plan = get_plan()
+    rows = Task.objects.filter(id__in=[task.id for task in tasks]).values(*plan.columns).order_by("id")
+    
+    # Assert that the output is identical, key order included
+    for task, row in zip(tasks, rows):
+        expected = TaskSerializer(Task.objects.get(id=task.id)).data
+        assert json.dumps(plan.format(row)) == json.dumps(expected)
+
+# Test that the plan follows the configured datetime format
+@pytest.mark.django_db
+def test_plan_matches_task_serializer_with_datetime_format(settings):
+    # Use a custom datetime output format
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "DATETIME_FORMAT": "%d/%m/%Y %H:%M"}
+    
+    # Create a task in the database
+    task = Task.objects.create(name="Task Name", description="Task Description")
+    
+    # Assert that a freshly compiled plan formats it like TaskSerializer
+    plan = TaskPayloadPlan()
+    row = Task.objects.values(*plan.columns).get(id=task.id)
+    assert plan.format(row) == TaskSerializer(task).data
+
+# Test that list, detail and export answer with TaskSerializer output
+@pytest.mark.django_db
+def test_endpoints_match_task_serializer(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create the tasks and serialize them the slow way
+    create_tasks()
+    expected = {task.id: TaskSerializer(task).data for task in Task.objects.all()}
+    
+    # Assert that the list returns the same payloads
+    for task in client.get(reverse("task-list")).json().get("tasks"):
+        assert task == expected[task["id"]]
+    
+    # Assert that the sync and async details return the same payloads
+    for pk, data in expected.items():
+        assert client.get(reverse("task", kwargs={"pk": pk})).json().get("task") == data
+    for pk, data in expected.items():
+        assert client.get(reverse("async-task", kwargs={"pk": pk})).json().get("task") == data
+    
+    # Assert that the export returns the same payloads
+    response = client.get(reverse("task-export"))
+    for line in b"".join(response.streaming_content).splitlines():
+        task = json.loads(line)
+        assert task == expected[task["id"]]
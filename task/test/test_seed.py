@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from rest_framework.test import APIClient
+
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from task.models import Task
+
+# Test that the seed command creates users, tasks and usable tokens
+@pytest.mark.django_db(transaction=True)
+def test_seed_creates_users_tasks_and_tokens(tmp_path):
+    output = tmp_path / "users.json"
+    # Seed in batches smaller than the task count
+    call_command("seed", users=3, tasks=25, batch_size=10, inactive_every=5, output=str(output))
+
+    # Check the tasks, with every 5th one inactive
+    assert Task.objects.filter(name__startswith="Seed task ").count() == 25
+    assert Task.objects.filter(is_active=False).count() == 5
+
+    # Check the credentials file and that its tokens authenticate
+    credentials = json.loads(output.read_text())
+    assert len(credentials["users"]) == 3
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + credentials["users"][0]["access"])
+    response = client.get(reverse("task-list"))
+    assert response.status_code == 200
+    assert len(response.data["tasks"]) == 20
+
+    # Check that the seeded tasks are found by the search endpoint
+    response = client.get(reverse("task-search"), {"q": "Seed task 24"})
+    assert response.status_code == 200
+    assert response.data["tasks"][0]["name"] == "Seed task 24"
+
+# Test that running the seed command again adds tasks instead of failing
+@pytest.mark.django_db(transaction=True)
+def test_seed_continues_numbering(tmp_path):
+    output = tmp_path / "users.json"
+    call_command("seed", users=1, tasks=5, output=str(output))
+    call_command("seed", users=1, tasks=5, output=str(output))
+
+    # Check that the users were reused and the tasks numbered on
+    assert Task.objects.count() == 10
+    assert Task.objects.filter(name="Seed task 9").exists()
+    assert len(json.loads(output.read_text())["users"]) == 1
+
+# Test that seeded tasks with compressed descriptions are indexed in full
+@pytest.mark.django_db(transaction=True)
+def test_seed_long_descriptions_indexed(tmp_path, settings):
+    settings.TASK_DESCRIPTION_COMPRESS_THRESHOLD = 1024
+    call_command("seed", users=1, tasks=5, description_length=20000, output=str(tmp_path / "users.json"))
+
+    # Check that the descriptions were compressed and their words stored for search
+    task = Task.objects.get(name="Seed task 0")
+    assert task.description_compressed is not None
+    assert task.description_search.startswith("lorem ipsum dolor sit amet")
+
+    # Check that the full-text index is consistent and covers the search words
+    with connection.cursor() as cursor:
+        cursor.execute("INSERT INTO task_task_fts(task_task_fts) VALUES ('integrity-check')")
+        cursor.execute("SELECT COUNT(*) FROM task_task_fts WHERE task_task_fts MATCH 'description_search:amet'")
+        assert cursor.fetchone() == (5,)
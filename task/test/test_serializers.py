@@ -1,6 +1,7 @@
 import pytest
+from rest_framework.exceptions import ParseError
 from task.models import Task
-from task.serializers import TaskSerializer, CrateTaskSerializer
+from task.serializers import TaskSerializer, CrateTaskSerializer, parse_fields
 
 # Test the TaskSerializer class
 @pytest.mark.django_db
@@ -40,3 +41,23 @@ def test_create_task_serializer_with_invalid_data():
     # Verify that the serializer is invalid and that the error is related to the missing 'name' field
     assert serializer.is_valid() == False
     assert "name" in serializer.errors
+
+# Test parsing a sparse fieldset and serializing only those fields
+@pytest.mark.django_db
+def test_task_serializer_sparse_fields():
+    # Create a task object
+    task = Task.objects.create(name="Task Name", description="Task Description")
+    
+    # Parse the fieldset, which keeps the serializer's field order and drops duplicates
+    fields = parse_fields(" name, id,name ")
+    assert fields == ("id", "name")
+    assert parse_fields(None) is None
+    
+    # Verify that only the requested fields are serialized
+    assert TaskSerializer(task, fields=fields).data == {"id": task.id, "name": "Task Name"}
+    
+    # Verify that unknown and empty fieldsets are rejected
+    with pytest.raises(ParseError):
+        parse_fields("name,owner")
+    with pytest.raises(ParseError):
+        parse_fields(",")
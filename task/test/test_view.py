@@ -1,12 +1,27 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
 import pytest
 
 from rest_framework.test import APIClient
 from rest_framework import status
 from users.test.fixtures import common_user, common_user_token
 
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
-from task.models import Task
+from task.archive import archive_batch
+from task import cache as task_cache
+from task.cache import GENERATION_KEY, bump_generation, invalidate_tasks_on_commit, refresh_task_on_commit
+from task.changes import encode_cursor
+from task.models import Task, TaskArchive
+from task.serializers import TaskSerializer
 
 # ===========================================
 # ============== CREATE TASK ================
@@ -332,6 +347,58 @@ def test_get_task_list_without_authentication():
     
     # Assert that the request returns a 401 error due to lack of authentication
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+# Test walking the task list forwards and backwards with cursors
+@pytest.mark.django_db
+def test_task_list_cursor_pagination(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create five tasks sharing the same creation date so the id tie-breaker is used
+    date_crated = timezone.now()
+    for i in range(5):
+        Task.objects.create(name=f"Task {i}", description="Task Description", date_crated=date_crated)
+    
+    # Request the first page
+    url = reverse("task-list")
+    response = client.get(url, {"page_size": 2})
+    assert response.status_code == status.HTTP_200_OK
+    first_page = [task["name"] for task in response.data.get("tasks")]
+    assert first_page == ["Task 4", "Task 3"]
+    assert response.data.get("previous") is None
+    
+    # Follow the next cursors until the end of the list
+    second_response = client.get(response.data.get("next"))
+    assert [task["name"] for task in second_response.data.get("tasks")] == ["Task 2", "Task 1"]
+    third_response = client.get(second_response.data.get("next"))
+    assert [task["name"] for task in third_response.data.get("tasks")] == ["Task 0"]
+    assert third_response.data.get("next") is None
+    
+    # Go back one page with the previous cursor
+    previous_response = client.get(third_response.data.get("previous"))
+    assert [task["name"] for task in previous_response.data.get("tasks")] == ["Task 2", "Task 1"]
+
+# Test the task list with a malformed cursor
+@pytest.mark.django_db
+def test_task_list_invalid_cursor(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Make GET request with a cursor that was not issued by the API
+    url = reverse("task-list")
+    response = client.get(url, {"cursor": "not-a-cursor"})
+    
+    # Assert that the request is rejected
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data.get("error") == "Invalid cursor"
     
 
 # ===========================================
@@ -445,3 +512,875 @@ def test_edit_task_without_authentication(common_user_token):
     
     # Assert that the request returns a 401 error due to lack of authentication
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+# ===========================================
+# ============== EXPORT TASKS ===============
+# ===========================================
+
+# Test exporting active tasks as NDJSON
+@pytest.mark.django_db
+def test_export_tasks_ndjson(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create two active tasks and an inactive one
+    Task.objects.create(name="Task 1", description="Task Description 1")
+    Task.objects.create(name="Task 2", description="Task Description 2")
+    Task.objects.create(name="Task 3", description="Task Description 3", is_active=False)
+    
+    # Make GET request to export the tasks
+    url = reverse("task-export")
+    response = client.get(url)
+    
+    # Assert that only the active tasks are streamed, one JSON document per line
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["Task 1", "Task 2"]
+
+# Test exporting tasks as gzipped CSV
+@pytest.mark.django_db
+def test_export_tasks_csv_gzip(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a task in the database
+    Task.objects.create(name="Task 1", description="Task, with a comma")
+    
+    # Make GET request asking for a compressed CSV export
+    url = reverse("task-export")
+    response = client.get(url, {"output": "csv"}, HTTP_ACCEPT_ENCODING="gzip")
+    
+    # Assert that the body is gzip encoded CSV with a header row
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Encoding"] == "gzip"
+    body = gzip.decompress(b"".join(response.streaming_content)).decode("utf-8")
+    rows = list(csv.reader(io.StringIO(body)))
+    assert rows[0] == ["id", "name", "description", "date_crated"]
+    assert rows[1][1:3] == ["Task 1", "Task, with a comma"]
+
+# Test exporting tasks with an unknown format
+@pytest.mark.django_db
+def test_export_tasks_unsupported_format(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Make GET request with an unsupported output format
+    url = reverse("task-export")
+    response = client.get(url, {"output": "xml"})
+    
+    # Assert that the request is rejected
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+# ===========================================
+# ============ BULK CREATE TASKS ============
+# ===========================================
+
+# Test creating several tasks in one request with per-item results
+@pytest.mark.django_db
+def test_bulk_create_tasks(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a task whose name will collide with the payload
+    Task.objects.create(name="Existing Task", description="Task Description")
+    
+    # Prepare a payload with valid, invalid, duplicated and already taken names
+    payload = [
+        {"name": "Task 1", "description": "Task Description 1"},
+        {"name": "Task 2"},
+        {"name": "Existing Task", "description": "Task Description"},
+        {"name": "Task 1", "description": "Task Description 1 again"},
+        {"name": "Task 3", "description": "Task Description 3"},
+    ]
+    
+    # Make POST request to create the tasks
+    url = reverse("bulk-create-task")
+    response = client.post(url, data=payload, format="json")
+    
+    # Assert that the valid rows are created and the others are reported
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data.get("created") == 2
+    assert response.data.get("failed") == 3
+    results = response.data.get("results")
+    assert [result["status"] for result in results] == ["created", "error", "error", "error", "created"]
+    assert "description" in results[1]["errors"]
+    assert "name" in results[2]["errors"]
+    assert "name" in results[3]["errors"]
+    task = Task.objects.get(id=results[4]["data"]["id"])
+    assert task.name == "Task 3"
+
+# Test bulk creation with a body that is not a list
+@pytest.mark.django_db
+def test_bulk_create_tasks_with_invalid_payload(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Make POST request with a single object instead of a list
+    url = reverse("bulk-create-task")
+    response = client.post(url, data={"name": "Task 1", "description": "Task Description"}, format="json")
+    
+    # Assert that the request is rejected and nothing is created
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Task.objects.exists()
+
+# ===========================================
+# ========= BULK EDIT / DELETE TASKS ========
+# ===========================================
+
+# Test editing several tasks in one request
+@pytest.mark.django_db
+def test_bulk_edit_tasks(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create the tasks to edit and one whose name is already taken
+    first_task = Task.objects.create(name="Task 1", description="Task Description 1")
+    second_task = Task.objects.create(name="Task 2", description="Task Description 2")
+    Task.objects.create(name="Taken Name", description="Task Description")
+    
+    # Prepare a payload with a valid edit, a name clash and an unknown id
+    payload = [
+        {"id": first_task.id, "name": "Task 1 Renamed", "description": "Task Description edited"},
+        {"id": second_task.id, "name": "Taken Name", "description": "Task Description edited"},
+        {"id": 999, "name": "Task 999", "description": "Task Description"},
+    ]
+    
+    # Make PUT request to edit the tasks
+    url = reverse("bulk-edit-task")
+    response = client.put(url, data=payload, format="json")
+    
+    # Assert that only the valid edit is applied and the rest is reported
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data.get("updated") == 1
+    assert response.data.get("not_found") == [999]
+    assert [error["index"] for error in response.data.get("errors")] == [1]
+    first_task.refresh_from_db()
+    second_task.refresh_from_db()
+    assert first_task.name == "Task 1 Renamed"
+    assert second_task.name == "Task 2"
+
+# Test soft-deleting tasks by id
+@pytest.mark.django_db
+def test_bulk_delete_tasks_by_ids(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create two active tasks and an already deleted one
+    first_task = Task.objects.create(name="Task 1", description="Task Description 1")
+    second_task = Task.objects.create(name="Task 2", description="Task Description 2")
+    deleted_task = Task.objects.create(name="Task 3", description="Task Description 3", is_active=False)
+    
+    # Make POST request to delete the tasks
+    url = reverse("bulk-delete-task")
+    payload = {"ids": [first_task.id, second_task.id, deleted_task.id, 999]}
+    response = client.post(url, data=payload, format="json")
+    
+    # Assert that the active tasks are deleted and the rest are reported as not found
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data.get("deleted") == 2
+    assert response.data.get("not_found") == [deleted_task.id, 999]
+    assert not Task.objects.filter(is_active=True).exists()
+
+# Test soft-deleting tasks matching a filter
+@pytest.mark.django_db
+def test_bulk_delete_tasks_by_filter(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create an old task and a recent one
+    now = timezone.now()
+    old_task = Task.objects.create(name="Old Task", description="Task Description", date_crated=now - timedelta(days=30))
+    recent_task = Task.objects.create(name="Recent Task", description="Task Description", date_crated=now)
+    
+    # Make POST request to delete the tasks created before last week
+    url = reverse("bulk-delete-task")
+    payload = {"filter": {"created_before": (now - timedelta(days=7)).isoformat()}}
+    response = client.post(url, data=payload, format="json")
+    
+    # Assert that only the old task is deleted
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data.get("deleted") == 1
+    assert not Task.objects.get(id=old_task.id).is_active
+    assert Task.objects.get(id=recent_task.id).is_active
+
+# Test bulk deletion without ids or filter
+@pytest.mark.django_db
+def test_bulk_delete_tasks_with_invalid_payload(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Make POST request with an empty payload
+    url = reverse("bulk-delete-task")
+    response = client.post(url, data={}, format="json")
+    
+    # Assert that the request is rejected
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+# Test that a filter matching everything by accident is rejected
+@pytest.mark.django_db
+def test_bulk_delete_tasks_with_empty_or_unknown_filter(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a task that must survive
+    Task.objects.create(name="T0", description="Task Description")
+    
+    # Make POST requests with an empty filter and with undeclared filter keys
+    url = reverse("bulk-delete-task")
+    for payload in ({"filter": {}}, {"filter": {"name": "T0"}}, {"filter": {"is_active": "true", "owner": 1}}):
+        response = client.post(url, data=payload, format="json")
+        
+        # Assert that the request is rejected and nothing is deleted
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "filter" in response.data.get("errors")
+    assert Task.objects.filter(is_active=True).count() == 1
+
+# ===========================================
+# ============== TASK CACHE =================
+# ===========================================
+
+# Test that task details are served from the cache and refreshed on edit
+@pytest.mark.django_db
+def test_task_detail_cache_refreshed_on_edit(common_user_token, django_capture_on_commit_callbacks):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a task and read it twice, the second read being a cache hit
+    task = Task.objects.create(name="Task 1", description="Task Description 1")
+    url = reverse("task", kwargs={"pk": task.id})
+    client.get(url)
+    cache_stats = client.get(reverse("task-cache-stats")).data
+    hits = cache_stats.get("hits")
+    response = client.get(url)
+    assert client.get(reverse("task-cache-stats")).data.get("hits") == hits + 1
+    assert response.data.get("task").get("name") == "Task 1"
+    
+    # Edit the task and run the on-commit hooks
+    payload = {"name": "Task Renamed", "description": "Task Description edited"}
+    with django_capture_on_commit_callbacks(execute=True):
+        client.put(reverse("edit-task", kwargs={"pk": task.id}), data=payload, format="json")
+    
+    # Assert that the cached copy was replaced with the edited task
+    response = client.get(url)
+    assert response.data.get("task").get("name") == "Task Renamed"
+    assert response.data.get("task").get("description") == "Task Description edited"
+
+# Test that deleted tasks are dropped from the cache
+@pytest.mark.django_db
+def test_task_detail_cache_invalidated_on_delete(common_user_token, django_capture_on_commit_callbacks):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a task and read it so it gets cached
+    task = Task.objects.create(name="Task 1", description="Task Description 1")
+    url = reverse("task", kwargs={"pk": task.id})
+    assert client.get(url).status_code == status.HTTP_200_OK
+    
+    # Delete the task and run the on-commit hooks
+    with django_capture_on_commit_callbacks(execute=True):
+        client.delete(url)
+    
+    # Assert that the deleted task is no longer served
+    response = client.get(url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+# Test that a read loading a task while it is written doesn't cache the old row
+@pytest.mark.django_db
+def test_task_detail_cache_fill_racing_writes(common_user_token, django_capture_on_commit_callbacks, monkeypatch):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create two tasks, not cached yet
+    edited = Task.objects.create(name="Task 1", description="Task Description 1")
+    deleted = Task.objects.create(name="Task 2", description="Task Description 2")
+    
+    def edit(task):
+        task.name = "Task Renamed"
+        task.save()
+        refresh_task_on_commit(task, TaskSerializer(task).data)
+    
+    def delete(task):
+        Task.objects.filter(id=task.id).update(is_active=False)
+        invalidate_tasks_on_commit([task.id])
+    
+    load_task_entry = task_cache.load_task_entry
+    for task, write in ((edited, edit), (deleted, delete)):
+        # Commit the write after the read loaded the row, before it fills the cache
+        def load_then_write(pk, fields=None):
+            entry = load_task_entry(pk, fields)
+            with django_capture_on_commit_callbacks(execute=True):
+                write(task)
+            return entry
+        monkeypatch.setattr(task_cache, "load_task_entry", load_then_write)
+        client.get(reverse("task", kwargs={"pk": task.id}))
+        monkeypatch.setattr(task_cache, "load_task_entry", load_task_entry)
+    
+    # Assert that the written tasks are served as written
+    response = client.get(reverse("task", kwargs={"pk": edited.id}))
+    assert response.data.get("task").get("name") == "Task Renamed"
+    response = client.get(reverse("task", kwargs={"pk": deleted.id}))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+# ===========================================
+# ============ CONDITIONAL GET ==============
+# ===========================================
+
+# Test revalidating a task detail with its ETag
+@pytest.mark.django_db
+def test_task_detail_not_modified(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a task and read it once to get its validators
+    task = Task.objects.create(name="Task 1", description="Task Description 1")
+    url = reverse("task", kwargs={"pk": task.id})
+    response = client.get(url)
+    etag = response["ETag"]
+    assert response.has_header("Last-Modified")
+    
+    # Assert that revalidating with the ETag returns 304 without a body
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+
+# Test that the list ETag changes when a task is deleted
+@pytest.mark.django_db
+def test_task_list_etag_changes_on_delete(common_user_token, django_capture_on_commit_callbacks):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create two tasks and read the list once to get its ETag
+    task = Task.objects.create(name="Task 1", description="Task Description 1")
+    Task.objects.create(name="Task 2", description="Task Description 2")
+    url = reverse("task-list")
+    etag = client.get(url)["ETag"]
+    
+    # Assert that the unchanged list is not sent again
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    
+    # Delete a task and assert that the list is sent again
+    with django_capture_on_commit_callbacks(execute=True):
+        client.delete(reverse("task", kwargs={"pk": task.id}))
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data.get("tasks")) == 1
+
+# ===========================================
+# ============== CHANGE FEED ================
+# ===========================================
+
+# Test syncing the task list through the change feed
+@pytest.mark.django_db
+def test_task_changes_feed(common_user_token, settings):
+    settings.TASK_CHANGES_LAG_SECONDS = 0
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a deleted task and three others, then sync them two at a time
+    Task.objects.create(name="Deleted", description="Task Description", is_active=False)
+    tasks = [Task.objects.create(name=f"Task {i}", description="Task Description") for i in range(3)]
+    url = reverse("task-changes")
+    response = client.get(url, {"page_size": 2})
+    
+    # Assert that a first sync skips tombstones
+    assert response.status_code == status.HTTP_200_OK
+    assert [task.get("name") for task in response.data.get("tasks")] == ["Task 0"]
+    assert response.data.get("deleted") == []
+    assert response.data.get("has_more") is True
+    response = client.get(url, {"page_size": 2, "since": response.data.get("cursor")})
+    assert [task.get("name") for task in response.data.get("tasks")] == ["Task 1", "Task 2"]
+    assert response.data.get("has_more") is False
+    cursor = response.data.get("cursor")
+    
+    # Edit a task, delete another and create a new one
+    client.put(reverse("edit-task", kwargs={"pk": tasks[0].id}), data={"name": "Task 0 edited", "description": "Edited"}, format="json")
+    client.delete(reverse("task", kwargs={"pk": tasks[1].id}))
+    Task.objects.create(name="Task 3", description="Task Description")
+    
+    # Assert that only the changes come back, with the deletion as a tombstone
+    response = client.get(url, {"since": cursor})
+    assert [task.get("name") for task in response.data.get("tasks")] == ["Task 0 edited", "Task 3"]
+    assert response.data.get("deleted") == [tasks[1].id]
+    
+    # Assert that syncing again returns nothing
+    response = client.get(url, {"since": response.data.get("cursor"), "fields": "id"})
+    assert response.data.get("tasks") == []
+    assert response.data.get("deleted") == []
+
+# Test the change feed's invalid, expired and held back cursors
+@pytest.mark.django_db
+def test_task_changes_errors(common_user_token, settings):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    url = reverse("task-changes")
+    
+    # Assert that malformed cursors and cursors older than the archive retention are rejected
+    assert client.get(url, {"since": "not-a-cursor"}).status_code == status.HTTP_400_BAD_REQUEST
+    expired = encode_cursor((timezone.now() - timedelta(days=settings.TASK_ARCHIVE_RETENTION_DAYS + 1), 0))
+    response = client.get(url, {"since": expired})
+    assert response.status_code == status.HTTP_410_GONE
+    
+    # Assert that changes younger than the lag are held back
+    settings.TASK_CHANGES_LAG_SECONDS = 60
+    Task.objects.create(name="Task Name", description="Task Description")
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data.get("tasks") == []
+
+# ===========================================
+# ============== SEARCH TASKS ===============
+# ===========================================
+
+# Test searching tasks by name and description
+@pytest.mark.django_db
+def test_search_tasks(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create tasks, one of them edited and one deleted after creation
+    Task.objects.create(name="Deploy backend", description="Ship the new release")
+    edited_task = Task.objects.create(name="Write docs", description="Describe the API")
+    edited_task.description = "Describe the deploy process"
+    edited_task.save()
+    Task.objects.create(name="Deploy frontend", description="Old release", is_active=False)
+    Task.objects.create(name="Buy milk", description="Groceries")
+    
+    # Make GET request to search the tasks
+    url = reverse("task-search")
+    response = client.get(url, {"q": "deploy"})
+    
+    # Assert that only active matches are returned, including the edited description
+    assert response.status_code == status.HTTP_200_OK
+    names = {task["name"] for task in response.data.get("tasks")}
+    assert names == {"Deploy backend", "Write docs"}
+    
+    # Assert that a sparse fieldset limits the fields of the matches
+    response = client.get(url, {"q": "deploy", "fields": "name"})
+    assert sorted(response.data.get("tasks"), key=lambda task: task["name"]) == [
+        {"name": "Deploy backend"}, {"name": "Write docs"}
+    ]
+
+# Test paginating search results
+@pytest.mark.django_db
+def test_search_tasks_pagination(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create three matching tasks
+    for i in range(3):
+        Task.objects.create(name=f"Report {i}", description="Monthly report")
+    
+    # Make GET requests for both pages of results
+    url = reverse("task-search")
+    response = client.get(url, {"q": "report", "page_size": 2})
+    assert len(response.data.get("tasks")) == 2
+    assert response.data.get("previous") is None
+    second_response = client.get(response.data.get("next"))
+    
+    # Assert that the second page holds the remaining task
+    assert len(second_response.data.get("tasks")) == 1
+    assert second_response.data.get("next") is None
+
+# Test searching without a query
+@pytest.mark.django_db
+def test_search_tasks_without_query(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Make GET request without the q parameter
+    url = reverse("task-search")
+    response = client.get(url)
+    
+    # Assert that the request is rejected
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+# Test searching tasks with the fallback backend that needs no text index
+@pytest.mark.django_db
+def test_search_tasks_with_fallback_backend(common_user_token, settings):
+    # Use the fallback backend
+    settings.TASK_SEARCH_BACKEND = "task.search.LikeSearchBackend"
+    
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a task matching by description and one matching by name
+    Task.objects.create(name="Write docs", description="Describe the deploy process")
+    Task.objects.create(name="Deploy backend", description="Ship the new release")
+    
+    # Make GET request to search the tasks
+    url = reverse("task-search")
+    response = client.get(url, {"q": "deploy"})
+    
+    # Assert that name matches are ranked first
+    assert response.status_code == status.HTTP_200_OK
+    assert [task["name"] for task in response.data.get("tasks")] == ["Deploy backend", "Write docs"]
+
+# Test that search finds words past the preview of compressed descriptions
+@pytest.mark.django_db
+@pytest.mark.parametrize("backend", ["task.search.SQLiteFTSBackend", "task.search.LikeSearchBackend"])
+def test_search_tasks_in_compressed_description(common_user_token, settings, backend):
+    settings.TASK_SEARCH_BACKEND = backend
+    settings.TASK_DESCRIPTION_COMPRESS_THRESHOLD = 1024
+    
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a task whose description is compressed and a short one
+    task = Task.objects.create(name="Long task", description="Lorem ipsum " * 200 + "zeppelin")
+    assert task.description_compressed is not None
+    Task.objects.create(name="Short task", description="Lorem ipsum")
+    
+    # Make GET request for a word beyond the stored preview
+    url = reverse("task-search")
+    response = client.get(url, {"q": "zeppelin"})
+    
+    # Assert that the compressed task is found by it
+    assert response.status_code == status.HTTP_200_OK
+    assert [found["name"] for found in response.data.get("tasks")] == ["Long task"]
+    
+    # Assert that the index follows when the description changes
+    task.description = "Lorem ipsum " * 200 + "airship"
+    task.save()
+    assert client.get(url, {"q": "zeppelin"}).data.get("tasks") == []
+    assert [found["name"] for found in client.get(url, {"q": "airship"}).data.get("tasks")] == ["Long task"]
+
+# ===========================================
+# ============= RESTORE TASKS ===============
+# ===========================================
+
+# Test restoring deleted and archived tasks
+@pytest.mark.django_db
+def test_restore_task(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a deleted task and an archived one
+    deleted_task = Task.objects.create(name="Deleted", description="Task Description", is_active=False)
+    archived_task = Task.objects.create(name="Archived", description="Task Description", is_active=False)
+    archive_batch(timezone.now() + timedelta(seconds=1), 1, after=(deleted_task.date_crated, deleted_task.id))
+    assert TaskArchive.objects.filter(id=archived_task.id).exists()
+    
+    # Make POST requests to restore both tasks
+    for task in (deleted_task, archived_task):
+        response = client.post(reverse("restore-task", kwargs={"pk": task.id}))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data.get("data").get("id") == task.id
+    
+    # Assert that both tasks are active again and the archive is empty
+    assert Task.objects.active().count() == 2
+    assert not TaskArchive.objects.exists()
+    response = client.get(reverse("task", kwargs={"pk": archived_task.id}))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data.get("task").get("name") == "Archived"
+
+# Test restoring a task whose name was taken or that doesn't exist
+@pytest.mark.django_db
+def test_restore_task_errors(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Archive a task, then create a new one with its name
+    task = Task.objects.create(name="Task Name", description="Task Description", is_active=False)
+    archive_batch(timezone.now() + timedelta(seconds=1), 10)
+    Task.objects.create(name="Task Name", description="New Description")
+    
+    # Assert that restoring it is rejected and it stays archived
+    response = client.post(reverse("restore-task", kwargs={"pk": task.id}))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert TaskArchive.objects.filter(id=task.id).exists()
+    
+    # Assert that restoring a missing task fails
+    response = client.post(reverse("restore-task", kwargs={"pk": 999}))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+# ===========================================
+# ============ SPARSE FIELDSETS =============
+# ===========================================
+
+# Test listing tasks with only some fields, which are the only columns read
+@pytest.mark.django_db
+def test_task_list_sparse_fields(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create three tasks in the database
+    for i in range(3):
+        Task.objects.create(name=f"Task {i}", description="Task Description")
+    
+    # Make GET requests for both pages of the list, capturing the queries of the first
+    url = reverse("task-list")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, {"fields": "name,id", "page_size": 2})
+    second_response = client.get(response.data.get("next"))
+    
+    # Assert that only the requested fields are returned and the description is never read
+    assert response.status_code == status.HTTP_200_OK
+    assert [list(task) for task in response.data.get("tasks")] == [["id", "name"]] * 2
+    assert [task.get("name") for task in response.data.get("tasks")] == ["Task 2", "Task 1"]
+    assert not any("description" in query["sql"] for query in queries.captured_queries)
+    assert [task.get("name") for task in second_response.data.get("tasks")] == ["Task 0"]
+    
+    # Assert that unknown fields are rejected
+    response = client.get(url, {"fields": "name,owner"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data.get("error") == "Unknown fields: owner"
+
+# Test getting a task with only some fields, from the database and from the cache
+@pytest.mark.django_db
+def test_task_detail_sparse_fields(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a task and read some of its fields before it is cached
+    task = Task.objects.create(name="Task Name", description="Task Description")
+    url = reverse("task", kwargs={"pk": task.id})
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, {"fields": "id,date_crated"})
+    assert response.status_code == status.HTTP_200_OK
+    assert list(response.data.get("task")) == ["id", "date_crated"]
+    assert not any("description" in query["sql"] for query in queries.captured_queries)
+    
+    # Cache the full task and assert that sparse reads are served from it
+    client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, {"fields": "name"})
+    assert response.data.get("task") == {"name": "Task Name"}
+    assert not any("task_task" in query["sql"] for query in queries.captured_queries)
+    
+    # Assert that unknown fields are rejected
+    response = client.get(url, {"fields": "is_active"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+# ===========================================
+# ============ LIST PAGE CACHE ==============
+# ===========================================
+
+# Test that list pages are served from the cache until a task is written
+@pytest.mark.django_db
+def test_task_list_page_cache(common_user_token, django_capture_on_commit_callbacks):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a task and read the list once to cache the page
+    task = Task.objects.create(name="Task 1", description="Task Description 1")
+    url = reverse("task-list")
+    first = client.get(url)
+    
+    # Assert that the same bytes come back without touching the task table
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.content == first.content
+    assert response["ETag"] == first["ETag"]
+    assert not any("task_task" in query["sql"] for query in queries.captured_queries)
+    assert response.data == first.data
+    assert {"Accept", "Accept-Encoding"} <= set(response["Vary"].split(", "))
+    
+    # Assert that other renderings are still negotiated, outside the cache
+    response = client.get(url, HTTP_ACCEPT="text/html")
+    assert response["Content-Type"].startswith("text/html")
+    assert response.data == first.data
+    
+    # Assert that the cached page is sent gzipped and revalidated from the cache
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.content) == first.content
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not any("task_task" in query["sql"] for query in queries.captured_queries)
+    
+    # Edit the task through the API and assert that the list is rendered again
+    with django_capture_on_commit_callbacks(execute=True):
+        client.put(reverse("edit-task", kwargs={"pk": task.id}), {"name": "Task Renamed", "description": "Edited"}, format="json")
+    response = client.get(url)
+    assert [task["name"] for task in response.json().get("tasks")] == ["Task Renamed"]
+    assert response["ETag"] != first["ETag"]
+
+# Test that pages cached by one worker are dropped when another one writes
+@pytest.mark.django_db
+def test_task_list_page_cache_shared_generation(common_user_token, settings):
+    # Pages in a cache of this worker only, the generation in a shared one
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "worker"},
+        "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "shared"},
+    }
+    settings.TASK_GENERATION_CACHE_ALIAS = "shared"
+    
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create a task and read the list once to cache the page
+    Task.objects.create(name="Task 1", description="Task Description 1")
+    url = reverse("task-list")
+    client.get(url)
+    assert caches["shared"].get(GENERATION_KEY) is not None
+    assert caches["default"].get(GENERATION_KEY) is None
+    
+    # Write a task as another worker would, bumping only the shared generation
+    Task.objects.create(name="Task 2", description="Task Description 2")
+    bump_generation()
+    
+    # Assert that this worker renders the list again
+    response = client.get(url)
+    assert [task["name"] for task in response.json().get("tasks")] == ["Task 2", "Task 1"]
+
+# ===========================================
+# ============== BATCH READ =================
+# ===========================================
+
+# Test reading several tasks by id at once, with GET and POST
+@pytest.mark.django_db
+def test_task_batch(common_user_token):
+    # Extract access token from fixture
+    access_token = common_user_token.get("access")
+    
+    # Create API client and set authorization header
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + access_token)
+    
+    # Create two active tasks and a deleted one
+    first = Task.objects.create(name="Task 1", description="Task Description 1")
+    second = Task.objects.create(name="Task 2", description="Task Description 2")
+    deleted = Task.objects.create(name="Task 3", description="Task Description 3", is_active=False)
+    url = reverse("task-batch")
+    
+    # Cache one task, then assert that the batch loads the other with one query
+    client.get(reverse("task", kwargs={"pk": first.id}))
+    ids = f"{second.id},{first.id},{deleted.id},999,{second.id}"
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, {"ids": ids})
+    assert len([query for query in queries.captured_queries if "task_task" in query["sql"]]) == 1
+    assert response.status_code == status.HTTP_200_OK
+    assert list(response.data.get("tasks")) == [second.id, first.id]
+    assert response.data.get("missing") == [deleted.id, 999]
+    
+    # Assert that the tasks are serialized like the detail view does
+    for task in (first, second):
+        detail = client.get(reverse("task", kwargs={"pk": task.id})).data.get("task")
+        assert response.data.get("tasks")[task.id] == detail
+    
+    # Assert that POST takes the ids in the body and ?fields= applies to both
+    response = client.post(url + "?fields=id,name", {"ids": [first.id, second.id]}, format="json")
+    assert response.data.get("tasks") == {first.id: {"id": first.id, "name": "Task 1"}, second.id: {"id": second.id, "name": "Task 2"}}
+    
+    # Assert that malformed, missing and too many ids are rejected
+    assert client.get(url, {"ids": "1,a"}).status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get(url).status_code == status.HTTP_400_BAD_REQUEST
+    response = client.post(url, {"ids": list(range(1, 502))}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
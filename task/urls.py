@@ -1,15 +1,33 @@
 from django.urls import include, path
 
 from .views import (
+    BulkCreateTaskView,
+    BulkDeleteTaskView,
+    BulkEditTaskView,
     CreateTaskView,
     EditTaskView,
     GetTaskView,
+    RestoreTaskView,
+    SearchTaskView,
+    TaskBatchView,
+    TaskCacheStatsView,
+    TaskChangesView,
+    TaskExportView,
     TaskListView
 )
 
 urlpatterns = [
     path("task/create/", CreateTaskView.as_view(), name="create-task"),
+    path("task/bulk/", BulkCreateTaskView.as_view(), name="bulk-create-task"),
+    path("task/bulk/edit/", BulkEditTaskView.as_view(), name="bulk-edit-task"),
+    path("task/bulk/delete/", BulkDeleteTaskView.as_view(), name="bulk-delete-task"),
     path("task/<int:pk>/edit/", EditTaskView.as_view(), name="edit-task"),
+    path("task/<int:pk>/restore/", RestoreTaskView.as_view(), name="restore-task"),
     path("task/list/", TaskListView.as_view(), name="task-list"),
-    path("task/<int:pk>/detail/", GetTaskView.as_view(), name="task")
+    path("task/changes/", TaskChangesView.as_view(), name="task-changes"),
+    path("task/search/", SearchTaskView.as_view(), name="task-search"),
+    path("task/export/", TaskExportView.as_view(), name="task-export"),
+    path("task/<int:pk>/detail/", GetTaskView.as_view(), name="task"),
+    path("task/batch/", TaskBatchView.as_view(), name="task-batch"),
+    path("task/cache/stats/", TaskCacheStatsView.as_view(), name="task-cache-stats")
 ]
\ No newline at end of file
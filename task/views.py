@@ -1,10 +1,47 @@
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils import timezone
+from django.utils.text import compress_sequence
 
 from rest_framework.response import Response
 from rest_framework.generics import GenericAPIView
 from rest_framework import permissions, status
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.urls import replace_query_param
 
-from .serializers import TaskSerializer, CrateTaskSerializer
+from api.idempotency import idempotent
+from api.renderers import FastJSONRenderer
+from api.timing import measure
+
+from .archive import restore_task
+from .cache import (
+    bump_generation_on_commit,
+    get_task_entries,
+    get_task_entry,
+    invalidate_tasks_on_commit,
+    refresh_task_on_commit,
+    stats as cache_stats
+)
+from .changes import CursorExpired, decode_cursor, encode_cursor, get_changes
+from .compression import DESCRIPTION_COLUMNS, description_columns
+from .conditional import list_validators, not_modified_response, set_validators, task_validators
+from .events import CREATED, DELETED, UPDATED, publish_on_commit
+from .export import EXPORT_FORMATS
+from .fastpath import get_plan
+from .filters import TaskFilter
+from .listcache import get_page, make_page, page_response, store_page
+from .pagination import TaskCursorPagination
+from .search import get_search_backend
+from .serializers import (
+    BatchTaskSerializer,
+    BulkDeleteTaskSerializer,
+    BulkEditTaskSerializer,
+    CrateTaskSerializer,
+    TaskSerializer,
+    parse_fields
+)
 from .models import Task
 
 class GetTaskView(GenericAPIView):
@@ -14,15 +51,24 @@ class GetTaskView(GenericAPIView):
     
     def get(self, request, pk):
         try:
-            # Get the task with the given ID
-            task = Task.objects.get(id=pk, is_active=True)
-            # Serialize the task
-            serializer = TaskSerializer(task)
+            # Only the fields asked for with ?fields=, all of them by default
+            fields = parse_fields(request.query_params.get("fields"))
+            # Get the serialized task from the cache, loading it on a miss
+            entry = get_task_entry(pk, fields)
+            if entry is None:
+                # Task with the given ID doesn't exist
+                return Response({"error": "Task does not exist"}, status=status.HTTP_404_NOT_FOUND)
+            # Answer 304 if the client's copy is still current
+            etag, last_modified = task_validators(pk, entry["updated_at"])
+            not_modified = not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
             # Return the serialized task in the response
-            return Response({"task": serializer.data}, status=status.HTTP_200_OK)
-        except Task.DoesNotExist:
-            # Task with the given ID doesn't exist
-            return Response({"error": "Task does not exist"}, status=status.HTTP_404_NOT_FOUND)
+            response = Response({"task": entry["task"]}, status=status.HTTP_200_OK)
+            return set_validators(response, etag, last_modified)
+        except ParseError as e:
+            # Unknown field in ?fields=
+            return Response({"error": str(e.detail)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             # Other exceptions
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -34,6 +80,9 @@ class GetTaskView(GenericAPIView):
             # Mark the task as inactive
             task.is_active = False
             task.save()
+            # Drop the cached copy and tell the event streams once the change is committed
+            invalidate_tasks_on_commit([task.id])
+            publish_on_commit([(DELETED, {"id": task.id})])
             # Return success message
             return Response({"message": "Task deleted"}, status=status.HTTP_200_OK)
         except Task.DoesNotExist:
@@ -43,19 +92,87 @@ class GetTaskView(GenericAPIView):
             # Other exceptions
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class TaskBatchView(GenericAPIView):
+    # Requires authentication for this view
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BatchTaskSerializer
+    
+    def get(self, request):
+        # Ids as ?ids=1,2,3
+        ids = [pk for pk in request.query_params.get("ids", "").split(",") if pk]
+        return self.get_tasks(request, {"ids": ids})
+    
+    def post(self, request):
+        # Ids as {"ids": [1, 2, 3]}, for lists too long for a URL
+        return self.get_tasks(request, request.data)
+    
+    def get_tasks(self, request, data):
+        serializer = self.get_serializer(data=data)
+        if not serializer.is_valid():
+            # Invalid or too many ids
+            return Response({"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            # Only the fields asked for with ?fields=, all of them by default
+            fields = parse_fields(request.query_params.get("fields"))
+            # Get the cached tasks at once and load the rest with one query
+            ids = list(dict.fromkeys(serializer.validated_data["ids"]))
+            entries = get_task_entries(ids, fields)
+            # Return the found tasks by id, in the order asked, and the missing ids
+            return Response({
+                "tasks": {pk: entries[pk]["task"] for pk in ids if pk in entries},
+                "missing": [pk for pk in ids if pk not in entries],
+            }, status=status.HTTP_200_OK)
+        except ParseError as e:
+            # Unknown field in ?fields=
+            return Response({"error": str(e.detail)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            # Other exceptions
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 class TaskListView(GenericAPIView):
     # Requires authentication for this view
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = None
+    pagination_class = TaskCursorPagination
     
     def get(self, request):
         try:
-            # Get all active tasks
-            tasks = Task.objects.filter(is_active=True)
-            # Serialize the tasks
-            serializer = TaskSerializer(tasks, many=True)
-            # Return the serialized tasks in the response
-            return Response({"tasks": serializer.data}, status=status.HTTP_200_OK)
+            # Pages are cached as plain JSON, so other renderings skip the cache
+            cacheable = request.accepted_media_type == FastJSONRenderer.media_type
+            url = request.build_absolute_uri()
+            if cacheable:
+                # Serve the rendered page if no task changed since it was cached
+                generation, page = get_page(url)
+                if page is not None:
+                    not_modified = not_modified_response(request, page["etag"], page["last_modified"])
+                    return not_modified if not_modified is not None else page_response(request, page)
+            # Answer 304 if nothing changed since the client's copy
+            etag, last_modified = list_validators()
+            not_modified = not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            # Only the fields asked for with ?fields=, all of them by default
+            plan = get_plan(parse_fields(request.query_params.get("fields")))
+            # Get one page of active tasks, newest first, as plain rows of just
+            # those columns plus the ones the cursors are built from
+            columns = dict.fromkeys((*plan.columns, *TaskCursorPagination.position_fields))
+            rows = self.paginate_queryset(Task.objects.active().values(*columns))
+            # Format the rows exactly like TaskSerializer would
+            with measure("serialize"):
+                tasks = [plan.format(row) for row in rows]
+            # Return the serialized tasks along with the next/previous cursors
+            response = self.get_paginated_response(tasks)
+            if not cacheable:
+                return set_validators(response, etag, last_modified)
+            # Render once and keep the bytes for the next requests
+            content = request.accepted_renderer.render(response.data, request.accepted_media_type, self.get_renderer_context())
+            page = make_page(content, etag, last_modified)
+            store_page(generation, url, page)
+            return page_response(request, page, response.data)
+        except ParseError as e:
+            # Malformed or tampered cursor, or unknown field in ?fields=
+            return Response({"error": str(e.detail)}, status=status.HTTP_400_BAD_REQUEST)
         except Task.DoesNotExist:
             # No active tasks found
             return Response({"error": "Task does not exist"}, status=status.HTTP_404_NOT_FOUND)
@@ -63,11 +180,142 @@ class TaskListView(GenericAPIView):
             # Other exceptions
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class TaskChangesView(GenericAPIView):
+    # Requires authentication for this view
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = None
+    page_size = 500
+    max_page_size = 1000
+    
+    def get(self, request):
+        try:
+            # Only the fields asked for with ?fields=, all of them by default
+            plan = get_plan(parse_fields(request.query_params.get("fields")))
+            limit = min(max(int(request.query_params.get("page_size", self.page_size)), 1), self.max_page_size)
+            since = request.query_params.get("since")
+            cursor = decode_cursor(since) if since is not None else None
+            # Get the tasks changed after the cursor, oldest change first
+            rows, has_more, position = get_changes(cursor, limit, plan.columns)
+            # Return edited and created tasks in full and deleted ones as tombstones,
+            # which a first sync without a cursor has no use for
+            with measure("serialize"):
+                tasks = [plan.format(row) for row in rows if row["is_active"]]
+            deleted = [row["id"] for row in rows if not row["is_active"]] if cursor is not None else []
+            return Response({
+                "tasks": tasks,
+                "deleted": deleted,
+                "cursor": encode_cursor(position),
+                "has_more": has_more,
+            }, status=status.HTTP_200_OK)
+        except ValueError:
+            # Non numeric page size
+            return Response({"error": "Invalid page size"}, status=status.HTTP_400_BAD_REQUEST)
+        except ParseError as e:
+            # Malformed cursor, or unknown field in ?fields=
+            return Response({"error": str(e.detail)}, status=status.HTTP_400_BAD_REQUEST)
+        except CursorExpired:
+            # Deletions before the cursor may have been archived since
+            return Response({"error": "Cursor expired, fetch the full task list"}, status=status.HTTP_410_GONE)
+        except Exception as e:
+            # Other exceptions
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class SearchTaskView(GenericAPIView):
+    # Requires authentication for this view
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = None
+    page_size = 20
+    max_page_size = 100
+    # Deep pages of a ranked search are never useful and cost an ever larger OFFSET
+    max_page = 50
+    
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            # Nothing to search for
+            return Response({"error": "Missing search query"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            page = max(int(request.query_params.get("page", 1)), 1)
+            page_size = min(max(int(request.query_params.get("page_size", self.page_size)), 1), self.max_page_size)
+        except ValueError:
+            # Non numeric page or page size
+            return Response({"error": "Invalid page"}, status=status.HTTP_400_BAD_REQUEST)
+        if page > self.max_page:
+            return Response({"error": f"Search results are limited to {self.max_page} pages"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # Only the fields asked for with ?fields=, all of them by default
+            fields = parse_fields(request.query_params.get("fields"))
+        except ParseError as e:
+            # Unknown field in ?fields=
+            return Response({"error": str(e.detail)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            # Get the ids of one page of matches, best first, fetching one extra to detect a next page
+            ids = get_search_backend().search(query, (page - 1) * page_size, page_size + 1)
+            has_next = len(ids) > page_size and page < self.max_page
+            ids = ids[:page_size]
+            # Load and serialize the matching tasks keeping the rank order,
+            # reading only the requested columns
+            queryset = Task.objects.only(*get_plan(fields).columns) if fields is not None else Task.objects
+            tasks = queryset.in_bulk(ids)
+            serializer = TaskSerializer([tasks[pk] for pk in ids if pk in tasks], many=True, fields=fields)
+            with measure("serialize"):
+                data = serializer.data
+            url = request.build_absolute_uri()
+            return Response({
+                "tasks": data,
+                "next": replace_query_param(url, "page", page + 1) if has_next else None,
+                "previous": replace_query_param(url, "page", page - 1) if page > 1 else None,
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            # Other exceptions
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class TaskExportView(GenericAPIView):
+    # Requires authentication for this view
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = None
+    
+    def perform_content_negotiation(self, request, force=False):
+        # The export body is not produced by a renderer, so never answer 406
+        return super().perform_content_negotiation(request, force=True)
+    
+    def get(self, request):
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            # Unknown export format
+            return Response({"error": "Unsupported export format"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Only active tasks are exported unless is_active is given explicitly
+        params = request.query_params.copy()
+        params.setdefault("is_active", "true")
+        filterset = TaskFilter(params, queryset=Task.objects.all())
+        if not filterset.is_valid():
+            # Invalid filter values
+            return Response({"errors": filterset.errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Stream the rows batch by batch instead of building the whole body
+        content_type, filename, iter_rows = EXPORT_FORMATS[output]
+        stream = iter_rows(filterset.qs)
+        gzipped = re_accepts_gzip.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if gzipped:
+            stream = compress_sequence(stream)
+        
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        if gzipped:
+            response["Content-Encoding"] = "gzip"
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
 class CreateTaskView(GenericAPIView):
     # Requires authentication for this view
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = CrateTaskSerializer
+    throttle_scope = "task-create"
     
+    # Outside the transaction so only committed responses are replayed
+    @idempotent
     @transaction.atomic()
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -82,17 +330,203 @@ class CreateTaskView(GenericAPIView):
             task = Task.objects.create(name=name, description=description)
             # Serialize the created task
             result_serializer = TaskSerializer(task)
+            # Warm the cache and tell the event streams once the task is committed
+            refresh_task_on_commit(task, result_serializer.data)
+            publish_on_commit([(CREATED, result_serializer.data)])
             # Return success message along with serialized task
             return Response({"message": "Task created", "data": result_serializer.data}, status=status.HTTP_200_OK)
         except Exception as e:
             # Other exceptions
             return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+class BulkCreateTaskView(GenericAPIView):
+    # Requires authentication for this view
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = CrateTaskSerializer
+    # Largest payload accepted in one request and rows per INSERT statement
+    max_items = 1000
+    batch_size = 500
+    
+    def post(self, request):
+        payload = request.data
+        if not isinstance(payload, list):
+            # The body must be a JSON array of tasks
+            return Response({"error": "Expected a list of tasks"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(payload) > self.max_items:
+            # Too many tasks for a single request
+            return Response({"error": f"At most {self.max_items} tasks per request"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Validate every item, keeping the errors of the invalid ones by position
+        results = [None] * len(payload)
+        valid = {}
+        for index, item in enumerate(payload):
+            serializer = self.get_serializer(data=item)
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                results[index] = {"index": index, "status": "error", "errors": serializer.errors}
+        
+        # Names are unique, so reject names already taken with a single query
+        names = [data["name"] for data in valid.values()]
+        taken = set(Task.objects.filter(name__in=names).values_list("name", flat=True))
+        tasks = {}
+        for index, data in valid.items():
+            name = data["name"]
+            if name in taken:
+                results[index] = {"index": index, "status": "error", "errors": {"name": ["Task with this name already exists."]}}
+                continue
+            taken.add(name)
+            tasks[index] = Task(name=name, description=data["description"])
+        
+        try:
+            with transaction.atomic():
+                Task.objects.bulk_create(tasks.values(), batch_size=self.batch_size)
+                bump_generation_on_commit()
+        except IntegrityError as e:
+            # A concurrent request took one of the names after the lookup
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Backends that don't return primary keys from bulk_create (MySQL) need one more query
+        without_pk = [task for task in tasks.values() if task.pk is None]
+        if without_pk:
+            ids = dict(Task.objects.filter(name__in=[task.name for task in without_pk]).values_list("name", "id"))
+            for task in without_pk:
+                task.pk = ids[task.name]
+        
+        for index, task in tasks.items():
+            results[index] = {"index": index, "status": "created", "data": TaskSerializer(task).data}
+        # One batch of events for the whole request
+        publish_on_commit((CREATED, results[index]["data"]) for index in tasks)
+        
+        return Response({
+            "message": "Tasks created",
+            "created": len(tasks),
+            "failed": len(payload) - len(tasks),
+            "results": results,
+        }, status=status.HTTP_200_OK)
+
+class BulkEditTaskView(GenericAPIView):
+    # Requires authentication for this view
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BulkEditTaskSerializer
+    # Largest payload accepted in one request and rows per UPDATE statement
+    max_items = 1000
+    batch_size = 500
+    
+    def put(self, request):
+        payload = request.data
+        if not isinstance(payload, list):
+            # The body must be a JSON array of tasks
+            return Response({"error": "Expected a list of tasks"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(payload) > self.max_items:
+            # Too many tasks for a single request
+            return Response({"error": f"At most {self.max_items} tasks per request"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Validate every item, keeping the errors of the invalid ones by position
+        errors = []
+        changes = {}
+        for index, item in enumerate(payload):
+            serializer = self.get_serializer(data=item)
+            if not serializer.is_valid():
+                errors.append({"index": index, "errors": serializer.errors})
+            elif serializer.validated_data["id"] in changes:
+                errors.append({"index": index, "errors": {"id": ["Task appears more than once."]}})
+            else:
+                changes[serializer.validated_data["id"]] = (index, serializer.validated_data)
+        
+        # Load every task to edit with one query, skipping the descriptions being replaced
+        tasks = Task.objects.filter(is_active=True).defer(*DESCRIPTION_COLUMNS).in_bulk(list(changes))
+        not_found = [pk for pk in changes if pk not in tasks]
+        
+        # Names are unique, so reject names held by tasks outside this edit with one query
+        names = [data["name"] for pk, (index, data) in changes.items() if pk in tasks]
+        taken = set(
+            Task.objects.filter(name__in=names).exclude(id__in=list(tasks)).values_list("name", flat=True)
+        )
+        updated = []
+        updated_at = timezone.now()
+        for pk, task in tasks.items():
+            index, data = changes[pk]
+            if data["name"] in taken:
+                errors.append({"index": index, "errors": {"name": ["Task with this name already exists."]}})
+                continue
+            taken.add(data["name"])
+            task.name = data["name"]
+            # bulk_update() doesn't compress like save(), so set every description column
+            for column, value in description_columns(data["description"]).items():
+                setattr(task, column, value)
+            task.updated_at = updated_at
+            updated.append(task)
+        
+        try:
+            with transaction.atomic():
+                Task.objects.bulk_update(updated, fields=["name", *DESCRIPTION_COLUMNS, "updated_at"], batch_size=self.batch_size)
+                invalidate_tasks_on_commit([task.id for task in updated])
+                # Compressed descriptions only hold the preview, so send the full text
+                publish_on_commit(
+                    (UPDATED, {**TaskSerializer(task).data, "description": changes[task.id][1]["description"]})
+                    for task in updated
+                )
+        except IntegrityError as e:
+            # The edit swaps names between tasks or raced with another request
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            "message": "Tasks updated",
+            "updated": len(updated),
+            "not_found": not_found,
+            "errors": sorted(errors, key=lambda error: error["index"]),
+        }, status=status.HTTP_200_OK)
+
+class BulkDeleteTaskView(GenericAPIView):
+    # Requires authentication for this view
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BulkDeleteTaskSerializer
+    # Rows flipped per UPDATE statement
+    batch_size = 1000
+    
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            # Invalid input data
+            return Response({"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        active_tasks = Task.objects.filter(is_active=True)
+        if "ids" in serializer.validated_data:
+            # Deactivate the given ids, reporting the ones that are not active tasks
+            ids = list(dict.fromkeys(serializer.validated_data["ids"]))
+            deleted = 0
+            not_found = []
+            for start in range(0, len(ids), self.batch_size):
+                batch = ids[start:start + self.batch_size]
+                found = set(active_tasks.filter(id__in=batch).values_list("id", flat=True))
+                not_found.extend(pk for pk in batch if pk not in found)
+                deleted += Task.objects.filter(id__in=found).update(is_active=False, updated_at=timezone.now())
+                invalidate_tasks_on_commit(found)
+                publish_on_commit((DELETED, {"id": pk}) for pk in batch if pk in found)
+            return Response({"message": "Tasks deleted", "deleted": deleted, "not_found": not_found}, status=status.HTTP_200_OK)
+        
+        # Deactivate every active task matching the filter, one batch at a time
+        filterset = TaskFilter(serializer.validated_data["filter"], queryset=active_tasks)
+        if not filterset.is_valid():
+            # Invalid filter values
+            return Response({"errors": filterset.errors}, status=status.HTTP_400_BAD_REQUEST)
+        deleted = 0
+        while True:
+            batch = list(filterset.qs.values_list("id", flat=True)[:self.batch_size])
+            if not batch:
+                break
+            deleted += Task.objects.filter(id__in=batch).update(is_active=False, updated_at=timezone.now())
+            invalidate_tasks_on_commit(batch)
+            publish_on_commit((DELETED, {"id": pk}) for pk in batch)
+        return Response({"message": "Tasks deleted", "deleted": deleted, "not_found": []}, status=status.HTTP_200_OK)
+
 class EditTaskView(GenericAPIView):
     # Requires authentication for this view
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = CrateTaskSerializer
     
+    @idempotent
     def put(self, request, pk):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
@@ -110,6 +544,9 @@ class EditTaskView(GenericAPIView):
             task.save()
             # Serialize the updated task
             result_serializer = TaskSerializer(task)
+            # Replace the cached copy and tell the event streams once the change is committed
+            refresh_task_on_commit(task, result_serializer.data)
+            publish_on_commit([(UPDATED, result_serializer.data)])
             # Return success message along with serialized task
             return Response({"message": "Task updated", "data": result_serializer.data}, status=status.HTTP_200_OK)
         except Task.DoesNotExist:
@@ -118,3 +555,46 @@ class EditTaskView(GenericAPIView):
         except Exception as e:
             # Other exceptions
             return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class RestoreTaskView(GenericAPIView):
+    # Requires authentication for this view
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = None
+    
+    def post(self, request, pk):
+        try:
+            # Reactivate the task, bringing it back from the archive if needed
+            task = restore_task(pk)
+            if task is None:
+                # Task with the given ID doesn't exist
+                return Response({"error": "Task does not exist"}, status=status.HTTP_404_NOT_FOUND)
+            # Serialize the restored task
+            result_serializer = TaskSerializer(task)
+            # Warm the cache with the restored task and tell the event streams it is back
+            refresh_task_on_commit(task, result_serializer.data)
+            publish_on_commit([(CREATED, result_serializer.data)])
+            # Return success message along with serialized task
+            return Response({"message": "Task restored", "data": result_serializer.data}, status=status.HTTP_200_OK)
+        except IntegrityError:
+            # Another task took the name after this one was deleted
+            return Response({"error": "A task with this name already exists"}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            # Other exceptions
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class TaskCacheStatsView(GenericAPIView):
+    # Requires authentication for this view
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = None
+    
+    def get(self, request):
+        # Report the task cache counters of this worker process
+        hits = cache_stats["hits"]
+        misses = cache_stats["misses"]
+        lookups = hits + misses
+        return Response({
+            "hits": hits,
+            "misses": misses,
+            "waits": cache_stats["waits"],
+            "hit_ratio": hits / lookups if lookups else None,
+        }, status=status.HTTP_200_OK)
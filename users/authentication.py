@@ -0,0 +1,193 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from api.timing import measure
+
+
+class UserCache:
+    """
+    Per-process LRU cache of users resolved from tokens, with a short TTL.
+
+    ``users.signals`` evicts a user whenever it is saved or deleted in this
+    process; other processes pick the change up when their entry expires.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return settings.SIMPLE_JWT.get("USER_CACHE_TTL", 30)
+
+    @property
+    def max_size(self):
+        return settings.SIMPLE_JWT.get("USER_CACHE_SIZE", 1024)
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+        # Each request gets its own copy so nothing leaks between them
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        with self.lock:
+            self.entries[user_id] = (copy.copy(user), time.monotonic() + self.ttl)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def evict(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication usable from native async views.
+
+    Validating the token is CPU work only, so just the user lookup goes
+    through the async ORM and nothing blocks the event loop.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        return self.check_user(user, validated_token)
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def check_user(self, user, validated_token):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+class CachedTokenUser(TokenUser):
+    """
+    Token user trusted on its claims alone, resolving the real user through
+    ``user_cache`` only when a view actually needs it.
+    """
+
+    @cached_property
+    def user(self):
+        user = user_cache.get(self.id)
+        if user is None:
+            user = get_user_model().objects.get(**{api_settings.USER_ID_FIELD: self.id})
+            user_cache.set(self.id, user)
+        return user
+
+
+class CachedJWTAuthentication(AsyncJWTAuthentication):
+    """
+    JWTAuthentication without a ``User`` SELECT on every request.
+
+    By default users are resolved through ``user_cache``, so an active user
+    costs one query per ``USER_CACHE_TTL`` per process. With
+    ``SIMPLE_JWT["TRUST_TOKEN_CLAIMS"]`` the validated claims alone satisfy
+    ``IsAuthenticated`` and no lookup happens at all; tokens of users
+    deactivated since they were issued then stay valid until they expire.
+    """
+
+    def trust_token_claims(self):
+        return settings.SIMPLE_JWT.get("TRUST_TOKEN_CLAIMS", False)
+
+    def authenticate(self, request):
+        with measure("auth"):
+            return super().authenticate(request)
+
+    async def aauthenticate(self, request):
+        with measure("auth"):
+            return await super().aauthenticate(request)
+
+    def get_user(self, validated_token):
+        if self.trust_token_claims():
+            return self.get_token_user(validated_token)
+
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.set(user_id, user)
+
+        return self.check_user(user, validated_token)
+
+    async def aget_user(self, validated_token):
+        if self.trust_token_claims():
+            return self.get_token_user(validated_token)
+
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.set(user_id, user)
+
+        return self.check_user(user, validated_token)
+
+    def get_token_user(self, validated_token):
+        self.get_user_id(validated_token)
+        return CachedTokenUser(validated_token)
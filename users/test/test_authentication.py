@@ -0,0 +1,84 @@
+import pytest
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from users.authentication import CachedJWTAuthentication, CachedTokenUser, user_cache
+
+from .fixtures import (
+    common_user,
+    common_user_token
+    )
+
+def authenticate(access_token):
+    # Build a request carrying the token and authenticate it
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION="Bearer " + access_token)
+    return CachedJWTAuthentication().authenticate(request)
+
+# Test that the user is loaded once and then served from the cache
+@pytest.mark.django_db
+def test_cached_user_resolution(common_user_token, django_assert_num_queries):
+    # Extract user and access token from fixture
+    user = common_user_token.get("user")
+    access_token = common_user_token.get("access")
+    
+    # Assert that the first request loads the user
+    with django_assert_num_queries(1):
+        authenticated_user, _ = authenticate(access_token)
+    assert authenticated_user.pk == user.pk
+    
+    # Assert that the next request doesn't touch the database
+    with django_assert_num_queries(0):
+        authenticated_user, _ = authenticate(access_token)
+    assert authenticated_user.pk == user.pk
+
+# Test that deactivating a user evicts it from the cache
+@pytest.mark.django_db
+def test_cached_user_deactivated(common_user_token):
+    # Extract user and access token from fixture
+    user = common_user_token.get("user")
+    access_token = common_user_token.get("access")
+    
+    # Authenticate once so the user gets cached
+    authenticate(access_token)
+    
+    # Deactivate the user and assert that the token is rejected
+    user.is_active = False
+    user.save()
+    with pytest.raises(AuthenticationFailed):
+        authenticate(access_token)
+
+# Test that changing the password evicts the user from the cache
+@pytest.mark.django_db
+def test_cached_user_password_changed(common_user_token):
+    # Extract user and access token from fixture
+    user = common_user_token.get("user")
+    access_token = common_user_token.get("access")
+    
+    # Authenticate once so the user gets cached
+    authenticate(access_token)
+    assert user_cache.get(user.pk) is not None
+    
+    # Change the password and assert that the cached copy is gone
+    user.set_password("987654321")
+    user.save()
+    assert user_cache.get(user.pk) is None
+
+# Test trusting the token claims without any user lookup
+@pytest.mark.django_db
+def test_trusted_token_claims(common_user_token, settings, django_assert_num_queries):
+    # Enable the stateless mode
+    settings.SIMPLE_JWT = {**settings.SIMPLE_JWT, "TRUST_TOKEN_CLAIMS": True}
+    
+    # Extract user and access token from fixture
+    user = common_user_token.get("user")
+    access_token = common_user_token.get("access")
+    
+    # Assert that authentication doesn't touch the database
+    with django_assert_num_queries(0):
+        authenticated_user, _ = authenticate(access_token)
+    assert isinstance(authenticated_user, CachedTokenUser)
+    assert authenticated_user.is_authenticated
+    assert authenticated_user.id == user.pk
+    
+    # Assert that the real user is still available when a view needs it
+    assert authenticated_user.user.username == user.username
@@ -1,10 +1,10 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from .views import SignUpView, VerifyTokenView
+from rest_framework_simplejwt.views import TokenRefreshView
+from .views import LoginView, SignUpView, VerifyTokenView
 
 urlpatterns = [
     path('auth/signup/', SignUpView.as_view(), name='signup'),
-    path('auth/login/', TokenObtainPairView.as_view(), name='login'),
+    path('auth/login/', LoginView.as_view(), name='login'),
     path('auth/login/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('auth/verify-token/', VerifyTokenView.as_view(), name='verify-token'),
 ]
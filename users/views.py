@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from .serializers import UserSerializer
@@ -10,6 +11,10 @@ from .serializers import UserSerializer
 class SignUpView(generics.CreateAPIView):
     serializer_class = UserSerializer
 
+class LoginView(TokenObtainPairView):
+    # Limits password guessing on top of the per-address limit
+    throttle_scope = "login"
+
 class VerifyTokenView(APIView):
     authentication_classes = [JWTAuthentication]
 